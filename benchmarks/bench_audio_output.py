@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handler import AudioOutput, NullSink, ToneEngine, TTSHandler
+from suite import SENTENCES
+from utils.turn_trace import percentile
+
+
+class JitteryEngine(ToneEngine):
+
+    def __init__(self, rng: random.Random, spread: float, **kwargs):
+        super().__init__(**kwargs)
+        self.rng = rng
+        self.spread = spread
+
+    async def synthesize(self, text: str):
+        audio = await super().synthesize(text)
+        await asyncio.sleep(self.rng.uniform(0.0, self.spread))
+        return audio
+
+
+async def run(jitter_secs: float, sentences, args):
+    engine = JitteryEngine(
+        random.Random(args.seed),
+        args.synthesis_spread,
+        chars_per_sec=args.chars_per_sec,
+        synthesis_secs_per_char=0.0,
+        first_byte_secs=0.0,
+    )
+    output = AudioOutput(NullSink(), engine.sample_rate, jitter_secs=jitter_secs)
+    tts = TTSHandler(engine, output)
+    tts.cache = None
+    tts.chunk_policy = None
+    tts.lookahead = 1
+    loop = asyncio.get_running_loop()
+    speaking = []
+    delays = []
+    tts.on_chunk_start = lambda start, end, started_at, duration: delays.append(max(0.0, started_at - loop.time()))
+
+    async def sample_speaking():
+        while True:
+            speaking.append(tts.is_currently_speaking())
+            await asyncio.sleep(0.01)
+
+    await tts.start()
+    sampler = asyncio.create_task(sample_speaking())
+    begin = loop.time()
+    tts.feed_text(" ".join(sentences) + " ")
+    await tts.flush()
+    total = loop.time() - begin
+    idle_after = tts.is_currently_speaking()
+    sampler.cancel()
+    await tts.stop()
+    return output, total, delays, sum(speaking) / max(1, len(speaking)), idle_after
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Underruns and output latency against the jitter target")
+    parser.add_argument("--sentences", type=int, default=12)
+    parser.add_argument("--chars-per-sec", type=float, default=60.0)
+    parser.add_argument("--synthesis-spread", type=float, default=0.12)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sentences = [rng.choice(SENTENCES) for _ in range(args.sentences)]
+    print(f"{args.sentences} sentences, synthesis jitter 0-{args.synthesis_spread * 1000:.0f} ms, "
+          f"null sink, lookahead 1")
+    for jitter_ms in (0, 20, 60, 150):
+        with contextlib.redirect_stdout(io.StringIO()):
+            output, total, delays, speaking, idle_after = await run(jitter_ms / 1000, sentences, args)
+        print(f"  jitter {jitter_ms:3d} ms  underruns {output.underruns:2d}  overruns {output.overruns}  "
+              f"output latency p50 {percentile(delays, 50) * 1000:4.0f} ms  total {total:5.2f} s  "
+              f"speaking {speaking * 100:3.0f}% of run, {'still' if idle_after else 'idle'} after flush")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from load_test import LoadClient, SyntheticRecorder, SyntheticSegment
+from stub_server import StubConfig, StubLLMServer
+from utils.turn_trace import percentile
+
+
+async def audio_loop(client: LoadClient):
+    # Same wake-up path as the bridge: drain recorder events, then wait
+    while client.running:
+        await client.pump_voice_events()
+        await client.speech_events.wait()
+
+
+async def run_trial(client: LoadClient, recorder: SyntheticRecorder, segment: SyntheticSegment,
+                    min_speech_secs: float, interrupt_after: float):
+    client.turn_done.clear()
+    client.tracer.begin(segment.stamp())
+    await client._process_and_send_message(segment)
+
+    deadline = time.monotonic() + 10.0
+    while not client.tts_handler.is_currently_speaking():
+        if time.monotonic() > deadline:
+            return None
+        await asyncio.sleep(0.005)
+    await asyncio.sleep(interrupt_after)
+
+    # The recorder reports the onset once it has heard min_speech_secs of voice
+    onset = time.time()
+    await asyncio.sleep(min_speech_secs)
+    recorder.voice_events.append(("onset", 1, onset, b""))
+
+    while client.barge_in.last_cutoff is None:
+        await asyncio.sleep(0.001)
+    cutoff = client.barge_in.last_cutoff
+    client.barge_in.last_cutoff = None
+
+    spoken_after = client.tts_handler.chunk_count
+    await asyncio.sleep(0.3)
+    leaked = client.tts_handler.chunk_count - spoken_after
+    return cutoff, leaked
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Speech onset to TTS silence when the user barges in")
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8798)
+    parser.add_argument("--min-speech-secs", type=float, default=config.BARGE_IN_MIN_SPEECH_SECS)
+    parser.add_argument("--poll-interval", type=float, default=config.SPEECH_EVENT_POLL_INTERVAL)
+    parser.add_argument("--interrupt-after", type=float, default=0.2)
+    args = parser.parse_args()
+
+    config.SPEECH_EVENT_POLL_INTERVAL = args.poll_interval
+    server = StubLLMServer("localhost", args.port, StubConfig(
+        tokens_per_sec=40, first_token_latency=0.05, sentences=8, seed=1
+    ))
+    await server.start()
+
+    recorder = SyntheticRecorder(5, config.VIDEO_WIDTH, config.VIDEO_HEIGHT)
+    segment = SyntheticSegment(1, 1.0)
+    client = LoadClient(f"ws://localhost:{args.port}", recorder, tts_chars_per_sec=15.0)
+    client.running = True
+    client.is_mic_enabled = True
+
+    cutoffs = []
+    leaks = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        await client.tts_handler.start()
+        await client.connect()
+        tasks = [
+            asyncio.create_task(client.handle_server_messages()),
+            asyncio.create_task(audio_loop(client)),
+        ]
+        for _ in range(args.trials):
+            result = await run_trial(client, recorder, segment, args.min_speech_secs, args.interrupt_after)
+            if result is None:
+                continue
+            cutoffs.append(result[0])
+            leaks += result[1]
+        client.running = False
+        for task in tasks:
+            task.cancel()
+        await client.tts_handler.stop()
+
+    await server.stop()
+
+    print(f"{len(cutoffs)} barge-ins, min speech {args.min_speech_secs * 1000:.0f} ms, "
+          f"poll {args.poll_interval * 1000:.0f} ms")
+    if cutoffs:
+        print(f"  onset→silence  p50 {percentile(cutoffs, 50) * 1000:6.1f} ms  "
+              f"p95 {percentile(cutoffs, 95) * 1000:6.1f} ms  max {max(cutoffs) * 1000:6.1f} ms")
+    print(f"  server cancels {server.cancelled}, sentences spoken after cancel {leaks}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
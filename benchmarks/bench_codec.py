@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import MessageType, StatusType
+from utils.codec import JsonCodec, msgspec, orjson
+
+
+def make_stream(tokens: int):
+    words = "the quick brown fox jumps over the lazy dog and keeps running".split()
+    messages = [json.dumps({"type": MessageType.STATUS, "status": StatusType.GENERATING, "generation_id": "g1"})]
+    for i in range(tokens):
+        messages.append(json.dumps({"type": MessageType.TEXT, "text": words[i % len(words)] + " ", "seq": i}))
+    messages.append(json.dumps({"type": MessageType.STATS, "stat": "complete", "tokens": tokens, "time": 1.0, "tok_per_sec": 50.0}))
+    messages.append(json.dumps({"type": MessageType.STATUS, "status": StatusType.DONE, "generation_id": "g1"}))
+    return messages
+
+
+def legacy_dispatch(messages):
+    seen = 0
+    for message in messages:
+        data = json.loads(message)
+        msg_type = data.get("type")
+        if msg_type == MessageType.STATUS:
+            seen += data.get("status") == StatusType.DONE
+        elif msg_type == MessageType.TEXT:
+            seen += len(data.get("text", "")) > 0
+        elif msg_type == MessageType.STATS:
+            seen += 1
+    return seen
+
+
+def typed_dispatch(codec, messages):
+    seen = 0
+    handlers = {
+        MessageType.STATUS: lambda m: m.status == StatusType.DONE,
+        MessageType.TEXT: lambda m: len(m.text) > 0,
+        MessageType.STATS: lambda m: True,
+    }
+    for message in messages:
+        decoded = codec.decode_server_message(message)
+        if decoded is not None:
+            seen += handlers[decoded.TYPE](decoded)
+    return seen
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token message decode + dispatch throughput per codec")
+    parser.add_argument("--tokens", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    messages = make_stream(args.tokens)
+    count = len(messages)
+
+    baseline, expected = timed(lambda: legacy_dispatch(messages), args.repeat)
+    print(f"{count} messages")
+    print(f"  {'json + dict.get':<18} {count / baseline / 1000:8.0f} k msg/s  {baseline / count * 1e6:6.2f} us/msg")
+
+    backends = ["json"] + (["orjson"] if orjson else []) + (["msgspec"] if msgspec else [])
+    for backend in backends:
+        codec = JsonCodec(backend)
+        elapsed, seen = timed(lambda: typed_dispatch(codec, messages), args.repeat)
+        assert seen == expected, f"{backend} dispatched {seen}, expected {expected}"
+        print(
+            f"  {backend + ' typed':<18} {count / elapsed / 1000:8.0f} k msg/s  "
+            f"{elapsed / count * 1e6:6.2f} us/msg  {baseline / elapsed:4.1f}x"
+        )
+
+    sample = {"type": "status", "connected": True, "mic_on": True, "cam_on": False}
+    for backend in backends:
+        codec = JsonCodec(backend)
+        elapsed, _ = timed(lambda: [codec.dumps(sample) for _ in range(count)], args.repeat)
+        print(f"  {backend + ' dumps':<18} {count / elapsed / 1000:8.0f} k msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import base64
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from utils.executor import BlockingExecutor
+from utils.loop_monitor import LoopMonitor
+
+
+def make_jpeg(width: int, height: int) -> bytes:
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    _, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 75])
+    return data.tobytes()
+
+
+def decode_jpeg(data: bytes):
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+def encode_payload(payload: bytes) -> str:
+    return base64.b64encode(payload).decode("utf-8")
+
+
+def native_inference(seconds: float):
+    # Stands in for Silero / InsightFace: native code that releases the GIL
+    time.sleep(seconds)
+
+
+async def run_turns(turns: int, jpeg: bytes, payload: bytes, inference_secs: float, pool):
+    for _ in range(turns):
+        if pool is None:
+            native_inference(inference_secs)
+            decode_jpeg(jpeg)
+            native_inference(inference_secs)
+            encode_payload(payload)
+        else:
+            await pool.run(native_inference, inference_secs)
+            await pool.run(decode_jpeg, jpeg)
+            await pool.run(native_inference, inference_secs)
+            await pool.run_cpu(encode_payload, payload)
+        await asyncio.sleep(0.01)
+
+
+async def measure(label: str, turns: int, jpeg: bytes, payload: bytes, inference_secs: float, pool):
+    monitor = LoopMonitor(interval=0.005, window=100000)
+    monitor.start()
+    start = time.perf_counter()
+    await run_turns(turns, jpeg, payload, inference_secs, pool)
+    elapsed = time.perf_counter() - start
+    await monitor.stop()
+
+    stats = monitor.summary()
+    print(
+        f"  {label:<10} p50 {stats['p50_ms']:6.2f} ms  p99 {stats['p99_ms']:6.2f} ms  "
+        f"max {stats['max_ms']:6.2f} ms  stalled {stats['total_ms'] / (elapsed * 1000):5.1%}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Event loop stall with and without the executor layer")
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--payload-mb", type=float, default=4.0)
+    parser.add_argument("--inference-ms", type=float, default=40.0)
+    parser.add_argument("--process-workers", type=int, default=0)
+    args = parser.parse_args()
+
+    jpeg = make_jpeg(1280, 720)
+    payload = os.urandom(int(args.payload_mb * 1024 * 1024))
+    inference_secs = args.inference_ms / 1000.0
+
+    print(f"{args.turns} turns, {args.payload_mb:.1f} MB payload, {args.inference_ms:.0f} ms inference")
+    await measure("inline", args.turns, jpeg, payload, inference_secs, None)
+
+    pool = BlockingExecutor(thread_workers=4, process_workers=args.process_workers)
+    await measure("executor", args.turns, jpeg, payload, inference_secs, pool)
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handler import ChunkPolicy, ToneEngine, TTSHandler
+from suite import SENTENCES, tokenize
+from utils.turn_trace import percentile
+
+
+LONG_OPENERS = [
+    "Well, I looked into it and the short answer is that it depends on how far you want to walk today",
+    "Honestly the best option for you right now is probably the train because the roads are still closed",
+    "So the museum opens at ten and it stays open until six, but the garden closes a little earlier",
+]
+
+
+def make_reply(rng: random.Random) -> str:
+    return rng.choice(LONG_OPENERS) + ". " + " ".join(rng.choice(SENTENCES) for _ in range(3)) + " "
+
+
+async def run(policy, text: str, tokens_per_sec: float):
+    # Fast playback keeps the run short; it does not change when the first chunk starts
+    tts = TTSHandler(ToneEngine(chars_per_sec=400.0))
+    tts.cache = None
+    tts.chunk_policy = policy
+    loop = asyncio.get_running_loop()
+    audio_at = []
+    tts.on_chunk_start = lambda start, end, started_at, duration: audio_at.append((started_at, end - start))
+
+    await tts.start()
+    begin = loop.time()
+    for token in tokenize(text, 4):
+        tts.feed_text(token)
+        await asyncio.sleep(1.0 / tokens_per_sec)
+    await tts.flush()
+    await tts.stop()
+
+    return audio_at[0][0] - begin, [size for _, size in audio_at]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Time to first audio with sentence-only and adaptive chunking")
+    parser.add_argument("--replies", type=int, default=6)
+    parser.add_argument("--tokens-per-sec", type=float, default=40.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    replies = [make_reply(rng) for _ in range(args.replies)]
+
+    for label, policy in (("sentence", None), ("adaptive", ChunkPolicy())):
+        first_audio = []
+        sizes = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for text in replies:
+                latency, chunk_sizes = await run(policy, text, args.tokens_per_sec)
+                first_audio.append(latency)
+                sizes.append(chunk_sizes[:4])
+        columns = " ".join(
+            f"{sum(chunk[i] for chunk in sizes) / len(sizes):5.0f}" for i in range(min(map(len, sizes)))
+        )
+        print(f"  {label:<9} first audio p50 {percentile(first_audio, 50) * 1000:6.0f} ms  "
+              f"max {max(first_audio) * 1000:6.0f} ms  chars in chunks 1-4: {columns}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
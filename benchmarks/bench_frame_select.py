@@ -0,0 +1,85 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from handler.frame_selector import FrameSelector
+
+
+def make_window(count: int, width: int, height: int, quality: int):
+    rng = np.random.default_rng(0)
+    base = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (0, 0), 3)
+    frames = []
+    for i in range(count):
+        image = np.roll(base, i * 4, axis=1)
+        if i % 20 < 6:
+            image = cv2.GaussianBlur(image, (0, 0), 6)
+        _, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        frames.append(data.tobytes())
+    return frames
+
+
+def uniform(frames, limit):
+    if len(frames) <= limit:
+        return list(frames)
+    step = len(frames) // limit
+    return [frames[i * step] for i in range(limit)]
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyframe scoring cost and selection quality")
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--quality", type=int, default=75)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    selector = FrameSelector(max_frames=3)
+    frames = make_window(args.frames, args.width, args.height, args.quality)
+    boxes = [(args.width // 4, args.height // 4, args.width // 2, args.height // 2)]
+    shape = (args.height, args.width)
+
+    candidates = selector.candidate_indices(len(frames))
+    decode_ms, (stack, valid) = timed(lambda: selector.decode_thumbnails(frames, candidates), args.repeat)
+    score_ms, scores = timed(lambda: selector.score(stack, boxes, shape), args.repeat)
+    select_ms, selected = timed(lambda: selector.select(frames, boxes, shape), args.repeat)
+
+    limit = selector.frame_limit(len(frames))
+    baseline = uniform(frames, limit)
+
+    full = [cv2.imdecode(np.frombuffer(f, np.uint8), cv2.IMREAD_GRAYSCALE) for f in frames]
+    sharpness = np.array([cv2.Laplacian(image, cv2.CV_32F).var() for image in full])
+    sharpness = sharpness / sharpness.max()
+
+    def mean_sharpness(chosen):
+        indices = [frames.index(f) for f in chosen]
+        return float(np.mean(sharpness[indices])), indices
+
+    base_sharp, base_idx = mean_sharpness(baseline)
+    sel_sharp, sel_idx = mean_sharpness(selected)
+
+    print(f"{len(frames)} frames {args.width}x{args.height}, {len(valid)} candidates, limit {limit}")
+    print(f"  decode  {decode_ms:6.2f} ms")
+    print(f"  score   {score_ms:6.2f} ms")
+    print(f"  select  {select_ms:6.2f} ms (decode + score + pick)")
+    print(f"  uniform  frames {base_idx}  sharpness {base_sharp:.3f}  {sum(map(len, baseline)) / 1024:.1f} KB")
+    print(f"  selected frames {sel_idx}  sharpness {sel_sharp:.3f}  {sum(map(len, selected)) / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import bisect
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handler import StreamParser, TagScheduler, ToneEngine, TTSHandler
+from suite import SENTENCES, tokenize
+from utils.turn_trace import percentile
+
+
+def make_tagged_response(rng: random.Random, sentences: int, tags_per_sentence: int) -> str:
+    parts = []
+    for _ in range(sentences):
+        words = rng.choice(SENTENCES).split(" ")
+        for _ in range(tags_per_sentence):
+            at = rng.randint(0, len(words) - 1)
+            if rng.random() < 0.5:
+                tag = f'|emotion="{rng.choice(["happy", "calm", "curious"])}"|'
+            else:
+                tag = f'|animate="nod":OnDelay({rng.choice([0.0, 0.05, 0.1])})|'
+            words[at] = tag + words[at]
+        parts.append(" ".join(words) + " ")
+    return "".join(parts)
+
+
+class CountingScheduler(TagScheduler):
+
+    def __init__(self, on_fire):
+        super().__init__(on_fire)
+        self.armed = 0
+
+    def _arm(self):
+        timer = self._timer
+        super()._arm()
+        if self._timer is not timer:
+            self.armed += 1
+
+
+async def run_turn(text: str, chars_per_sec: float, tokens_per_sec: float):
+    loop = asyncio.get_running_loop()
+    parser = StreamParser()
+    tts = TTSHandler(ToneEngine(chars_per_sec=chars_per_sec))
+    tts.cache = None
+    fired = []
+    chunks = []
+    scheduler = CountingScheduler(lambda tag: fired.append((loop.time(), tag)))
+
+    def on_chunk_start(start, end, started_at, duration):
+        chunks.append((start, end, started_at, duration))
+        scheduler.on_chunk_start(start, end, started_at, duration)
+
+    parser.on_text = tts.feed_text
+    parser.on_tag = scheduler.add
+    tts.on_chunk_start = on_chunk_start
+    await tts.start()
+    try:
+        for token in tokenize(text, 4):
+            parser.feed(token)
+            await asyncio.sleep(1.0 / tokens_per_sec)
+        parser.finish()
+        await tts.flush()
+        scheduler.drain()
+        while scheduler.pending():
+            await asyncio.sleep(0.01)
+    finally:
+        await tts.stop()
+
+    # Each tag must land inside the chunk that speaks its text: after the
+    # chunk starts and before the next one does, shifted by its delay
+    starts = [chunk[0] for chunk in chunks]
+    lateness = []
+    misplaced = 0
+    for at, tag in fired:
+        index = max(0, bisect.bisect_right(starts, tag["position"]) - 1)
+        start, end, started_at, duration = chunks[index]
+        offset = min(max(tag["position"] - start, 0), end - start) / max(1, end - start)
+        due = started_at + offset * duration + (tag.get("delay") or 0.0)
+        if tag["position"] > end and index == len(chunks) - 1:
+            due = max(due, at)
+        lateness.append(at - due)
+        next_start = chunks[index + 1][2] if index + 1 < len(chunks) else float("inf")
+        if at < started_at or at > next_start + (tag.get("delay") or 0.0) + 0.05:
+            misplaced += 1
+    return len(parser.parsed_tags), len(fired), scheduler.armed, lateness, misplaced
+
+
+async def overhead(tags: int) -> float:
+    scheduler = TagScheduler(lambda tag: None)
+    items = [{"type": "animate", "value": "nod", "position": i} for i in range(tags)]
+    start = time.perf_counter()
+    for tag in items:
+        scheduler.add(tag)
+    scheduler.on_chunk_start(0, tags, asyncio.get_running_loop().time(), 0.0)
+    while scheduler.pending():
+        await asyncio.sleep(0)
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Playback alignment and overhead of the tag scheduler")
+    parser.add_argument("--sentences", type=int, default=12)
+    parser.add_argument("--tags-per-sentence", type=int, default=4)
+    parser.add_argument("--chars-per-sec", type=float, default=120.0)
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    text = make_tagged_response(random.Random(args.seed), args.sentences, args.tags_per_sentence)
+    parsed, fired, armed, lateness, misplaced = await run_turn(text, args.chars_per_sec, args.tokens_per_sec)
+
+    print(f"{parsed} tags parsed, {fired} fired, {misplaced} outside their sentence, {armed} timer(s) armed")
+    if lateness:
+        print(f"  lateness  p50 {percentile(lateness, 50) * 1000:6.2f} ms  "
+              f"p95 {percentile(lateness, 95) * 1000:6.2f} ms  max {max(lateness) * 1000:6.2f} ms")
+    for count in (50, 5000):
+        cost = await overhead(count)
+        print(f"  {count:>5} tags  {cost / count * 1e6:6.2f} µs per tag (add + place + fire)")
+
+    sys.exit(1 if fired != parsed or misplaced else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
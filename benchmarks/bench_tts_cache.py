@@ -0,0 +1,61 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handler import TTSCache, ToneEngine
+from handler.tts_cache import TTS_CACHE_LOOKUPS
+from suite import SENTENCES
+from utils.turn_trace import percentile
+
+
+async def synthesize_all(engine: ToneEngine, cache, sentences):
+    waits = []
+    settings = engine.settings()
+    for text in sentences:
+        start = time.perf_counter()
+        audio = await cache.get(text, settings) if cache else None
+        if audio is None:
+            audio = await engine.synthesize(text)
+            if cache:
+                cache.put(text, settings, audio)
+        waits.append(time.perf_counter() - start)
+    return waits
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Synthesis wait with and without the TTS audio cache")
+    parser.add_argument("--sentences", type=int, default=200)
+    parser.add_argument("--first-byte-secs", type=float, default=0.02)
+    parser.add_argument("--synthesis-secs-per-char", type=float, default=0.0005)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sentences = [rng.choice(SENTENCES) for _ in range(args.sentences)]
+    engine = ToneEngine(
+        synthesis_secs_per_char=args.synthesis_secs_per_char, first_byte_secs=args.first_byte_secs
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        uncached = await synthesize_all(engine, None, sentences)
+        cache = TTSCache(directory)
+        cold = await synthesize_all(engine, cache, sentences)
+        hits = TTS_CACHE_LOOKUPS.value(result="memory_hit") + TTS_CACHE_LOOKUPS.value(result="disk_hit")
+        cache.clear_memory()
+        disk = await synthesize_all(engine, cache, sentences[:20])
+
+    print(f"{len(sentences)} sentences drawn from {len(set(sentences))} phrases, "
+          f"hit rate {hits / len(sentences) * 100:.0f}%")
+    for label, waits in (("no cache", uncached), ("cache", cold), ("disk tier", disk)):
+        print(f"  {label:<10} wait p50 {percentile(waits, 50) * 1000:7.2f} ms  "
+              f"p95 {percentile(waits, 95) * 1000:7.2f} ms  total {sum(waits):6.2f} s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
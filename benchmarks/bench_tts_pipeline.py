@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handler import ToneEngine, TTSHandler
+from suite import SENTENCES
+from utils.turn_trace import percentile
+
+
+async def run(lookahead: int, max_bytes: int, sentences, engine: ToneEngine):
+    tts = TTSHandler(engine)
+    tts.cache = None
+    tts.lookahead = lookahead
+    tts.lookahead_max_bytes = max_bytes
+    chunks = []
+    peak = 0
+
+    def on_chunk_start(start, end, started_at, duration):
+        nonlocal peak
+        chunks.append((started_at, duration))
+        peak = max(peak, tts._ready_bytes)
+
+    tts.on_chunk_start = on_chunk_start
+    await tts.start()
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    tts.feed_text(" ".join(sentences) + " ")
+    await tts.flush()
+    total = loop.time() - begin
+    await tts.stop()
+
+    gaps = [
+        max(0.0, chunks[i + 1][0] - (chunks[i][0] + chunks[i][1]))
+        for i in range(len(chunks) - 1)
+    ]
+    return gaps, total, peak
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Inter-sentence gaps with pipelined TTS synthesis")
+    parser.add_argument("--sentences", type=int, default=10)
+    parser.add_argument("--chars-per-sec", type=float, default=60.0)
+    parser.add_argument("--synthesis-secs-per-char", type=float, default=0.006)
+    parser.add_argument("--first-byte-secs", type=float, default=0.08)
+    parser.add_argument("--max-bytes", type=int, default=8 * 1024 * 1024)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sentences = [rng.choice(SENTENCES) for _ in range(args.sentences)]
+    engine = ToneEngine(
+        chars_per_sec=args.chars_per_sec,
+        synthesis_secs_per_char=args.synthesis_secs_per_char,
+        first_byte_secs=args.first_byte_secs,
+    )
+
+    print(f"{args.sentences} sentences, synthesis {args.first_byte_secs * 1000:.0f} ms + "
+          f"{args.synthesis_secs_per_char * 1000:.1f} ms/char, playback {args.chars_per_sec:.0f} chars/s")
+    for lookahead in (0, 1, 2, 4):
+        with contextlib.redirect_stdout(io.StringIO()):
+            gaps, total, peak = await run(lookahead, args.max_bytes, sentences, engine)
+        label = "serial" if lookahead == 0 else f"K={lookahead}"
+        print(f"  {label:<7} gap p50 {percentile(gaps, 50) * 1000:6.1f} ms  p95 {percentile(gaps, 95) * 1000:6.1f} ms  "
+              f"total {total:5.2f} s  peak ahead {peak / 1024:6.0f} KiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import websockets
+
+from network.upload_protocol import build_upload_message
+
+
+class NullWebSocket:
+
+    def __init__(self):
+        self.bytes_sent = 0
+
+    async def send(self, data):
+        self.bytes_sent += len(data)
+
+
+def make_payload(audio_kb: int, frame_kb: int, frame_count: int):
+    metadata = {
+        "audio_format": "flac",
+        "session_name": "bench",
+        "identity_ids": ["id-00000000"],
+    }
+    audio_bytes = os.urandom(audio_kb * 1024)
+    frames = [os.urandom(frame_kb * 1024) for _ in range(frame_count)]
+    return metadata, audio_bytes, frames
+
+
+async def measure(websocket, payload, binary: bool, iterations: int, acked: bool = False):
+    metadata, audio_bytes, frames = payload
+    build_total = 0.0
+    send_total = 0.0
+    size = 0
+
+    for _ in range(iterations):
+        build_start = time.perf_counter()
+        message = build_upload_message(metadata, audio_bytes, frames, binary)
+        build_total += time.perf_counter() - build_start
+
+        send_start = time.perf_counter()
+        await message.send(websocket)
+        if acked:
+            # send() returns once the frames are buffered; the ack marks the
+            # whole message having reached the server
+            await websocket.recv()
+        send_total += time.perf_counter() - send_start
+        size = message.size
+
+    return size, build_total / iterations, send_total / iterations
+
+
+async def run_loopback(payload, iterations: int):
+    async def sink(websocket):
+        async for frame in websocket:
+            if isinstance(frame, str):
+                header = json.loads(frame)
+                parts = len(header.get("parts", []))
+            else:
+                parts -= 1
+            if parts == 0:
+                await websocket.send("ack")
+
+    async with websockets.serve(sink, "localhost", 0, max_size=None) as server:
+        port = server.sockets[0].getsockname()[1]
+        async with websockets.connect(f"ws://localhost:{port}", max_size=None) as websocket:
+            return {
+                "json": await measure(websocket, payload, False, iterations, acked=True),
+                "binary": await measure(websocket, payload, True, iterations, acked=True),
+            }
+
+
+def report(title, results):
+    print(title)
+    print(f"  {'protocol':<8} {'message_size':>14} {'build_time':>12} {'transfer':>12}")
+    for protocol, (size, build_time, send_time) in results.items():
+        print(
+            f"  {protocol:<8} {size / 1024:>11.1f} KB "
+            f"{build_time * 1000:>9.2f} ms {send_time * 1000:>9.2f} ms"
+        )
+
+    json_size = results["json"][0]
+    binary_size = results["binary"][0]
+    print(f"  binary saves {(1 - binary_size / json_size):.1%} of the wire size\n")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare JSON/base64 and binary upload framing")
+    parser.add_argument("--audio-kb", type=int, default=160, help="FLAC payload size")
+    parser.add_argument("--frame-kb", type=int, default=45, help="JPEG frame size")
+    parser.add_argument("--frames", type=int, default=3, help="frames per message")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    payload = make_payload(args.audio_kb, args.frame_kb, args.frames)
+
+    null_results = {
+        "json": await measure(NullWebSocket(), payload, False, args.iterations),
+        "binary": await measure(NullWebSocket(), payload, True, args.iterations),
+    }
+    report("Null sink (encode cost only)", null_results)
+    report("Loopback WebSocket (send until the server has the whole message)",
+           await run_loopback(payload, args.iterations))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
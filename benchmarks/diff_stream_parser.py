@@ -0,0 +1,126 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handler.stream_parser import StreamParser
+from legacy_stream_parser import LegacyStreamParser
+from suite import make_response, tokenize
+
+
+FRAGMENTS = [
+    "Hello", " ", "world", ".", "\n", "|", "||", "<", "<<", ">", "/", "<t", "<th", "<think", "<think>",
+    "</think>", "</thi", "nk>", "<f", "<function_call>", "</function_call>", "</function_", "call>",
+    '|emotion="happy"|', '|animate="wave":OnDelay(0.5)|', '|animate="nod"|', '|animate="x":OnDelay(bad)|',
+    '|emotion=\\"sad\\"|', '|bogus|', 'emotion="', '"', "OnDelay(", ")", "<|", "|<", "<</think>",
+    '{"name": "get_time"}', "…", "你好", "3.14",
+]
+
+
+def record(parser):
+    events = []
+
+    def on_text(text):
+        # Coalesced spans are the point of the new parser, so compare text
+        # runs rather than call boundaries
+        if events and events[-1][0] == "text":
+            events[-1] = ("text", events[-1][1] + text)
+        else:
+            events.append(("text", text))
+
+    parser.on_text = on_text
+    parser.on_tag = lambda tag: events.append(("tag", dict(tag)))
+    parser.on_think_start = lambda: events.append(("think_start",))
+    parser.on_think_end = lambda content: events.append(("think_end", content))
+    parser.on_function_call = lambda content: events.append(("function", content))
+    return events
+
+
+def random_stream(rng: random.Random) -> str:
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 60)))
+
+
+def random_split(rng: random.Random, text: str):
+    tokens = []
+    i = 0
+    while i < len(text):
+        size = rng.choice([1, 1, 2, 3, 4, 7, 16, 64])
+        tokens.append(text[i:i + size])
+        i += size
+    return tokens
+
+
+def run(parser_cls, streams):
+    parser = parser_cls()
+    events = record(parser)
+    results = []
+    for tokens, finish_twice in streams:
+        for token in tokens:
+            parser.feed(token)
+        results.append(parser.finish())
+        if finish_twice:
+            # Feeding after finish() without reset() is legal; keep that identical too
+            parser.feed("<|x|>")
+            results.append(parser.finish())
+        results.append(parser.get_result())
+        parser.reset()
+    return events, results
+
+
+def check(cases: int, seed: int) -> int:
+    rng = random.Random(seed)
+    failures = 0
+    for case in range(cases):
+        text = random_stream(rng) if case % 4 else make_response(rng, rng.randint(1, 12))
+        streams = [(random_split(rng, text), rng.random() < 0.2)]
+        if rng.random() < 0.3:
+            streams.append((random_split(rng, random_stream(rng)), False))
+
+        expected = run(LegacyStreamParser, streams)
+        actual = run(StreamParser, streams)
+        if expected != actual:
+            failures += 1
+            if failures <= 5:
+                print(f"MISMATCH case {case}: {streams!r}")
+                print(f"  legacy: {expected!r}")
+                print(f"  new:    {actual!r}")
+    return failures
+
+
+def timing(parser_cls, tokens, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        parser = parser_cls()
+        parser.on_text = lambda text: None
+        start = time.perf_counter()
+        for token in tokens:
+            parser.feed(token)
+        parser.finish()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Differential check of StreamParser against the per-character parser")
+    parser.add_argument("--cases", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = check(args.cases, args.seed)
+    print(f"{args.cases} random streams, {failures} mismatches")
+
+    rng = random.Random(1)
+    for label, size in (("4-char tokens", 4), ("16-char tokens", 16)):
+        tokens = tokenize(make_response(rng, 400), size)
+        legacy = timing(LegacyStreamParser, tokens)
+        new = timing(StreamParser, tokens)
+        print(f"  {label:<16} legacy {legacy * 1000:7.2f} ms  new {new * 1000:7.2f} ms  ({legacy / new:4.1f}x)")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
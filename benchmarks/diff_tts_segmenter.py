@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handler.tts_sequence import TTSHandler
+from legacy_tts_segmenter import LegacyTTSHandler
+from suite import make_response, tokenize
+
+
+FRAGMENTS = [
+    "Hello", "world", " ", "  ", "\n", "\t", "\r", "　", "\xa0", ".", "..", "...", "....", "!", "?", "?!",
+    "。", "！", "？", "3.14", "1.2.3", "v2.", "e.g.", "Mr.", "a", "I", "...\n", ". ", "! ", "你好", "…",
+]
+
+
+def random_stream(rng: random.Random) -> str:
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 80)))
+
+
+def random_split(rng: random.Random, text: str):
+    tokens = []
+    i = 0
+    while i < len(text):
+        size = rng.choice([1, 1, 2, 3, 4, 7, 16, 64])
+        tokens.append(text[i:i + size])
+        i += size
+    return tokens
+
+
+def drain(handler: TTSHandler):
+    items = []
+    while not handler._speak_queue.empty():
+        items.append(handler._speak_queue.get_nowait())
+        handler._speak_queue.task_done()
+    return items
+
+
+async def run(handler_cls, streams):
+    handler = handler_cls()
+    # The legacy handler only knows sentence boundaries
+    handler.chunk_policy = None
+    results = []
+    for tokens in streams:
+        for token in tokens:
+            handler.feed_text(token)
+            # The legacy handler queues through tasks; let them land
+            await asyncio.sleep(0)
+        results.append((drain(handler), handler.sentence_buffer, handler._offset))
+        handler.reset()
+    return results
+
+
+async def check(cases: int, seed: int) -> int:
+    rng = random.Random(seed)
+    failures = 0
+    for case in range(cases):
+        text = random_stream(rng) if case % 4 else make_response(rng, rng.randint(1, 12), think=False, tags=False)
+        streams = [random_split(rng, text)]
+        if rng.random() < 0.3:
+            streams.append(random_split(rng, random_stream(rng)))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = await run(LegacyTTSHandler, streams)
+            actual = await run(TTSHandler, streams)
+        if expected != actual:
+            failures += 1
+            if failures <= 5:
+                print(f"MISMATCH case {case}: {streams!r}")
+                print(f"  legacy: {expected!r}")
+                print(f"  new:    {actual!r}")
+    return failures
+
+
+async def timing(handler_cls, tokens, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        handler = handler_cls()
+        handler.chunk_policy = None
+        start = time.perf_counter()
+        for token in tokens:
+            handler.feed_text(token)
+        await asyncio.sleep(0)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Differential check of the TTS segmenter against the rescanning one")
+    parser.add_argument("--cases", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failures = await check(args.cases, args.seed)
+    print(f"{args.cases} random streams, {failures} mismatches")
+
+    rng = random.Random(1)
+    for label, sentences, size in (("1-char, 40 sent.", 40, 1), ("4-char, 400 sent.", 400, 4)):
+        tokens = tokenize(make_response(rng, sentences, think=False, tags=False), size)
+        with contextlib.redirect_stdout(io.StringIO()):
+            legacy = await timing(LegacyTTSHandler, tokens)
+            new = await timing(TTSHandler, tokens)
+        print(f"  {label:<18} legacy {legacy * 1000:7.2f} ms  new {new * 1000:7.2f} ms  ({legacy / new:5.1f}x)")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
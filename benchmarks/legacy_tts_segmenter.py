@@ -0,0 +1,56 @@
+# Frozen copy of the rescanning TTSHandler.feed_text, kept as the reference
+# for diff_tts_segmenter.py. Do not optimise.
+import asyncio
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handler.tts_sequence import TTSHandler
+
+
+class LegacyTTSHandler(TTSHandler):
+
+    def feed_text(self, text: str):
+        self.sentence_buffer += text
+        
+        while True:
+            buffer = self.sentence_buffer
+            
+            if len(buffer) < 2:
+                break
+            
+            ELLIPSIS_PLACEHOLDER = '\x00\x00\x00'
+            DECIMAL_PLACEHOLDER = '\x01'
+            
+            temp = buffer.replace('...', ELLIPSIS_PLACEHOLDER)
+            temp = re.sub(r'(\d)\.(\d)', rf'\1{DECIMAL_PLACEHOLDER}\2', temp)
+            
+            best_match = None
+            for match in re.finditer(r'[.!?。！？]', temp):
+                pos = match.end()
+                
+                if pos < len(temp):
+                    next_char = temp[pos]
+                    if next_char in ' \n\t\r':
+                        best_match = match
+                        break
+                else:
+                    pass
+            
+            if not best_match:
+                break
+            
+            end_pos = best_match.end()
+            
+            head = buffer[:end_pos]
+            sentence = head.strip()
+            start = self._offset + len(head) - len(head.lstrip())
+            rest = buffer[end_pos:]
+            self.sentence_buffer = rest.lstrip()
+            self._offset += len(buffer) - len(self.sentence_buffer)
+            
+            if sentence and len(sentence) > 1:
+                self.tracer.mark_once("tts_queued")
+                asyncio.create_task(self._speak_queue.put((sentence, start, start + len(sentence))))
@@ -0,0 +1,237 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+import soundfile as sf
+
+import config
+from handler.tts_engine import ToneEngine
+from handler.tts_sequence import TTSHandler
+from network.llm_client import AnnieMieClient
+from stub_server import StubLLMServer, add_stub_arguments, stub_config_from_args
+from utils.loop_monitor import LoopMonitor
+from utils.turn_trace import TurnTracer, percentile
+
+
+class SyntheticRecorder:
+
+    def __init__(self, frame_count: int, width: int, height: int, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        base = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (0, 0), 3)
+        self.frames = []
+        for i in range(frame_count):
+            image = np.roll(base, i * 3, axis=1)
+            _, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, config.JPEG_QUALITY])
+            self.frames.append(data.tobytes())
+        self.llm_busy = False
+        self.voice_events = deque()
+
+    def get_frames_for_duration(self, duration: float):
+        count = int(min(duration, config.BUFFER_DURATION) * config.VIDEO_FPS)
+        return [self.frames[i % len(self.frames)] for i in range(max(1, count))]
+
+    def get_latest_frame(self):
+        return self.frames[-1]
+
+    def get_audio_format(self):
+        return "flac"
+
+    def set_llm_busy(self, busy: bool):
+        self.llm_busy = busy
+
+    def read_audio_chunk(self):
+        return None
+
+    def read_speech_event(self, as_segment: bool = False):
+        return None
+
+    def read_voice_event(self):
+        return self.voice_events.popleft() if self.voice_events else None
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class SyntheticSegment:
+
+    def __init__(self, segment_id: int, duration: float, sample_rate: int = config.RATE):
+        t = np.arange(int(duration * sample_rate)) / sample_rate
+        pcm = (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16)
+        buffer = io.BytesIO()
+        sf.write(buffer, pcm, sample_rate, format="FLAC")
+
+        self.id = segment_id
+        self.sample_rate = sample_rate
+        self.duration = duration
+        self.encoded = buffer.getvalue()
+        self.pcm = pcm
+
+    def stamp(self):
+        self.end_time = time.time()
+        self.start_time = self.end_time - self.duration
+        return self
+
+
+class HeadlessTTS(TTSHandler):
+
+    def __init__(self, chars_per_sec: float):
+        super().__init__(ToneEngine(chars_per_sec=chars_per_sec, synthesis_secs_per_char=0.0, first_byte_secs=0.0))
+        self.cache = None
+
+
+class LoadClient(AnnieMieClient):
+
+    def __init__(self, server_uri: str, recorder: SyntheticRecorder, tts_chars_per_sec: float):
+        super().__init__(server_uri)
+        self.recorder = recorder
+        self.is_cam_enabled = True
+        self.tts_handler = HeadlessTTS(tts_chars_per_sec)
+        self.tracer = TurnTracer()
+        self.tts_handler.tracer = self.tracer
+        self.turn_done = asyncio.Event()
+        self.token_costs = []
+        self.errors = 0
+        self._setup_stream_parser()
+
+    async def _on_text(self, message):
+        start = time.perf_counter()
+        await super()._on_text(message)
+        self.token_costs.append(time.perf_counter() - start)
+
+    async def _on_done(self, message):
+        await super()._on_done(message)
+        self.turn_done.set()
+
+    async def _on_error(self, message):
+        await super()._on_error(message)
+        self.errors += 1
+        self.turn_done.set()
+
+
+async def run_pipeline(index: int, args, recorder: SyntheticRecorder, segment: SyntheticSegment, results: dict):
+    client = LoadClient(args.uri, recorder, args.tts_chars_per_sec)
+    client.running = True
+    await client.tts_handler.start()
+    if not await client.connect():
+        results["failed_connects"] += 1
+        return client
+
+    handler = asyncio.create_task(client.handle_server_messages())
+    try:
+        for _ in range(args.turns):
+            client.turn_done.clear()
+            client.tracer.begin(segment.stamp())
+            client.tracer.mark("vad_done")
+            await client._process_and_send_message(segment)
+            try:
+                await asyncio.wait_for(client.turn_done.wait(), timeout=args.turn_timeout)
+                results["turns"] += 1
+            except asyncio.TimeoutError:
+                results["timeouts"] += 1
+                client.tracer.discard()
+            if args.think_time > 0:
+                await asyncio.sleep(args.think_time)
+    finally:
+        client.running = False
+        handler.cancel()
+        await client.tts_handler.stop()
+        if client.websocket:
+            websocket = client.websocket
+            client._handle_disconnect()
+            await websocket.close()
+    return client
+
+
+def spans(clients, start: str, end: str):
+    values = []
+    for client in clients:
+        for trace in client.tracer.traces:
+            value = trace.span(start, end)
+            if value is not None:
+                values.append(value)
+    return values
+
+
+def format_span(label: str, values):
+    if not values:
+        return f"  {label:<20} n/a"
+    return (
+        f"  {label:<20} p50 {percentile(values, 50) * 1000:7.1f} ms  "
+        f"p95 {percentile(values, 95) * 1000:7.1f} ms  p99 {percentile(values, 99) * 1000:7.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Drive N client pipelines against the stand-in LLM server")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--uri", default=None, help="Use an external server instead of the bundled stub")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--speech-secs", type=float, default=2.0)
+    parser.add_argument("--think-time", type=float, default=0.0)
+    parser.add_argument("--turn-timeout", type=float, default=30.0)
+    parser.add_argument("--tts-chars-per-sec", type=float, default=0.0)
+    parser.add_argument("--verbose", action="store_true")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    if args.uri is None:
+        server = StubLLMServer("localhost", args.port, stub_config_from_args(args))
+        await server.start()
+        args.uri = f"ws://localhost:{args.port}"
+
+    recorder = SyntheticRecorder(30, config.VIDEO_WIDTH, config.VIDEO_HEIGHT)
+    segment = SyntheticSegment(1, args.speech_secs)
+    results = {"turns": 0, "timeouts": 0, "failed_connects": 0}
+
+    monitor = LoopMonitor(interval=0.005, window=1000000)
+    monitor.start()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        clients = await asyncio.gather(*[
+            run_pipeline(i, args, recorder, segment, results) for i in range(args.clients)
+        ])
+
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    await monitor.stop()
+    if server:
+        await server.stop()
+
+    token_costs = [cost for client in clients for cost in client.token_costs]
+    errors = sum(client.errors for client in clients)
+    stall = monitor.summary()
+
+    print(f"{args.clients} clients x {args.turns} turns against {args.uri}")
+    print(f"  completed {results['turns']} turns, {results['timeouts']} timeouts, "
+          f"{errors} server errors, {results['failed_connects']} failed connects")
+    print(f"  throughput {results['turns'] / elapsed:7.2f} turns/s  {len(token_costs) / elapsed:8.0f} tokens/s  "
+          f"({elapsed:.1f}s wall, {cpu:.1f}s cpu)")
+    if token_costs:
+        print(f"  per-token handling  mean {np.mean(token_costs) * 1e6:6.1f} us  "
+              f"p99 {percentile(token_costs, 99) * 1e6:6.1f} us")
+    print(format_span("sent→first token", spans(clients, "sent", "first_token")))
+    print(format_span("sent→done", spans(clients, "sent", "done")))
+    print(format_span("end→sent", spans(clients, "speech_end", "sent")))
+    print(format_span("end→audio", spans(clients, "speech_end", "tts_played")))
+    print(f"  loop stall          p99 {stall['p99_ms']:7.1f} ms  max {stall['max_ms']:7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
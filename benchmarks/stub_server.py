@@ -0,0 +1,307 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import websockets
+
+from config import MessageType, StatusType, StatsType
+from network.upload_protocol import (
+    AUDIO_STREAM_CAPABILITY,
+    BINARY_UPLOAD_CAPABILITY,
+    CANCEL_CAPABILITY,
+    FUNCTION_RESULT_CAPABILITY,
+)
+from utils.codec import codec
+from utils.logger import logger
+
+
+SENTENCES = [
+    "Hello there, it is good to see you again.",
+    "I was just thinking about what you said earlier.",
+    "The weather looks lovely today, doesn't it?",
+    "Let me know if there is anything else I can help with.",
+    "That sounds like a wonderful idea to me.",
+    "I remember you mentioned something similar last week.",
+]
+
+EMOTIONS = ["happy", "curious", "calm", "surprised"]
+ANIMATIONS = ["wave", "nod", "tilt_head", "smile"]
+
+
+class StubConfig:
+
+    def __init__(
+        self,
+        tokens_per_sec: float = 50.0,
+        first_token_latency: float = 0.3,
+        sentences: int = 3,
+        chars_per_token: int = 4,
+        think: bool = False,
+        tags: bool = True,
+        function_calls: bool = False,
+        error_rate: float = 0.0,
+        seed: int = None,
+    ):
+        self.tokens_per_sec = tokens_per_sec
+        self.first_token_latency = first_token_latency
+        self.sentences = sentences
+        self.chars_per_token = chars_per_token
+        self.think = think
+        self.tags = tags
+        self.function_calls = function_calls
+        self.error_rate = error_rate
+        self.seed = seed
+
+
+class Generation:
+
+    def __init__(self, generation_id: str, tokens):
+        self.generation_id = generation_id
+        self.tokens = tokens
+        self.started = time.monotonic()
+
+
+class StubLLMServer:
+
+    def __init__(self, host: str = "localhost", port: int = 8765, stub_config: StubConfig = None):
+        self.host = host
+        self.port = port
+        self.config = stub_config or StubConfig()
+        self.random = random.Random(self.config.seed)
+        self.generations = {}
+        self.turns = 0
+        self.tokens_sent = 0
+        self.bytes_received = 0
+        self.connections = 0
+        self.cancelled = 0
+        self.function_results = []
+        self._server = None
+
+    async def start(self):
+        self._server = await websockets.serve(
+            self._handle, self.host, self.port, max_size=None, ping_interval=None
+        )
+        logger.success(f"Stub LLM server on ws://{self.host}:{self.port}")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def build_response(self) -> str:
+        parts = []
+        if self.config.think:
+            parts.append("<think>The user is talking to me, I should answer warmly.</think>")
+
+        for i in range(self.config.sentences):
+            sentence = self.random.choice(SENTENCES)
+            if self.config.tags and i == 0:
+                parts.append(f'|emotion="{self.random.choice(EMOTIONS)}"|')
+            if self.config.tags and i == 1:
+                parts.append(f'|animate="{self.random.choice(ANIMATIONS)}":OnDelay(0.5)|')
+            parts.append(sentence + " ")
+
+        if self.config.function_calls:
+            parts.append('<function_call>{"name": "get_time", "arguments": {"timezone": "UTC"}}</function_call>')
+
+        return "".join(parts)
+
+    def tokenize(self, text: str):
+        size = max(1, self.config.chars_per_token)
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    async def _handle(self, websocket):
+        self.connections += 1
+        pending_parts = 0
+        pending_header = None
+        streaming = None
+
+        try:
+            async for message in websocket:
+                self.bytes_received += len(message)
+
+                if isinstance(message, bytes):
+                    if pending_parts > 0:
+                        pending_parts -= 1
+                        if pending_parts == 0 and pending_header is not None:
+                            streaming = await self._on_upload(websocket, pending_header, streaming)
+                            pending_header = None
+                    continue
+
+                data = codec.loads(message)
+                msg_type = data.get("type")
+
+                if msg_type == MessageType.HELLO:
+                    await websocket.send(codec.dumps({
+                        "type": MessageType.HELLO,
+                        "capabilities": [
+                            BINARY_UPLOAD_CAPABILITY, AUDIO_STREAM_CAPABILITY, CANCEL_CAPABILITY,
+                            FUNCTION_RESULT_CAPABILITY,
+                        ],
+                    }))
+                elif msg_type == MessageType.PING:
+                    await websocket.send(codec.dumps({"type": MessageType.PONG}))
+                elif msg_type == MessageType.CANCEL:
+                    if streaming:
+                        streaming.cancel()
+                        streaming = None
+                    generation_id = data.get("generation_id")
+                    self.generations.pop(generation_id, None)
+                    self.cancelled += 1
+                    await websocket.send(codec.dumps({
+                        "type": MessageType.STATUS,
+                        "status": StatusType.CANCELLED,
+                        "generation_id": generation_id,
+                    }))
+                elif msg_type == MessageType.FUNCTION_RESULT:
+                    self.function_results.append(data)
+                elif msg_type == MessageType.RESUME:
+                    streaming = self._start(websocket, data.get("generation_id"), data.get("last_seq", -1))
+                elif "parts" in data and data["parts"]:
+                    pending_parts = len(data["parts"])
+                    pending_header = data
+                else:
+                    streaming = await self._on_upload(websocket, data, streaming)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            if streaming:
+                streaming.cancel()
+
+    async def _on_upload(self, websocket, data, streaming):
+        msg_type = data.get("type")
+        if msg_type in (MessageType.AUDIO_CHUNK, MessageType.AUDIO_CANCEL):
+            return streaming
+        if msg_type not in (
+            MessageType.AUDIO, MessageType.AUDIO_BINARY, MessageType.AUDIO_COMMIT, MessageType.TEXT
+        ):
+            return streaming
+
+        self.turns += 1
+        identity_ids = data.get("identity_ids", [])
+        await websocket.send(codec.dumps({
+            "type": MessageType.IDENTITY,
+            "identity_ids": identity_ids,
+            "profiles": [
+                {"identity_id": identity_id, "name": None, "is_first_meeting": False}
+                for identity_id in identity_ids
+            ],
+        }))
+
+        if self.random.random() < self.config.error_rate:
+            await websocket.send(codec.dumps({"type": MessageType.ERROR, "error": "stub failure"}))
+            return streaming
+
+        generation_id = data.get("turn_id") or uuid.uuid4().hex[:8]
+        self.generations[generation_id] = Generation(
+            generation_id, self.tokenize(self.build_response())
+        )
+        return self._start(websocket, generation_id, -1, fresh=True)
+
+    def _start(self, websocket, generation_id, last_seq: int, fresh: bool = False):
+        generation = self.generations.get(generation_id)
+        if generation is None:
+            return None
+        return asyncio.create_task(self._stream(websocket, generation, last_seq + 1, fresh))
+
+    async def _stream(self, websocket, generation: Generation, start: int, fresh: bool):
+        try:
+            await websocket.send(codec.dumps({
+                "type": MessageType.STATUS,
+                "status": StatusType.GENERATING,
+                "generation_id": generation.generation_id,
+            }))
+
+            if fresh and self.config.first_token_latency > 0:
+                await asyncio.sleep(self.config.first_token_latency)
+            if fresh:
+                await websocket.send(codec.dumps({
+                    "type": MessageType.STATS,
+                    "stat": StatsType.FIRST_TOKEN,
+                    "time": time.monotonic() - generation.started,
+                }))
+
+            interval = 1.0 / self.config.tokens_per_sec if self.config.tokens_per_sec > 0 else 0.0
+            next_at = time.monotonic()
+            for seq in range(start, len(generation.tokens)):
+                await websocket.send(codec.dumps({
+                    "type": MessageType.TEXT,
+                    "text": generation.tokens[seq],
+                    "seq": seq,
+                }))
+                self.tokens_sent += 1
+                next_at += interval
+                delay = next_at - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                elif interval == 0:
+                    await asyncio.sleep(0)
+
+            elapsed = time.monotonic() - generation.started
+            await websocket.send(codec.dumps({
+                "type": MessageType.STATS,
+                "stat": StatsType.COMPLETE,
+                "tokens": len(generation.tokens),
+                "time": elapsed,
+                "tok_per_sec": len(generation.tokens) / elapsed if elapsed > 0 else 0.0,
+            }))
+            await websocket.send(codec.dumps({
+                "type": MessageType.STATUS,
+                "status": StatusType.DONE,
+                "generation_id": generation.generation_id,
+            }))
+            self.generations.pop(generation.generation_id, None)
+        except (websockets.exceptions.ConnectionClosed, asyncio.CancelledError):
+            pass
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0)
+    parser.add_argument("--first-token-latency", type=float, default=0.3)
+    parser.add_argument("--sentences", type=int, default=3)
+    parser.add_argument("--chars-per-token", type=int, default=4)
+    parser.add_argument("--think", action="store_true")
+    parser.add_argument("--no-tags", action="store_true")
+    parser.add_argument("--function-calls", action="store_true")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def stub_config_from_args(args) -> StubConfig:
+    return StubConfig(
+        tokens_per_sec=args.tokens_per_sec,
+        first_token_latency=args.first_token_latency,
+        sentences=args.sentences,
+        chars_per_token=args.chars_per_token,
+        think=args.think,
+        tags=not args.no_tags,
+        function_calls=args.function_calls,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Stand-in LLM server speaking the Annie Mie protocol")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = StubLLMServer(args.host, args.port, stub_config_from_args(args))
+    await server.start()
+    await asyncio.Future()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,277 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+cv2.setNumThreads(1)
+
+from handler.frame_overlay import render_overlay_frame
+from handler.frame_selector import FrameSelector
+from handler.identity_store import IdentityStore
+from handler.stream_parser import StreamParser
+from handler.tts_sequence import TTSHandler
+from network.upload_protocol import build_upload_message
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+SENTENCES = [
+    "Hello there, it is good to see you again.",
+    "I was just thinking about what you said earlier, and it made me smile.",
+    "The weather looks lovely today, doesn't it?",
+    "Version 2.5 of the app shipped... finally!",
+    "Let me know if there is anything else I can help with.",
+    "Really? That sounds like a wonderful idea to me!",
+]
+
+
+def make_response(rng: random.Random, sentences: int, think: bool = True, tags: bool = True) -> str:
+    parts = []
+    if think:
+        parts.append("<think>" + " ".join(rng.choice(SENTENCES) for _ in range(4)) + "</think>")
+    for i in range(sentences):
+        if tags and i % 5 == 0:
+            parts.append(f'|emotion="{rng.choice(["happy", "calm", "curious"])}"|')
+        if tags and i % 7 == 3:
+            parts.append('|animate="wave":OnDelay(0.5)|')
+        parts.append(rng.choice(SENTENCES) + " ")
+        if i % 6 == 5:
+            parts.append("\n\n")
+    return "".join(parts)
+
+
+def tokenize(text: str, size: int = 4):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def make_jpeg(width: int, height: int, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    image = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (0, 0), 3)
+    _, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 75])
+    return data.tobytes()
+
+
+class Case:
+
+    def __init__(self, name: str, fn, ops: int = 1, repeat: int = 7, warmup: int = 1):
+        self.name = name
+        self.fn = fn
+        self.ops = ops
+        self.repeat = repeat
+        self.warmup = warmup
+
+    def run(self) -> dict:
+        for _ in range(self.warmup):
+            self.fn()
+
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            self.fn()
+            timings.append(time.perf_counter() - start)
+
+        median = statistics.median(timings)
+        return {
+            "median_s": median,
+            "min_s": min(timings),
+            "max_s": max(timings),
+            "ops": self.ops,
+            "per_op_us": median / self.ops * 1e6,
+            "repeat": self.repeat,
+        }
+
+
+def parser_cases():
+    rng = random.Random(1)
+    tokens = tokenize(make_response(rng, 400))
+
+    def run():
+        parser = StreamParser()
+        parser.on_text = lambda text: None
+        for token in tokens:
+            parser.feed(token)
+        parser.finish()
+
+    return [Case("stream_parser.feed", run, ops=len(tokens))]
+
+
+def tts_cases():
+    rng = random.Random(2)
+    text = make_response(rng, 120, think=False, tags=False)
+
+    async def feed_chars():
+        handler = TTSHandler()
+        for char in text:
+            handler.feed_text(char)
+        await asyncio.sleep(0)
+
+    loop = asyncio.new_event_loop()
+
+    def run():
+        loop.run_until_complete(feed_chars())
+
+    return [Case("tts.feed_text", run, ops=len(text), repeat=5)]
+
+
+def identity_cases():
+    cases = []
+    rng = np.random.default_rng(3)
+    storage = tempfile.mkdtemp(prefix="annie_bench_")
+
+    for count, repeat, lookups in ((10, 7, 200), (1000, 5, 20), (100000, 3, 1)):
+        store = IdentityStore(storage)
+        embeddings = rng.standard_normal((count, 512)).astype(np.float32)
+        store.embeddings = {f"id-{i:06d}": embeddings[i] for i in range(count)}
+        store.identities = {key: {"id": key} for key in store.embeddings}
+        probes = [embeddings[rng.integers(count)] + 0.1 * rng.standard_normal(512).astype(np.float32)
+                  for _ in range(lookups)]
+
+        def run(store=store, probes=probes):
+            for probe in probes:
+                store.find_identity(probe)
+
+        cases.append(Case(f"identity_store.find_identity[{count}]", run, ops=lookups, repeat=repeat))
+
+    return cases
+
+
+def payload_cases():
+    rng = np.random.default_rng(4)
+    audio = rng.integers(0, 255, 48000, dtype=np.uint8).tobytes()
+    frames = [make_jpeg(640, 480, seed) for seed in range(6)]
+    window = [frames[i % len(frames)] for i in range(180)]
+    metadata = {"turn_id": "bench", "audio_format": "flac", "session_name": "bench", "identity_ids": ["id-1"]}
+    selector = FrameSelector()
+    selected = selector.select(window)
+
+    return [
+        Case("payload.select_frames", lambda: selector.select(window, [(160, 120, 320, 360)], (480, 640))),
+        Case("payload.build_json", lambda: [build_upload_message(metadata, audio, selected, False)
+                                            for _ in range(20)], ops=20),
+        Case("payload.build_binary", lambda: [build_upload_message(metadata, audio, selected, True)
+                                              for _ in range(1000)], ops=1000),
+    ]
+
+
+def overlay_cases():
+    frame = cv2.imdecode(np.frombuffer(make_jpeg(640, 480), np.uint8), cv2.IMREAD_COLOR)
+    faces = [
+        {"bbox": (120, 100, 260, 280), "identity_id": "id-1234abcd", "det_score": 0.91},
+        {"bbox": (380, 120, 500, 300), "identity_id": "unknown", "det_score": 0.72},
+    ]
+
+    return [
+        Case("frame_server.overlay_encode", lambda: render_overlay_frame(frame.copy(), faces), repeat=20),
+        Case("frame_server.encode_only", lambda: render_overlay_frame(frame.copy(), []), repeat=20),
+    ]
+
+
+SUITES = [parser_cases, tts_cases, identity_cases, payload_cases, overlay_cases]
+
+
+def calibrate(repeat: int = 7) -> float:
+    data = np.arange(200000, dtype=np.float32)
+
+    def reference():
+        total = 0
+        for i in range(100000):
+            total += i * i
+        np.sort(data[::-1])
+        return total
+
+    return Case("calibration", reference, repeat=repeat).run()["min_s"]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(results: dict, calibration: float, baseline: dict, threshold: float) -> list:
+    baseline_calibration = baseline.get("meta", {}).get("calibration_s", calibration)
+    regressions = []
+    print(f"\nAgainst baseline {baseline.get('meta', {}).get('commit', '?')} (threshold {threshold:.0%})")
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            print(f"  {name:<40} new")
+            continue
+        # Best-of-N, scaled by a fixed reference workload, so a busier or
+        # throttled machine does not read as a regression
+        change = (current["min_s"] / calibration) / (previous["min_s"] / baseline_calibration) - 1.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<40} {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-path microbenchmarks (no camera, mic or network)")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this string")
+    parser.add_argument("--output", default=None, help="Where to write the JSON results")
+    parser.add_argument("--baseline", default=None, help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown before failing")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    calibration = calibrate()
+    results = {}
+    for suite in SUITES:
+        for case in suite():
+            if args.filter and args.filter not in case.name:
+                continue
+            result = case.run()
+            results[case.name] = result
+            print(f"  {case.name:<40} {result['median_s'] * 1000:9.3f} ms  {result['per_op_us']:10.2f} us/op")
+
+    calibration = min(calibration, calibrate())
+
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "calibration_s": calibration,
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {len(results)} results to {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, calibration, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
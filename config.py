@@ -16,6 +16,7 @@ RATE = 16000
 CHUNK_SIZE = 512
 AUDIO_FORMAT = "flac"
 FLAC_COMPRESSION = 5
+IN_MEMORY_SEGMENTS = True
 
 SPIKE_FACTOR = 2.5
 STOP_FACTOR = 2.5
@@ -35,14 +36,109 @@ BUFFER_DURATION = 30.0
 
 DEBUG_MESSAGE_STATS = True
 
+BINARY_UPLOAD = True
+PROTOCOL_NEGOTIATION_TIMEOUT = 1.0
+STREAM_AUDIO = True
+
+RECONNECT_BASE_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30.0
+OUTBOUND_QUEUE_MAX_ITEMS = 8
+OUTBOUND_QUEUE_MAX_AGE = 30.0
+OUTBOUND_QUEUE_MAX_BYTES = 16 * 1024 * 1024
+
+EXECUTOR_THREAD_WORKERS = 4
+EXECUTOR_PROCESS_WORKERS = 0
+LOOP_MONITOR_ENABLED = False
+LOOP_MONITOR_INTERVAL = 0.05
+LOOP_MONITOR_REPORT_SECS = 30.0
+
+SPEECH_EVENT_POLL_INTERVAL = 0.1
+SPEECH_EVENT_WAIT_TIMEOUT = 1.0
+
+JSON_CODEC = "auto"
+
+BARGE_IN_ENABLED = True
+BARGE_IN_MIN_SPEECH_SECS = 0.25
+BARGE_IN_SPIKE_FACTOR = 4.0
+
+SEMANTIC_ENDPOINTING = False
+ENDPOINT_PAUSE_SECS = 0.3
+SEMANTIC_TURN_THRESHOLD = 0.7
+
+TTS_ENGINE = "tone"
+TTS_VOICE = "default"
+TTS_SAMPLE_RATE = 24000
+TTS_CHARS_PER_SEC = 20.0
+TTS_TONE_SECS_PER_CHAR = 0.004
+TTS_TONE_FIRST_BYTE_SECS = 0.05
+TTS_LOOKAHEAD = 2
+TTS_LOOKAHEAD_MAX_BYTES = 8 * 1024 * 1024
+TTS_CHUNK_POLICY = "adaptive"
+TTS_FIRST_CHUNK_WORDS = 6
+TTS_FIRST_CHUNK_MIN_WORDS = 2
+TTS_CHUNK_GROWTH = 2.0
+TTS_EARLY_CHUNKS = 3
+TTS_CACHE_ENABLED = True
+TTS_CACHE_MEMORY_BYTES = 32 * 1024 * 1024
+TTS_CACHE_DISK_BYTES = 256 * 1024 * 1024
+TTS_CACHE_MAX_CHARS = 200
+
+AUDIO_OUTPUT_SINK = "null"
+AUDIO_OUTPUT_DEVICE = ""
+AUDIO_OUTPUT_JITTER_SECS = 0.06
+AUDIO_OUTPUT_BUFFER_SECS = 2.0
+AUDIO_OUTPUT_BLOCK_SECS = 0.02
+
+TOOLS_ENABLED = True
+TOOL_TIMEOUT = 5.0
+
+TURN_TRACE_CAPACITY = 200
+TURN_TRACE_REPORT_SECS = 300.0
+
+METRICS_ENABLED = True
+METRICS_HOST = "localhost"
+METRICS_PORT = 8770
+
+FRAME_SELECT_MAX = 3
+FRAME_SELECT_CANDIDATES = 30
+FRAME_SELECT_BYTE_BUDGET = 256 * 1024
+FRAME_SELECT_SHARPNESS_WEIGHT = 1.0
+FRAME_SELECT_MOTION_WEIGHT = 0.5
+FRAME_SELECT_FACE_WEIGHT = 1.0
+FRAME_SELECT_MIN_DIFFERENCE = 4.0
+
+ADAPTIVE_UPLOAD = True
+UPLOAD_LATENCY_TARGET = 0.5
+UPLOAD_AUDIO_ONLY_WHEN_SATURATED = True
+BANDWIDTH_EWMA_ALPHA = 0.3
+BANDWIDTH_MIN_SAMPLE_BYTES = 32 * 1024
+UPLOAD_QUALITY_LEVELS = [
+    (1.0, JPEG_QUALITY),
+    (0.75, 70),
+    (0.5, 60),
+    (0.5, 45),
+    (0.33, 40),
+]
+
+SESSIONS = {
+    "default": {},
+}
+SESSION_MAX_SESSIONS = 8
+SESSION_MAX_WEB_CLIENTS = 4
+SESSION_MEMORY_LIMIT_MB = 128
+SESSION_IDLE_TIMEOUT = 600.0
+SESSION_TOTAL_MEMORY_LIMIT_MB = 0
+SESSION_MIN_BUFFER_SECS = 5.0
+SESSION_BASE_MEMORY_MB = 16
+SESSION_JPEG_BYTES_PER_PIXEL = 0.15
+SESSION_MAX_SPEECH_SECS = 30.0
+
 SILERO_REPO = "snakers4/silero-vad"
 SILERO_MODEL = "silero_vad"
 SILERO_THRESHOLD = 0.5
 SILERO_FORCE_RELOAD = False
 SILERO_SAMPLE_RATE = 16000
 
-LLM_BUSY_FLAG = BASE_DIR / ".llm_busy"
-
 
 def get_recorder_config():
     return {
@@ -58,6 +154,11 @@ def get_recorder_config():
         "min_record_seconds": float(MIN_RECORD_SECONDS),
         "background_alpha": float(BACKGROUND_ALPHA),
         "output_directory": OUT_DIR,
+        "stream_audio": STREAM_AUDIO,
+        "input_device": "",
+        "onset_min_secs": float(BARGE_IN_MIN_SPEECH_SECS),
+        "barge_in_spike_factor": float(BARGE_IN_SPIKE_FACTOR),
+        "pause_secs": float(ENDPOINT_PAUSE_SECS) if SEMANTIC_ENDPOINTING else 0.0,
         "video_enabled": VIDEO_ENABLED,
         "camera_index": float(CAMERA_INDEX),
         "video_fps": float(VIDEO_FPS),
@@ -76,11 +177,21 @@ class MessageType:
     ERROR = "error"
     PING = "ping"
     PONG = "pong"
+    HELLO = "hello"
+    AUDIO_BINARY = "audio_binary"
+    AUDIO_CHUNK = "audio_chunk"
+    AUDIO_COMMIT = "audio_commit"
+    AUDIO_CANCEL = "audio_cancel"
+    RESUME = "resume"
+    IDENTITY = "identity"
+    CANCEL = "cancel"
+    FUNCTION_RESULT = "function_result"
 
 
 class StatusType:
     GENERATING = "generating"
     DONE = "done"
+    CANCELLED = "cancelled"
 
 
 class StatsType:
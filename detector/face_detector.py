@@ -3,9 +3,20 @@ import sys
 import logging
 import contextlib
 import io
+import threading
+import time
 import numpy as np
 from typing import List, Dict, Optional
+from utils.executor import executor
 from utils.logger import logger
+from utils.metrics import metrics
+
+
+FACE_DETECTIONS = metrics.counter("annie_face_detections_total", "Faces detected across all frames")
+FACE_DETECTION_RUNS = metrics.counter("annie_face_detection_runs_total", "Face detection inference calls")
+FACE_DETECTION_SECONDS = metrics.histogram(
+    "annie_face_detection_seconds", "Face detection inference latency"
+)
 
 
 def _suppress_onnx_logging():
@@ -24,6 +35,7 @@ class InsightFaceDetector:
         self.app = None
         self._initialized = False
         self._using_cuda = False
+        self._inference_lock = threading.Lock()
 
     def _setup_cuda_paths(self):
         if sys.platform != "win32":
@@ -125,7 +137,12 @@ class InsightFaceDetector:
             return []
 
         try:
-            faces = self.app.get(frame)
+            start = time.perf_counter()
+            with self._inference_lock:
+                faces = self.app.get(frame)
+            FACE_DETECTION_SECONDS.observe(time.perf_counter() - start)
+            FACE_DETECTION_RUNS.inc()
+            FACE_DETECTIONS.inc(len(faces))
 
             detected = []
             for idx, face in enumerate(faces):
@@ -149,6 +166,9 @@ class InsightFaceDetector:
             logger.error(f"Face detection error: {e}")
             return []
 
+    async def detect_faces_async(self, frame: np.ndarray) -> List[Dict]:
+        return await executor.run(self.detect_faces, frame)
+
     def get_embedding(self, frame: np.ndarray) -> Optional[np.ndarray]:
         faces = self.detect_faces(frame)
         if not faces:
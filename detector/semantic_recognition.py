@@ -1,9 +1,12 @@
+import threading
 import torch
 import soundfile as sf
 import librosa
 import numpy as np
 from transformers import AutoModelForAudioClassification, AutoFeatureExtractor
 from typing import Optional
+from config import SEMANTIC_TURN_THRESHOLD
+from utils.executor import executor
 from utils.logger import logger
 
 
@@ -15,6 +18,7 @@ class SemanticRecognition:
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
         self.model_name = "sanchit-gandhi/whisper-medium-fleurs-lang-id"
         self._initialized = False
+        self._inference_lock = threading.Lock()
 
     def initialize(self):
         if self._initialized:
@@ -36,14 +40,29 @@ class SemanticRecognition:
             logger.error(f"Failed to load semantic model: {e}")
             logger.info("Semantic recognition will be disabled")
 
-    def is_turn_complete(self, audio_path: str) -> bool:
+    def is_available(self) -> bool:
+        return self._initialized
+
+    @staticmethod
+    def _load_audio(audio, sample_rate: Optional[int]):
+        if isinstance(audio, np.ndarray):
+            if audio.dtype == np.int16:
+                audio = audio.astype(np.float32) / 32768.0
+            return audio, sample_rate or 16000
+        # Load audio using soundfile
+        return sf.read(audio)
+
+    def is_turn_complete(self, audio, sample_rate: Optional[int] = None, threshold: Optional[float] = None,
+                         raise_errors: bool = False) -> bool:
         if not self._initialized:
+            if raise_errors:
+                raise RuntimeError("Semantic recognition not initialized")
             logger.warning("Semantic recognition not initialized, defaulting to True")
             return True
 
+        threshold = threshold if threshold is not None else SEMANTIC_TURN_THRESHOLD
         try:
-            # Load audio using soundfile
-            audio_data, sample_rate = sf.read(audio_path)
+            audio_data, sample_rate = self._load_audio(audio, sample_rate)
 
             # Convert to mono if stereo
             if len(audio_data.shape) > 1:
@@ -68,19 +87,25 @@ class SemanticRecognition:
 
             inputs = {k: v.to(self.device) for k, v in inputs.items()}
 
-            with torch.no_grad():
+            with self._inference_lock, torch.no_grad():
                 outputs = self.model(**inputs)
                 logits = outputs.logits
 
             probabilities = torch.softmax(logits, dim=-1)
             max_prob = probabilities.max().item()
 
-            turn_complete = max_prob > 0.7
+            turn_complete = max_prob > threshold
 
             logger.info(f"Semantic turn detection: {'complete' if turn_complete else 'incomplete'} (confidence: {max_prob:.2f})")
 
             return turn_complete
 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error in semantic recognition: {e}")
             return True
+
+    async def is_turn_complete_async(self, audio, sample_rate: Optional[int] = None,
+                                     threshold: Optional[float] = None, raise_errors: bool = False) -> bool:
+        return await executor.run(self.is_turn_complete, audio, sample_rate, threshold, raise_errors)
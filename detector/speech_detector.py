@@ -3,6 +3,7 @@ import soundfile as sf
 import librosa
 import numpy as np
 import os
+import threading
 
 from config import (
     SILERO_REPO,
@@ -11,6 +12,7 @@ from config import (
     SILERO_FORCE_RELOAD,
     SILERO_SAMPLE_RATE
 )
+from utils.executor import executor
 from utils.logger import logger
 
 
@@ -23,9 +25,14 @@ class SpeechDetector:
         self.sample_rate = SILERO_SAMPLE_RATE
         self.get_speech_timestamps = None
         self._initialized = False
+        self._inference_lock = threading.Lock()
 
-    def read_audio(self, path):
-        audio_data, sr = sf.read(path)
+    def read_audio(self, source):
+        if isinstance(source, (str, os.PathLike)):
+            audio_data, sr = sf.read(source)
+        else:
+            audio_data = np.frombuffer(source, dtype=np.int16).astype(np.float32) / 32768.0
+            sr = source.sample_rate
 
         if len(audio_data.shape) > 1:
             audio_data = np.mean(audio_data, axis=1)
@@ -70,22 +77,26 @@ class SpeechDetector:
                 "SpeechDetector not initialized. Call initialize() first."
             )
 
-        if not os.path.exists(audio_file):
+        if isinstance(audio_file, (str, os.PathLike)) and not os.path.exists(audio_file):
             raise FileNotFoundError(f"Audio file not found: {audio_file}")
 
         wav = self.read_audio(audio_file)
 
         if len(wav) == 0:
-            logger.warning(f"Empty audio file: {audio_file}")
+            logger.warning(f"Empty audio segment: {audio_file}")
             return False
 
         wav = wav.to(self.device)
-        speech_timestamps = self.get_speech_timestamps(
-            wav, self.model, threshold=self.threshold
-        )
+        with self._inference_lock:
+            speech_timestamps = self.get_speech_timestamps(
+                wav, self.model, threshold=self.threshold
+            )
 
         return len(speech_timestamps) > 0
 
+    async def is_speech_async(self, audio_file):
+        return await executor.run(self.is_speech, audio_file)
+
     def detect_speech(self, audio_data_float):
         """
         Detect speech in a raw audio buffer (float32 numpy array or torch tensor).
@@ -120,9 +131,10 @@ class SpeechDetector:
         # If the chunk is very small, Silero might not work well without state.
         # But for 'detect_speech' simply checking if there is speech in this chunk:
         
-        speech_timestamps = self.get_speech_timestamps(
-            waveform, self.model, threshold=self.threshold
-        )
+        with self._inference_lock:
+            speech_timestamps = self.get_speech_timestamps(
+                waveform, self.model, threshold=self.threshold
+            )
         
         return len(speech_timestamps) > 0
 
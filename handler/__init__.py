@@ -1,4 +1,13 @@
 from handler.stream_parser import StreamParser
+from handler.tts_engine import SynthesizedAudio, TTSEngine, ToneEngine, create_engine
+from handler.chunk_policy import ChunkPolicy
+from handler.audio_output import AudioOutput, NullSink, RingBuffer, SoundDeviceSink, create_sink
+from handler.tts_cache import TTSCache, tts_cache
 from handler.tts_sequence import TTSHandler
+from handler.tag_scheduler import TagScheduler
+from handler.json_scanner import JsonObjectScanner
+from handler.tools import Tool, ToolCall, ToolCallError, ToolExecutor, ToolRegistry, default_registry
 from handler.identity_manager import IdentityManager
 from handler.identity_store import IdentityStore
+from handler.frame_selector import FrameSelector
+from handler.frame_overlay import draw_face_overlays, render_overlay_frame
@@ -0,0 +1,337 @@
+import asyncio
+import threading
+from typing import Callable, Optional
+
+import config
+from utils.logger import logger
+from utils.metrics import metrics
+
+try:
+    import sounddevice
+except (ImportError, OSError):
+    sounddevice = None
+
+
+AUDIO_UNDERRUNS = metrics.counter(
+    "annie_audio_underruns_total", "Playback ran out of buffered audio mid-stream", ["sink"]
+)
+AUDIO_OVERRUNS = metrics.counter(
+    "annie_audio_overruns_total", "Buffered audio dropped because the output buffer was full", ["sink"]
+)
+AUDIO_OUTPUT_LATENCY = metrics.histogram(
+    "annie_audio_output_latency_seconds",
+    "Time from writing a clip to its first sample reaching the sink",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.15, 0.25, 0.5, 1.0, 2.0),
+)
+
+SAMPLE_WIDTH = 2
+
+
+class RingBuffer:
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self._read = 0
+        self._size = 0
+        # Reentrant so AudioOutput can hold it across its own state changes
+        self.lock = threading.RLock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self._size
+
+    def write(self, data) -> int:
+        with self.lock:
+            n = min(len(data), self.capacity - self._size)
+            start = (self._read + self._size) % self.capacity
+            first = min(n, self.capacity - start)
+            self._buf[start:start + first] = data[:first]
+            self._buf[:n - first] = data[first:n]
+            self._size += n
+            return n
+
+    def read(self, n: int) -> bytes:
+        with self.lock:
+            n = min(n, self._size)
+            first = min(n, self.capacity - self._read)
+            data = bytes(self._buf[self._read:self._read + first]) + bytes(self._buf[:n - first])
+            self._read = (self._read + n) % self.capacity
+            self._size -= n
+            return data
+
+    def discard(self, n: int) -> int:
+        with self.lock:
+            n = min(n, self._size)
+            self._read = (self._read + n) % self.capacity
+            self._size -= n
+            return n
+
+    def clear(self) -> int:
+        with self.lock:
+            dropped = self._size
+            self._read = 0
+            self._size = 0
+            return dropped
+
+
+class NullSink:
+
+    name = "null"
+
+    def __init__(self):
+        self.latency = 0.0
+        self._task = None
+
+    def start(self, output: "AudioOutput"):
+        self._task = asyncio.create_task(self._clock(output))
+
+    async def _clock(self, output: "AudioOutput"):
+        # Consume blocks on the loop clock like a device would, and sleep
+        # while there is nothing to play
+        loop = asyncio.get_running_loop()
+        block = output.block_bytes
+        period = output.block_secs
+        while True:
+            await output.wait_active()
+            deadline = loop.time()
+            while not output.idle:
+                output.pull(block)
+                deadline += period
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class SoundDeviceSink:
+
+    name = "sounddevice"
+
+    def __init__(self, device=None):
+        self.device = device if device is not None else (config.AUDIO_OUTPUT_DEVICE or None)
+        self.latency = 0.0
+        self._stream = None
+
+    def start(self, output: "AudioOutput"):
+        if sounddevice is None:
+            raise RuntimeError("sounddevice is not installed")
+
+        def callback(outdata, frames, time_info, status):
+            outdata[:] = output.pull(frames * SAMPLE_WIDTH)
+
+        self._stream = sounddevice.RawOutputStream(
+            samplerate=output.sample_rate,
+            channels=1,
+            dtype="int16",
+            blocksize=int(output.sample_rate * output.block_secs),
+            device=self.device,
+            latency="low",
+            callback=callback,
+        )
+        self._stream.start()
+        self.latency = self._stream.latency
+
+    async def stop(self):
+        if self._stream is not None:
+            stream, self._stream = self._stream, None
+            stream.stop()
+            stream.close()
+
+
+SINKS = {
+    NullSink.name: NullSink,
+    SoundDeviceSink.name: SoundDeviceSink,
+}
+
+
+def create_sink(name: str = None):
+    name = name or config.AUDIO_OUTPUT_SINK
+    if name == SoundDeviceSink.name and sounddevice is None:
+        logger.warning("sounddevice is not available, playing TTS audio to the null sink")
+        name = NullSink.name
+    sink_cls = SINKS.get(name)
+    if sink_cls is None:
+        raise ValueError(f"Unknown audio sink '{name}' (available: {', '.join(SINKS)})")
+    return sink_cls()
+
+
+class AudioOutput:
+
+    def __init__(self, sink=None, sample_rate: int = None, jitter_secs: float = None,
+                 buffer_secs: float = None, block_secs: float = None):
+        self.sink = sink or create_sink()
+        self.sample_rate = sample_rate or config.TTS_SAMPLE_RATE
+        self.jitter_secs = jitter_secs if jitter_secs is not None else config.AUDIO_OUTPUT_JITTER_SECS
+        self.buffer_secs = buffer_secs if buffer_secs is not None else config.AUDIO_OUTPUT_BUFFER_SECS
+        self.block_secs = block_secs if block_secs is not None else config.AUDIO_OUTPUT_BLOCK_SECS
+        self.underruns = 0
+        self.overruns = 0
+        self._ring = None
+        self._loop = None
+        self._started = False
+        self._written = 0
+        self._consumed = 0
+        self._buffering = True
+        self._ending = False
+        self._playing = False
+        self._active = None
+        self._progress = None
+        self._configure()
+
+    def _configure(self):
+        bytes_per_sec = self.sample_rate * SAMPLE_WIDTH
+        self.block_bytes = max(SAMPLE_WIDTH, int(self.block_secs * self.sample_rate) * SAMPLE_WIDTH)
+        self.jitter_bytes = int(self.jitter_secs * self.sample_rate) * SAMPLE_WIDTH
+        capacity = int(self.buffer_secs * bytes_per_sec)
+        self._ring = RingBuffer(max(capacity, self.jitter_bytes + self.block_bytes))
+
+    async def start(self):
+        if self._started:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._active = asyncio.Event()
+        self._progress = asyncio.Event()
+        self.sink.start(self)
+        self._started = True
+
+    async def stop(self):
+        if not self._started:
+            return
+        self._started = False
+        self.clear()
+        await self.sink.stop()
+
+    @property
+    def is_playing(self) -> bool:
+        return self._playing
+
+    @property
+    def idle(self) -> bool:
+        return self._buffering and not self._playing and self._ring.size == 0
+
+    @property
+    def buffered_secs(self) -> float:
+        return self._ring.size / SAMPLE_WIDTH / self.sample_rate
+
+    def delay(self) -> float:
+        # How long until audio written now is heard
+        wait = self.buffered_secs
+        if self._buffering:
+            wait = max(wait, self.jitter_secs)
+        return wait + self.sink.latency
+
+    async def wait_active(self):
+        await self._active.wait()
+        self._active.clear()
+
+    async def play(self, pcm: bytes, sample_rate: int, more: Callable[[], bool] = None):
+        if not pcm:
+            return
+        if sample_rate != self.sample_rate:
+            logger.warning(f"Reopening audio output at {sample_rate} Hz (was {self.sample_rate} Hz)")
+            await self.stop()
+            self.sample_rate = sample_rate
+            self._configure()
+        await self.start()
+
+        AUDIO_OUTPUT_LATENCY.observe(self.delay())
+        await self.write(pcm)
+        end = self._written
+        if more is not None and more():
+            # Return while the jitter reserve still plays so the next clip
+            # lands behind it without a gap
+            await self._wait_consumed(end - self.jitter_bytes)
+        else:
+            with self._ring.lock:
+                self._ending = True
+            await self._wait_consumed(end)
+            # The last block is still playing until the sink asks for more
+            while self._playing:
+                self._progress.clear()
+                await self._progress.wait()
+
+    async def write(self, pcm: bytes):
+        view = memoryview(pcm)
+        with self._ring.lock:
+            self._ending = False
+        while view:
+            with self._ring.lock:
+                n = self._ring.write(view)
+                self._written += n
+            view = view[n:]
+            self._active.set()
+            if not view:
+                break
+            try:
+                await self._wait_progress(self.buffer_secs)
+            except asyncio.TimeoutError:
+                # The sink stopped draining; drop the oldest audio to keep up
+                need = min(len(view), self._ring.capacity)
+                with self._ring.lock:
+                    dropped = self._ring.discard(need)
+                    self._consumed += dropped
+                self.overruns += 1
+                AUDIO_OVERRUNS.inc(sink=self.sink.name)
+
+    def pull(self, nbytes: int) -> bytes:
+        # Called by the sink for every block, from the loop or a device
+        # thread; the ring's lock keeps it atomic with clear() and write()
+        with self._ring.lock:
+            if self._buffering:
+                if self._ring.size >= self.jitter_bytes or (self._ending and self._ring.size > 0):
+                    self._buffering = False
+                else:
+                    if self._playing:
+                        self._playing = False
+                        self._notify()
+                    return bytes(nbytes)
+
+            data = self._ring.read(nbytes)
+            self._consumed += len(data)
+            self._playing = bool(data)
+            if len(data) < nbytes:
+                if not self._ending:
+                    self.underruns += 1
+                    AUDIO_UNDERRUNS.inc(sink=self.sink.name)
+                self._buffering = True
+                data += bytes(nbytes - len(data))
+        self._notify()
+        return data
+
+    def clear(self) -> int:
+        with self._ring.lock:
+            dropped = self._ring.clear()
+            self._consumed = self._written
+            self._buffering = True
+            self._ending = False
+            self._playing = False
+        self._notify()
+        return dropped
+
+    def _notify(self):
+        if self._loop is None or self._progress is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._progress.set)
+        except RuntimeError:
+            pass
+
+    async def _wait_progress(self, timeout: Optional[float] = None):
+        self._progress.clear()
+        await asyncio.wait_for(self._progress.wait(), timeout)
+
+    async def _wait_consumed(self, target: int):
+        while self._consumed < target:
+            self._progress.clear()
+            await self._progress.wait()
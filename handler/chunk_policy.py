@@ -0,0 +1,53 @@
+import re
+from typing import Tuple
+
+import config
+
+
+CLAUSE_END = re.compile(
+    r"[,;:，、；：](?=[ \n\t\r])"
+    r"|[ \t][-–—](?=[ \t])"
+    r"|[ \t](?=(?:and|but|or|so|because|then|which)[ \t])",
+    re.IGNORECASE,
+)
+WORD = re.compile(r"\S+(?=\s)")
+
+
+class ChunkPolicy:
+
+    def __init__(self, first_words: int = None, min_clause_words: int = None, growth: float = None,
+                 early_chunks: int = None):
+        self.first_words = first_words if first_words is not None else config.TTS_FIRST_CHUNK_WORDS
+        self.min_clause_words = (
+            min_clause_words if min_clause_words is not None else config.TTS_FIRST_CHUNK_MIN_WORDS
+        )
+        self.growth = growth if growth is not None else config.TTS_CHUNK_GROWTH
+        self.early_chunks = early_chunks if early_chunks is not None else config.TTS_EARLY_CHUNKS
+
+    def allows_early_cut(self, chunk_index: int) -> bool:
+        return chunk_index < self.early_chunks
+
+    def find_cut(self, buffer: str, chunk_index: int) -> Tuple[int, str]:
+        # Early chunks end at the first clause boundary with enough words in
+        # front of it, or after a word budget; both grow with each chunk so
+        # later chunks settle into whole sentences
+        scale = self.growth ** chunk_index
+        min_words = max(1, int(self.min_clause_words * scale))
+        max_words = max(1, int(self.first_words * scale))
+
+        word_cut = -1
+        for count, match in enumerate(WORD.finditer(buffer), 1):
+            if count == max_words:
+                word_cut = match.end()
+                break
+
+        for match in CLAUSE_END.finditer(buffer):
+            cut = match.end()
+            if 0 <= word_cut < cut:
+                break
+            if len(buffer[:cut].split()) >= min_words:
+                return cut, "clause"
+
+        if word_cut >= 0:
+            return word_cut, "words"
+        return -1, ""
@@ -0,0 +1,38 @@
+import cv2
+import numpy as np
+from typing import Dict, List, Optional
+
+OVERLAY_COLOR = (76, 175, 80)
+OVERLAY_JPEG_QUALITY = 85
+
+
+def draw_face_overlays(frame: np.ndarray, faces: List[Dict]) -> np.ndarray:
+    for face in faces:
+        bbox = face.get("bbox", [])
+        if len(bbox) < 4:
+            continue
+
+        x, y, x2, y2 = [int(v) for v in bbox[:4]]
+
+        identity_id = face.get("identity_id", "?")
+        short_id = identity_id[-8:] if len(identity_id) > 8 else identity_id
+        score = face.get("det_score", 0.0)
+        label = f"{short_id} {score:.0%}"
+
+        cv2.rectangle(frame, (x, y), (x2, y2), OVERLAY_COLOR, 2)
+
+        (tw, th), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+        cv2.rectangle(frame, (x, y - th - 10), (x + tw + 10, y), OVERLAY_COLOR, -1)
+        cv2.putText(frame, label, (x + 5, y - 5),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+    return frame
+
+
+def render_overlay_frame(frame: np.ndarray, faces: List[Dict],
+                         quality: int = OVERLAY_JPEG_QUALITY) -> Optional[bytes]:
+    if faces:
+        draw_face_overlays(frame, faces)
+
+    ok, data = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return data.tobytes() if ok else None
@@ -0,0 +1,175 @@
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import config
+from utils.logger import logger
+
+
+class FrameSelector:
+
+    def __init__(
+        self,
+        max_frames: int = None,
+        candidates: int = None,
+        byte_budget: int = None,
+        sharpness_weight: float = None,
+        motion_weight: float = None,
+        face_weight: float = None,
+        min_difference: float = None,
+    ):
+        self.max_frames = max_frames if max_frames is not None else config.FRAME_SELECT_MAX
+        self.candidates = candidates if candidates is not None else config.FRAME_SELECT_CANDIDATES
+        self.byte_budget = byte_budget if byte_budget is not None else config.FRAME_SELECT_BYTE_BUDGET
+        self.sharpness_weight = (
+            sharpness_weight if sharpness_weight is not None else config.FRAME_SELECT_SHARPNESS_WEIGHT
+        )
+        self.motion_weight = motion_weight if motion_weight is not None else config.FRAME_SELECT_MOTION_WEIGHT
+        self.face_weight = face_weight if face_weight is not None else config.FRAME_SELECT_FACE_WEIGHT
+        self.min_difference = (
+            min_difference if min_difference is not None else config.FRAME_SELECT_MIN_DIFFERENCE
+        )
+
+    def frame_limit(self, total: int) -> int:
+        return max(1, min(self.max_frames, total // 60 + 1))
+
+    def candidate_indices(self, total: int) -> List[int]:
+        if total <= self.candidates:
+            return list(range(total))
+        return np.linspace(0, total - 1, self.candidates).round().astype(int).tolist()
+
+    @staticmethod
+    def decode_thumbnails(frames: Sequence[bytes], indices: Sequence[int] = None) -> Tuple[np.ndarray, List[int]]:
+        thumbs = []
+        valid = []
+        shape = None
+        for i in indices if indices is not None else range(len(frames)):
+            image = cv2.imdecode(np.frombuffer(frames[i], dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+            if image is None:
+                continue
+            if shape is None:
+                shape = image.shape
+            elif image.shape != shape:
+                image = cv2.resize(image, (shape[1], shape[0]), interpolation=cv2.INTER_AREA)
+            thumbs.append(image)
+            valid.append(i)
+
+        if not thumbs:
+            return np.empty((0, 0, 0), dtype=np.float32), valid
+        return np.stack(thumbs).astype(np.float32), valid
+
+    @staticmethod
+    def sharpness(stack: np.ndarray) -> np.ndarray:
+        lap = (
+            4.0 * stack[:, 1:-1, 1:-1]
+            - stack[:, :-2, 1:-1]
+            - stack[:, 2:, 1:-1]
+            - stack[:, 1:-1, :-2]
+            - stack[:, 1:-1, 2:]
+        )
+        return lap.reshape(len(stack), -1).var(axis=1)
+
+    @staticmethod
+    def motion(stack: np.ndarray) -> np.ndarray:
+        scores = np.zeros(len(stack), dtype=np.float32)
+        if len(stack) > 1:
+            scores[1:] = np.abs(stack[1:] - stack[:-1]).mean(axis=(1, 2))
+        return scores
+
+    @staticmethod
+    def face_region(
+        face_boxes: Optional[Sequence[Tuple[int, int, int, int]]],
+        frame_shape: Optional[Tuple[int, int]],
+        thumb_shape: Tuple[int, int],
+    ) -> Optional[Tuple[slice, slice]]:
+        if not face_boxes or not frame_shape:
+            return None
+
+        boxes = np.asarray(face_boxes, dtype=np.float32)
+        scale_y = thumb_shape[0] / frame_shape[0]
+        scale_x = thumb_shape[1] / frame_shape[1]
+        x1 = int(max(0, boxes[:, 0].min() * scale_x))
+        y1 = int(max(0, boxes[:, 1].min() * scale_y))
+        x2 = int(min(thumb_shape[1], np.ceil(boxes[:, 2].max() * scale_x)))
+        y2 = int(min(thumb_shape[0], np.ceil(boxes[:, 3].max() * scale_y)))
+        if x2 - x1 < 3 or y2 - y1 < 3:
+            return None
+        return slice(y1, y2), slice(x1, x2)
+
+    @staticmethod
+    def _normalize(values: np.ndarray) -> np.ndarray:
+        peak = values.max() if len(values) else 0.0
+        if peak <= 0:
+            return np.zeros_like(values)
+        return values / peak
+
+    def score(
+        self,
+        stack: np.ndarray,
+        face_boxes: Optional[Sequence[Tuple[int, int, int, int]]] = None,
+        frame_shape: Optional[Tuple[int, int]] = None,
+    ) -> Dict[str, np.ndarray]:
+        sharp = self._normalize(self.sharpness(stack))
+        motion = self._normalize(self.motion(stack))
+
+        face = np.zeros(len(stack), dtype=np.float32)
+        region = self.face_region(face_boxes, frame_shape, stack.shape[1:])
+        if region is not None:
+            face = self._normalize(self.sharpness(stack[:, region[0], region[1]]))
+
+        total = (
+            self.sharpness_weight * sharp
+            + self.motion_weight * motion
+            + self.face_weight * face
+        )
+        return {"sharpness": sharp, "motion": motion, "face": face, "total": total}
+
+    def select(
+        self,
+        frames: Sequence[bytes],
+        face_boxes: Optional[Sequence[Tuple[int, int, int, int]]] = None,
+        frame_shape: Optional[Tuple[int, int]] = None,
+    ) -> List[bytes]:
+        if not frames:
+            return []
+
+        limit = self.frame_limit(len(frames))
+        if len(frames) <= limit and sum(len(f) for f in frames) <= self.byte_budget:
+            return list(frames)
+
+        stack, valid = self.decode_thumbnails(frames, self.candidate_indices(len(frames)))
+        if not valid:
+            return [frames[-1]]
+
+        scores = self.score(stack, face_boxes, frame_shape)["total"]
+        flat = stack.reshape(len(stack), -1)
+        positions = np.asarray(valid, dtype=np.float32)
+        min_gap = len(frames) / (2.0 * limit)
+        remaining = np.ones(len(stack), dtype=bool)
+        distance = np.full(len(stack), np.inf, dtype=np.float32)
+        gap = np.full(len(stack), np.inf, dtype=np.float32)
+
+        chosen = []
+        used = 0
+        while len(chosen) < limit and remaining.any():
+            adjusted = (
+                scores
+                * np.minimum(1.0, distance / self.min_difference)
+                * np.minimum(1.0, gap / min_gap)
+            )
+            adjusted[~remaining] = -np.inf
+            best = int(np.argmax(adjusted))
+            remaining[best] = False
+
+            size = len(frames[valid[best]])
+            if used + size > self.byte_budget and chosen:
+                continue
+
+            chosen.append(best)
+            used += size
+            distance = np.minimum(distance, np.abs(flat - flat[best]).mean(axis=1))
+            gap = np.minimum(gap, np.abs(positions - positions[best]))
+
+        selected = [frames[valid[i]] for i in sorted(chosen)]
+        logger.debug(f"Frame selection: {len(frames)} → {len(selected)} ({used / 1024:.1f} KB)")
+        return selected
@@ -2,6 +2,7 @@ import numpy as np
 from typing import Optional, Dict, List
 from detector.face_detector import InsightFaceDetector
 from handler.identity_store import IdentityStore
+from utils.executor import executor
 from utils.logger import logger
 
 
@@ -37,7 +38,8 @@ class IdentityManager:
         result = {
             "detected_ids": [],
             "num_faces": 0,
-            "new_ids": []
+            "new_ids": [],
+            "face_boxes": []
         }
 
         if video_frame is None:
@@ -57,6 +59,7 @@ class IdentityManager:
                 embedding = face["embedding"]
                 identity_id, is_new = self.identity_store.get_or_create_identity(embedding, threshold)
                 result["detected_ids"].append(identity_id)
+                result["face_boxes"].append(face["bbox"])
                 if is_new:
                     result["new_ids"].append(identity_id)
 
@@ -78,11 +81,15 @@ class IdentityManager:
             "detected_ids": result["detected_ids"],
             "num_faces": result["num_faces"],
             "primary_id": result["detected_ids"][0] if result["detected_ids"] else None,
-            "new_ids": result["new_ids"]
+            "new_ids": result["new_ids"],
+            "face_boxes": result["face_boxes"]
         }
         
         return legacy_result
 
+    async def identify_speaker_async(self, video_frame: Optional[np.ndarray], threshold: float = 0.6) -> Dict:
+        return await executor.run(self.identify_speaker, video_frame, threshold)
+
     def get_all_identities(self) -> List[str]:
         return self.identity_store.get_all_identities()
 
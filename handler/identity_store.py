@@ -1,9 +1,11 @@
 import os
 import json
 import uuid
+import threading
 import numpy as np
 from pathlib import Path
 from typing import Optional, Dict, List, Tuple
+from utils.executor import executor
 from utils.logger import logger
 
 
@@ -18,6 +20,10 @@ class IdentityStore:
         self.identities: Dict[str, Dict] = {}
         self.embeddings: Dict[str, np.ndarray] = {}
         self._initialized = False
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._version = 0
+        self._written_version = 0
 
     def initialize(self):
         if self._initialized:
@@ -38,11 +44,28 @@ class IdentityStore:
             self.embeddings = {k: np.array(v, dtype=np.float32) for k, v in data.items()}
 
     def _save(self):
-        with open(self.identities_file, 'w', encoding='utf-8') as f:
-            json.dump(self.identities, f, indent=2, ensure_ascii=False)
-        
-        if self.embeddings:
-            np.save(self.embeddings_file, self.embeddings)
+        with self._lock:
+            self._version += 1
+            version = self._version
+            identities_json = json.dumps(self.identities, indent=2, ensure_ascii=False)
+            embeddings = dict(self.embeddings)
+
+        executor.submit(self._write, version, identities_json, embeddings)
+
+    def _write(self, version: int, identities_json: str, embeddings: Dict[str, np.ndarray]):
+        with self._write_lock:
+            if version <= self._written_version:
+                return
+
+            try:
+                with open(self.identities_file, 'w', encoding='utf-8') as f:
+                    f.write(identities_json)
+
+                if embeddings:
+                    np.save(self.embeddings_file, embeddings)
+                self._written_version = version
+            except Exception as e:
+                logger.error(f"Failed to save identities: {e}")
 
     def _cosine_similarity(self, emb1: np.ndarray, emb2: np.ndarray) -> float:
         norm1 = np.linalg.norm(emb1)
@@ -58,44 +81,50 @@ class IdentityStore:
         best_id = None
         best_score = threshold
         
-        for identity_id, stored_emb in self.embeddings.items():
-            score = self._cosine_similarity(face_embedding, stored_emb)
-            if score > best_score:
-                best_score = score
-                best_id = identity_id
+        with self._lock:
+            for identity_id, stored_emb in self.embeddings.items():
+                score = self._cosine_similarity(face_embedding, stored_emb)
+                if score > best_score:
+                    best_score = score
+                    best_id = identity_id
         
         return best_id
 
     def create_identity(self, face_embedding: np.ndarray) -> str:
         identity_id = f"id-{uuid.uuid4().hex[:8]}"
         
-        self.identities[identity_id] = {
-            "id": identity_id,
-            "name": None,
-            "created_at": str(np.datetime64('now'))
-        }
-        self.embeddings[identity_id] = face_embedding.astype(np.float32)
+        with self._lock:
+            self.identities[identity_id] = {
+                "id": identity_id,
+                "name": None,
+                "created_at": str(np.datetime64('now'))
+            }
+            self.embeddings[identity_id] = face_embedding.astype(np.float32)
         
         self._save()
         logger.info(f"Created new identity: {identity_id}")
         return identity_id
 
     def get_or_create_identity(self, face_embedding: np.ndarray, threshold: float = 0.6) -> Tuple[str, bool]:
-        existing_id = self.find_identity(face_embedding, threshold)
-        
-        if existing_id:
-            return existing_id, False
-        
-        new_id = self.create_identity(face_embedding)
-        return new_id, True
+        with self._lock:
+            existing_id = self.find_identity(face_embedding, threshold)
+            
+            if existing_id:
+                return existing_id, False
+            
+            new_id = self.create_identity(face_embedding)
+            return new_id, True
 
     def update_embedding(self, identity_id: str, new_embedding: np.ndarray):
-        if identity_id in self.identities:
+        with self._lock:
+            if identity_id not in self.identities:
+                return
             self.embeddings[identity_id] = new_embedding.astype(np.float32)
-            self._save()
+        self._save()
 
     def get_all_identities(self) -> List[str]:
-        return list(self.identities.keys())
+        with self._lock:
+            return list(self.identities.keys())
 
     def get_identity_info(self, identity_id: str) -> Optional[Dict]:
         return self.identities.get(identity_id)
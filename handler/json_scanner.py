@@ -0,0 +1,69 @@
+import re
+from typing import List
+
+
+STRUCTURAL = re.compile(r'[{}"\\]')
+
+
+class JsonObjectScanner:
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._parts: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def in_object(self) -> bool:
+        return self._depth > 0
+
+    def feed(self, text: str) -> List[str]:
+        complete = []
+        start = 0 if self._depth > 0 else -1
+        skip = 0
+        if self._escape and text:
+            self._escape = False
+            skip = 1
+
+        for match in STRUCTURAL.finditer(text, skip):
+            pos = match.start()
+            if pos < skip:
+                continue
+            char = match.group()
+
+            if self._in_string:
+                if char == "\\":
+                    skip = pos + 2
+                    if skip > len(text):
+                        self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    start = pos
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(text[start:pos + 1])
+                    complete.append("".join(self._parts))
+                    self._parts = []
+                    start = -1
+
+        if self._depth > 0:
+            self._parts.append(text[start:])
+        return complete
+
+    def pending(self) -> str:
+        return "".join(self._parts)
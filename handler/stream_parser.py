@@ -2,6 +2,12 @@ from typing import Callable, Optional, List, Dict
 from enum import Enum
 
 
+THINK_START = "<think>"
+THINK_END = "</think>"
+FUNCTION_START = "<function_call>"
+FUNCTION_END = "</function_call>"
+
+
 class ParserState(Enum):
     NORMAL = 0
     IN_TAG = 1
@@ -11,121 +17,178 @@ class ParserState(Enum):
 
 
 class StreamParser:
-    
+
     def __init__(self):
         self.state = ParserState.NORMAL
-        self.tag_buffer = ""
-        self.think_buffer = ""
-        self.function_buffer = ""
+        self.tag_parts: List[str] = []
+        self.think_parts: List[str] = []
+        self.function_parts: List[str] = []
         self.marker_buffer = ""
         self.parsed_tags: List[Dict] = []
         self.parsed_functions: List[str] = []
-        self.clean_text = ""
-        
+        self._text_parts: List[str] = []
+        self._text_len = 0
+        self._pending: List[str] = []
+
         self.on_text: Optional[Callable[[str], None]] = None
         self.on_tag: Optional[Callable[[Dict], None]] = None
         self.on_think_start: Optional[Callable[[], None]] = None
         self.on_think_end: Optional[Callable[[str], None]] = None
         self.on_function_call: Optional[Callable[[str], None]] = None
+        self.on_function_start: Optional[Callable[[], None]] = None
+        self.on_function_delta: Optional[Callable[[str], None]] = None
 
     def reset(self):
         self.state = ParserState.NORMAL
-        self.tag_buffer = ""
-        self.think_buffer = ""
-        self.function_buffer = ""
+        self.tag_parts = []
+        self.think_parts = []
+        self.function_parts = []
         self.marker_buffer = ""
         self.parsed_tags = []
         self.parsed_functions = []
-        self.clean_text = ""
+        self._text_parts = []
+        self._text_len = 0
+        self._pending = []
 
-    def feed(self, token: str):
-        for char in token:
-            self._process_char(char)
-
-    def _process_char(self, char: str):
-        if self.state == ParserState.IN_THINK:
-            self._handle_in_think(char)
-        elif self.state == ParserState.IN_TAG:
-            self._handle_in_tag(char)
-        elif self.state == ParserState.MAYBE_MARKER:
-            self._handle_maybe_marker(char)
-        elif self.state == ParserState.IN_FUNCTION_CALL:
-            self._handle_in_function(char)
-        else:
-            self._handle_normal(char)
+    @property
+    def clean_text(self) -> str:
+        if len(self._text_parts) > 1:
+            self._text_parts = ["".join(self._text_parts)]
+        return self._text_parts[0] if self._text_parts else ""
 
-    def _handle_normal(self, char: str):
-        if char == "|":
+    def feed(self, token: str):
+        i = 0
+        end = len(token)
+        while i < end:
+            state = self.state
+            if state == ParserState.NORMAL:
+                i = self._scan_normal(token, i)
+            elif state == ParserState.IN_TAG:
+                i = self._scan_tag(token, i)
+            elif state == ParserState.IN_THINK:
+                i = self._scan_block(token, i, self.think_parts, THINK_END, self._end_think)
+            elif state == ParserState.IN_FUNCTION_CALL:
+                i = self._scan_block(
+                    token, i, self.function_parts, FUNCTION_END, self._end_function, self.on_function_delta
+                )
+            else:
+                self._handle_maybe_marker(token[i])
+                i += 1
+        self._flush_text()
+
+    def _scan_normal(self, token: str, i: int) -> int:
+        bar = token.find("|", i)
+        angle = token.find("<", i, bar if bar >= 0 else len(token))
+        stop = angle if angle >= 0 else bar
+        if stop < 0:
+            self._pending.append(token[i:])
+            return len(token)
+
+        if stop > i:
+            self._pending.append(token[i:stop])
+        if stop == bar:
             self.state = ParserState.IN_TAG
-            self.tag_buffer = ""
-        elif char == "<":
+            self.tag_parts = []
+        else:
             self.marker_buffer = "<"
             self.state = ParserState.MAYBE_MARKER
-        else:
-            self._emit_text(char)
+        return stop + 1
 
-    def _handle_in_tag(self, char: str):
-        if char == "|":
-            self._parse_and_emit_tag(self.tag_buffer)
-            self.tag_buffer = ""
-            self.state = ParserState.NORMAL
-        else:
-            self.tag_buffer += char
+    def _scan_tag(self, token: str, i: int) -> int:
+        bar = token.find("|", i)
+        if bar < 0:
+            self.tag_parts.append(token[i:])
+            return len(token)
+
+        self.tag_parts.append(token[i:bar])
+        content = "".join(self.tag_parts)
+        self.tag_parts = []
+        self.state = ParserState.NORMAL
+        self._parse_and_emit_tag(content)
+        return bar + 1
+
+    def _scan_block(self, token: str, i: int, parts: List[str], marker: str, on_end, on_delta=None) -> int:
+        # The closing marker may straddle tokens, so search from the tail of
+        # what is already buffered
+        tail = self._tail(parts, len(marker) - 1)
+        found = (tail + token[i:]).find(marker)
+        if found < 0:
+            parts.append(token[i:])
+            if on_delta:
+                on_delta(token[i:])
+            return len(token)
+
+        stop = i + found + len(marker) - len(tail)
+        parts.append(token[i:stop])
+        if on_delta:
+            on_delta(token[i:stop])
+        content = "".join(parts)[:-len(marker)]
+        parts.clear()
+        self.state = ParserState.NORMAL
+        on_end(content)
+        return stop
+
+    @staticmethod
+    def _tail(parts: List[str], size: int) -> str:
+        tail = ""
+        for part in reversed(parts):
+            tail = part + tail
+            if len(tail) >= size:
+                break
+        return tail[-size:]
 
     def _handle_maybe_marker(self, char: str):
         self.marker_buffer += char
-        
-        if self.marker_buffer == "<think>":
+
+        if self.marker_buffer == THINK_START:
             self.state = ParserState.IN_THINK
-            self.think_buffer = ""
+            self.think_parts = []
             self.marker_buffer = ""
+            self._flush_text()
             if self.on_think_start:
                 self.on_think_start()
-        elif self.marker_buffer == "<function_call>":
+        elif self.marker_buffer == FUNCTION_START:
             self.state = ParserState.IN_FUNCTION_CALL
-            self.function_buffer = ""
+            self.function_parts = []
             self.marker_buffer = ""
-        elif not ("<think>".startswith(self.marker_buffer) or "<function_call>".startswith(self.marker_buffer)):
-            for c in self.marker_buffer:
-                self._emit_text(c)
+            self._flush_text()
+            if self.on_function_start:
+                self.on_function_start()
+        elif not (THINK_START.startswith(self.marker_buffer) or FUNCTION_START.startswith(self.marker_buffer)):
+            self._pending.append(self.marker_buffer)
             self.marker_buffer = ""
             self.state = ParserState.NORMAL
 
-    def _handle_in_think(self, char: str):
-        self.think_buffer += char
-        
-        if self.think_buffer.endswith("</think>"):
-            content = self.think_buffer[:-8]
-            self.think_buffer = ""
-            self.state = ParserState.NORMAL
-            if self.on_think_end:
-                self.on_think_end(content)
-
-    def _handle_in_function(self, char: str):
-        self.function_buffer += char
-        
-        if self.function_buffer.endswith("</function_call>"):
-            content = self.function_buffer[:-16]
-            self.function_buffer = ""
-            self.state = ParserState.NORMAL
-            self.parsed_functions.append(content)
-            if self.on_function_call:
-                self.on_function_call(content)
-
-    def _emit_text(self, text: str):
-        self.clean_text += text
+    def _end_think(self, content: str):
+        self._flush_text()
+        if self.on_think_end:
+            self.on_think_end(content)
+
+    def _end_function(self, content: str):
+        self._flush_text()
+        self.parsed_functions.append(content)
+        if self.on_function_call:
+            self.on_function_call(content)
+
+    def _flush_text(self):
+        if not self._pending:
+            return
+        text = "".join(self._pending) if len(self._pending) > 1 else self._pending[0]
+        self._pending = []
+        self._text_parts.append(text)
+        self._text_len += len(text)
         if self.on_text:
             self.on_text(text)
 
     def _parse_and_emit_tag(self, content: str):
         tag = None
-        
+
         content = content.replace('\\"', '"')
-        
+
         if content.startswith('emotion="') and content.endswith('"'):
             value = content[9:-1]
             tag = {"type": "emotion", "value": value}
-        
+
         elif content.startswith('animate="'):
             if ':OnDelay(' in content:
                 parts = content.split(':OnDelay(')
@@ -141,22 +204,19 @@ class StreamParser:
                 tag = {"type": "animate", "value": value}
 
         if tag:
-            tag["position"] = len(self.clean_text)
+            self._flush_text()
+            tag["position"] = self._text_len
             self.parsed_tags.append(tag)
             if self.on_tag:
                 self.on_tag(tag)
 
     def finish(self):
         if self.state == ParserState.MAYBE_MARKER and self.marker_buffer:
-            for c in self.marker_buffer:
-                self._emit_text(c)
+            self._pending.append(self.marker_buffer)
             self.marker_buffer = ""
-        
-        return {
-            "text": self.clean_text,
-            "tags": self.parsed_tags,
-            "function_calls": self.parsed_functions
-        }
+        self._flush_text()
+
+        return self.get_result()
 
     def get_result(self) -> Dict:
         return {
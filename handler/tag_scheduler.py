@@ -0,0 +1,112 @@
+import asyncio
+import heapq
+import itertools
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from utils.logger import logger
+from utils.metrics import metrics
+
+
+TAGS = metrics.counter(
+    "annie_tags_total", "Emotion and animate tags by outcome", ["type", "result"]
+)
+TAG_LATENESS = metrics.histogram(
+    "annie_tag_lateness_seconds",
+    "Tag fired after its playback-aligned time",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+# Tags due within this window of the one that woke the timer go out in the
+# same callback instead of re-arming for each of them
+BATCH_WINDOW = 0.005
+
+
+class TagScheduler:
+
+    def __init__(self, on_fire: Optional[Callable[[Dict], None]] = None):
+        self.on_fire = on_fire
+        self._waiting: Deque[Dict] = deque()
+        self._timeline: List[Tuple[float, int, Dict]] = []
+        self._seq = itertools.count()
+        self._chunk: Optional[Tuple[int, int, float, float]] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at: Optional[float] = None
+
+    def add(self, tag: Dict):
+        self._waiting.append(tag)
+        if self._chunk is not None:
+            self._place(*self._chunk)
+
+    def on_chunk_start(self, start: int, end: int, started_at: float, duration: float):
+        self._chunk = (start, end, started_at, duration)
+        self._place(start, end, started_at, duration)
+
+    def drain(self):
+        # Whatever is left sits at or past the end of the spoken text
+        if not self._waiting:
+            return
+        now = asyncio.get_running_loop().time()
+        while self._waiting:
+            self._push(now, self._waiting.popleft())
+        self._arm()
+
+    def reset(self) -> int:
+        dropped = len(self._waiting) + len(self._timeline)
+        for tag in self._waiting:
+            TAGS.inc(type=tag.get("type", ""), result="dropped")
+        for _, _, tag in self._timeline:
+            TAGS.inc(type=tag.get("type", ""), result="dropped")
+        self._waiting.clear()
+        self._timeline = []
+        self._chunk = None
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        self._timer_at = None
+        return dropped
+
+    def pending(self) -> int:
+        return len(self._waiting) + len(self._timeline)
+
+    def _place(self, start: int, end: int, started_at: float, duration: float):
+        span = max(1, end - start)
+        waiting = self._waiting
+        placed = False
+        while waiting and waiting[0].get("position", 0) < end:
+            tag = waiting.popleft()
+            offset = min(max(tag.get("position", 0) - start, 0), span) / span
+            self._push(started_at + offset * duration, tag)
+            placed = True
+        if placed:
+            self._arm()
+
+    def _push(self, at: float, tag: Dict):
+        heapq.heappush(self._timeline, (at + (tag.get("delay") or 0.0), next(self._seq), tag))
+
+    def _arm(self):
+        if not self._timeline:
+            return
+        due = self._timeline[0][0]
+        if self._timer is not None and self._timer_at <= due:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_at = due
+        self._timer = asyncio.get_running_loop().call_at(due, self._fire_due)
+
+    def _fire_due(self):
+        self._timer = None
+        self._timer_at = None
+        now = asyncio.get_running_loop().time()
+        timeline = self._timeline
+        while timeline and timeline[0][0] <= now + BATCH_WINDOW:
+            due, _, tag = heapq.heappop(timeline)
+            TAG_LATENESS.observe(max(0.0, now - due))
+            TAGS.inc(type=tag.get("type", ""), result="fired")
+            if self.on_fire:
+                try:
+                    self.on_fire(tag)
+                except Exception as e:
+                    logger.error(f"Tag callback failed: {e}")
+        self._arm()
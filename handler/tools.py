@@ -0,0 +1,175 @@
+import asyncio
+import inspect
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import config
+from utils.codec import codec
+from utils.executor import executor
+from utils.logger import logger
+from utils.metrics import metrics
+
+
+TOOL_CALLS = metrics.counter(
+    "annie_tool_calls_total", "Client-side tool calls by outcome", ["tool", "result"]
+)
+TOOL_LATENCY = metrics.histogram(
+    "annie_tool_seconds", "Client-side tool run time", ["tool"]
+)
+
+
+class ToolCallError(ValueError):
+    pass
+
+
+class Tool:
+
+    def __init__(self, name: str, handler: Callable, params: Dict[str, type] = None,
+                 optional: Dict[str, type] = None, timeout: float = None):
+        self.name = name
+        self.handler = handler
+        self.params = params or {}
+        self.optional = optional or {}
+        self.timeout = timeout if timeout is not None else config.TOOL_TIMEOUT
+        self.is_async = inspect.iscoroutinefunction(handler)
+
+    def validate(self, arguments: Dict):
+        for name in self.params:
+            if name not in arguments:
+                raise ToolCallError(f"{self.name}: missing argument '{name}'")
+        for name, value in arguments.items():
+            kind = self.params.get(name) or self.optional.get(name)
+            if kind is None:
+                raise ToolCallError(f"{self.name}: unexpected argument '{name}'")
+            if not isinstance(value, kind):
+                raise ToolCallError(f"{self.name}: '{name}' must be {kind.__name__}")
+
+
+class ToolCall:
+
+    __slots__ = ("call_id", "tool", "arguments", "generation_id", "parsed_at")
+
+    def __init__(self, call_id: str, tool: Tool, arguments: Dict, generation_id: Optional[str]):
+        self.call_id = call_id
+        self.tool = tool
+        self.arguments = arguments
+        self.generation_id = generation_id
+        self.parsed_at = time.time()
+
+
+class ToolRegistry:
+
+    def __init__(self):
+        self._tools: Dict[str, Tool] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def register(self, tool: Tool) -> Tool:
+        self._tools[tool.name] = tool
+        return tool
+
+    def get(self, name: str) -> Optional[Tool]:
+        return self._tools.get(name)
+
+    def names(self):
+        return list(self._tools)
+
+    def parse(self, raw: str, call_id: str, generation_id: Optional[str] = None) -> ToolCall:
+        try:
+            data = codec.loads(raw)
+        except ValueError as e:
+            raise ToolCallError(f"invalid function call JSON: {e}")
+        if not isinstance(data, dict):
+            raise ToolCallError("function call must be a JSON object")
+
+        name = data.get("name")
+        tool = self._tools.get(name)
+        if tool is None:
+            raise ToolCallError(f"unknown tool '{name}'")
+
+        arguments = data.get("arguments", {})
+        if isinstance(arguments, str):
+            # Some models double-encode the arguments object
+            try:
+                arguments = codec.loads(arguments) if arguments else {}
+            except ValueError as e:
+                raise ToolCallError(f"{name}: invalid arguments: {e}")
+        if not isinstance(arguments, dict):
+            raise ToolCallError(f"{name}: arguments must be an object")
+        tool.validate(arguments)
+
+        return ToolCall(str(data.get("id") or call_id), tool, arguments, generation_id)
+
+
+class ToolExecutor:
+
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def submit(self, call: ToolCall, on_result: Callable[[ToolCall, Any, Optional[str]], Awaitable]) -> asyncio.Task:
+        return self.spawn(self._run(call, on_result))
+
+    def spawn(self, work: Awaitable) -> asyncio.Task:
+        task = asyncio.create_task(work)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, call: ToolCall, on_result):
+        tool = call.tool
+        start = time.time()
+        result = None
+        error = None
+        try:
+            if tool.is_async:
+                work = tool.handler(**call.arguments)
+            else:
+                # A timed-out blocking tool keeps its worker thread until it returns
+                work = executor.run(tool.handler, **call.arguments)
+            result = await asyncio.wait_for(work, timeout=tool.timeout)
+            TOOL_CALLS.inc(tool=tool.name, result="ok")
+        except asyncio.TimeoutError:
+            error = f"timed out after {tool.timeout:.1f}s"
+            TOOL_CALLS.inc(tool=tool.name, result="timeout")
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            TOOL_CALLS.inc(tool=tool.name, result="error")
+        TOOL_LATENCY.observe(time.time() - start, tool=tool.name)
+
+        if error:
+            logger.warning(f"🛠️ {tool.name} ({call.call_id}) failed: {error}")
+        else:
+            logger.info(f"🛠️ {tool.name} ({call.call_id}) done in {(time.time() - start) * 1000:.0f} ms")
+        await on_result(call, result, error)
+
+    def cancel(self) -> int:
+        cancelled = 0
+        for task in list(self._tasks):
+            if not task.done():
+                task.cancel()
+                cancelled += 1
+        return cancelled
+
+    async def join(self):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+def get_time(timezone: str = "UTC") -> str:
+    try:
+        zone = ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ToolCallError(f"unknown timezone '{timezone}'")
+    return datetime.now(zone).isoformat(timespec="seconds")
+
+
+def default_registry() -> ToolRegistry:
+    registry = ToolRegistry()
+    registry.register(Tool("get_time", get_time, optional={"timezone": str}, timeout=1.0))
+    return registry
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+import wave
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import config
+from handler.tts_engine import SynthesizedAudio
+from utils.executor import executor
+from utils.logger import logger
+from utils.metrics import metrics
+
+
+TTS_CACHE_LOOKUPS = metrics.counter(
+    "annie_tts_cache_lookups_total", "TTS audio cache lookups", ["result"]
+)
+TTS_CACHE_BYTES = metrics.gauge(
+    "annie_tts_cache_bytes", "Audio held by the TTS cache", ["tier"]
+)
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def cache_key(text: str, settings: Dict) -> str:
+    payload = json.dumps([normalize_text(text), settings], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+
+    def __init__(self, storage_path: str = None, memory_bytes: int = None, disk_bytes: int = None,
+                 max_chars: int = None):
+        if storage_path is None:
+            storage_path = Path(__file__).parent.parent / "data" / "tts_cache"
+        self.storage_path = Path(storage_path)
+        self.memory_bytes = memory_bytes if memory_bytes is not None else config.TTS_CACHE_MEMORY_BYTES
+        self.disk_bytes = disk_bytes if disk_bytes is not None else config.TTS_CACHE_DISK_BYTES
+        self.max_chars = max_chars if max_chars is not None else config.TTS_CACHE_MAX_CHARS
+        self._memory: "OrderedDict[str, SynthesizedAudio]" = OrderedDict()
+        self._memory_used = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_used = 0
+        self._disk_loaded = False
+        self._lock = threading.Lock()
+
+    def cacheable(self, text: str) -> bool:
+        return 0 < len(text) <= self.max_chars
+
+    async def get(self, text: str, settings: Dict) -> Optional[SynthesizedAudio]:
+        if not self.cacheable(text):
+            return None
+        key = cache_key(text, settings)
+
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            TTS_CACHE_LOOKUPS.inc(result="memory_hit")
+            return SynthesizedAudio(text, audio.pcm, audio.sample_rate)
+
+        audio = None
+        if self.disk_bytes > 0 and (not self._disk_loaded or key in self._disk):
+            audio = await executor.run(self._read, key)
+        if audio is not None:
+            TTS_CACHE_LOOKUPS.inc(result="disk_hit")
+            self._remember(key, audio)
+            return SynthesizedAudio(text, audio.pcm, audio.sample_rate)
+
+        TTS_CACHE_LOOKUPS.inc(result="miss")
+        return None
+
+    def put(self, text: str, settings: Dict, audio: SynthesizedAudio):
+        if not self.cacheable(text) or not audio.pcm:
+            return
+        key = cache_key(text, settings)
+        self._remember(key, audio)
+        if self.disk_bytes > 0:
+            executor.submit(self._write, key, audio).add_done_callback(self._on_written)
+
+    @staticmethod
+    def _on_written(future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Failed to write TTS cache entry: {future.exception()}")
+
+    def clear_memory(self):
+        self._memory.clear()
+        self._memory_used = 0
+        TTS_CACHE_BYTES.set(0, tier="memory")
+
+    def _remember(self, key: str, audio: SynthesizedAudio):
+        if audio.size > self.memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_used -= previous.size
+        self._memory[key] = audio
+        self._memory_used += audio.size
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= evicted.size
+        TTS_CACHE_BYTES.set(self._memory_used, tier="memory")
+
+    def _path(self, key: str) -> Path:
+        return self.storage_path / f"{key}.wav"
+
+    def _load_index(self):
+        if self._disk_loaded:
+            return
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self.storage_path):
+            if entry.name.endswith(".wav"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_used += size
+        self._disk_loaded = True
+        TTS_CACHE_BYTES.set(self._disk_used, tier="disk")
+
+    def _read(self, key: str) -> Optional[SynthesizedAudio]:
+        with self._lock:
+            self._load_index()
+            if key not in self._disk:
+                return None
+            self._disk.move_to_end(key)
+        path = self._path(key)
+        try:
+            with wave.open(str(path), "rb") as f:
+                audio = SynthesizedAudio("", f.readframes(f.getnframes()), f.getframerate())
+            os.utime(path)
+            return audio
+        except (OSError, EOFError, wave.Error) as e:
+            logger.warning(f"Dropping unreadable TTS cache entry {key[:12]}: {e}")
+            self._forget(key)
+            return None
+
+    def _write(self, key: str, audio: SynthesizedAudio):
+        with self._lock:
+            self._load_index()
+            if key in self._disk:
+                return
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        try:
+            with wave.open(str(tmp), "wb") as f:
+                f.setnchannels(1)
+                f.setsampwidth(2)
+                f.setframerate(audio.sample_rate)
+                f.writeframes(audio.pcm)
+            os.replace(tmp, path)
+            size = path.stat().st_size
+        except (OSError, wave.Error, ValueError) as e:
+            logger.warning(f"Failed to write TTS cache entry: {e}")
+            return
+        finally:
+            # Only left behind when the write failed before the rename
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+        with self._lock:
+            if key in self._disk:
+                return
+            self._disk[key] = size
+            self._disk_used += size
+            while self._disk_used > self.disk_bytes and len(self._disk) > 1:
+                old_key, old_size = self._disk.popitem(last=False)
+                self._disk_used -= old_size
+                try:
+                    os.remove(self._path(old_key))
+                except OSError:
+                    pass
+            TTS_CACHE_BYTES.set(self._disk_used, tier="disk")
+
+    def _forget(self, key: str):
+        with self._lock:
+            size = self._disk.pop(key, None)
+            if size is not None:
+                self._disk_used -= size
+            TTS_CACHE_BYTES.set(self._disk_used, tier="disk")
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+tts_cache = TTSCache()
@@ -0,0 +1,87 @@
+import abc
+import asyncio
+import zlib
+from typing import Dict
+
+import numpy as np
+
+import config
+
+
+class SynthesizedAudio:
+
+    __slots__ = ("text", "pcm", "sample_rate")
+
+    def __init__(self, text: str, pcm: bytes, sample_rate: int):
+        self.text = text
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+
+    @property
+    def size(self) -> int:
+        return len(self.pcm)
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / 2 / self.sample_rate
+
+
+class TTSEngine(abc.ABC):
+
+    name = "base"
+
+    def __init__(self, voice: str = None, sample_rate: int = None):
+        self.voice = voice or config.TTS_VOICE
+        self.sample_rate = sample_rate or config.TTS_SAMPLE_RATE
+
+    def settings(self) -> Dict:
+        return {"engine": self.name, "voice": self.voice, "sample_rate": self.sample_rate}
+
+    @abc.abstractmethod
+    async def synthesize(self, text: str) -> SynthesizedAudio:
+        ...
+
+
+class ToneEngine(TTSEngine):
+
+    name = "tone"
+
+    def __init__(self, chars_per_sec: float = None, synthesis_secs_per_char: float = None,
+                 first_byte_secs: float = None, voice: str = None, sample_rate: int = None):
+        super().__init__(voice, sample_rate)
+        self.chars_per_sec = chars_per_sec if chars_per_sec is not None else config.TTS_CHARS_PER_SEC
+        self.synthesis_secs_per_char = (
+            synthesis_secs_per_char if synthesis_secs_per_char is not None else config.TTS_TONE_SECS_PER_CHAR
+        )
+        self.first_byte_secs = first_byte_secs if first_byte_secs is not None else config.TTS_TONE_FIRST_BYTE_SECS
+
+    def settings(self) -> Dict:
+        return dict(super().settings(), chars_per_sec=self.chars_per_sec)
+
+    def render(self, text: str) -> bytes:
+        if self.chars_per_sec <= 0:
+            return b""
+        samples = int(len(text) / self.chars_per_sec * self.sample_rate)
+        frequency = 180.0 + zlib.crc32(f"{self.voice}:{text}".encode("utf-8")) % 120
+        t = np.arange(samples) / self.sample_rate
+        wave = 0.2 * np.sin(2 * np.pi * frequency * t)
+        return (wave * 32767).astype(np.int16).tobytes()
+
+    async def synthesize(self, text: str) -> SynthesizedAudio:
+        delay = self.first_byte_secs + len(text) * self.synthesis_secs_per_char
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return SynthesizedAudio(text, self.render(text), self.sample_rate)
+
+
+ENGINES = {
+    ToneEngine.name: ToneEngine,
+}
+
+
+def create_engine(name: str = None, **kwargs) -> TTSEngine:
+    name = name or config.TTS_ENGINE
+    engine_cls = ENGINES.get(name)
+    if engine_cls is None:
+        raise ValueError(f"Unknown TTS engine '{name}' (available: {', '.join(ENGINES)})")
+    return engine_cls(**kwargs)
@@ -1,84 +1,252 @@
 import asyncio
 import re
+import time
+from collections import deque
+
+import config
+from handler.audio_output import AudioOutput
+from handler.chunk_policy import ChunkPolicy
+from handler.tts_cache import tts_cache
+from handler.tts_engine import SynthesizedAudio, TTSEngine, create_engine
 from utils.logger import logger
+from utils.metrics import metrics
+from utils.turn_trace import tracer
+
+
+SENTENCE_END = re.compile(r"[.!?。！？][ \n\t\r]")
+
+TTS_GAP = metrics.histogram(
+    "annie_tts_gap_seconds",
+    "Silence between consecutive sentences while the next one was already queued",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0),
+)
+TTS_FIRST_CHUNK = metrics.histogram(
+    "annie_tts_first_chunk_seconds", "First response text to first TTS chunk queued", ["reason"]
+)
+TTS_SYNTHESIS = metrics.histogram(
+    "annie_tts_synthesis_seconds", "Time to synthesize one sentence"
+)
 
 
 class TTSHandler:
 
-    def __init__(self):
+    def __init__(self, engine: TTSEngine = None, output: AudioOutput = None):
         self.is_speaking = False
         self.sentence_buffer = ""
         self.chunk_count = 0
+        self.engine = engine or create_engine()
+        self.output = output or AudioOutput(sample_rate=self.engine.sample_rate)
+        self.cache = tts_cache if config.TTS_CACHE_ENABLED else None
+        self.chunk_policy = ChunkPolicy() if config.TTS_CHUNK_POLICY == "adaptive" else None
+        self.lookahead = config.TTS_LOOKAHEAD
+        self.lookahead_max_bytes = config.TTS_LOOKAHEAD_MAX_BYTES
+        self.on_chunk_start = None
+        self._offset = 0
+        self._scan_from = 0
+        self._chunks_cut = 0
+        self._first_text_at = None
         self._speak_queue = asyncio.Queue()
+        self._ready = deque()
+        self._ready_bytes = 0
+        self._ready_changed = asyncio.Event()
+        self._epoch = 0
+        self._synth_task = None
         self._speaker_task = None
+        self._synthesis = None
+        self._in_synthesis = False
+        self._playback = None
+        self._played_at = None
+        self.tracer = tracer
 
     async def start(self):
+        await self.output.start()
+        self._synth_task = asyncio.create_task(self._synth_loop())
         self._speaker_task = asyncio.create_task(self._speaker_loop())
 
     async def stop(self):
-        if self._speaker_task:
-            self._speaker_task.cancel()
+        for task in (self._synth_task, self._speaker_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        await self.output.stop()
+
+    async def _synth_loop(self):
+        while True:
             try:
-                await self._speaker_task
+                item = await self._speak_queue.get()
+                epoch = self._epoch
+                self._in_synthesis = True
+                # Stay at most `lookahead` sentences and lookahead_max_bytes
+                # ahead of the speaker; 0 synthesizes only while it is idle
+                while self._ahead_is_full():
+                    self._ready_changed.clear()
+                    await self._ready_changed.wait()
+
+                audio = await self._synthesize(item[0]) if epoch == self._epoch else None
+                self._in_synthesis = False
+                if audio is None or epoch != self._epoch:
+                    self._speak_queue.task_done()
+                    continue
+
+                self._ready.append((audio, item[1], item[2]))
+                self._ready_bytes += audio.size
+                self._ready_changed.set()
             except asyncio.CancelledError:
-                pass
+                break
+
+    def _ahead_is_full(self) -> bool:
+        if self.lookahead <= 0:
+            return bool(self._ready) or self.is_speaking
+        return len(self._ready) >= self.lookahead or (
+            bool(self._ready) and self._ready_bytes >= self.lookahead_max_bytes
+        )
+
+    async def _synthesize(self, text: str):
+        self._synthesis = asyncio.create_task(self._synthesize_text(text))
+        try:
+            await asyncio.wait((self._synthesis,))
+            if self._synthesis.cancelled():
+                return None
+            return self._synthesis.result()
+        except asyncio.CancelledError:
+            self._synthesis.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"TTS synthesis failed: {e}")
+            return None
+        finally:
+            self._synthesis = None
+
+    async def _synthesize_text(self, text: str) -> SynthesizedAudio:
+        settings = self.engine.settings()
+        if self.cache is not None:
+            audio = await self.cache.get(text, settings)
+            if audio is not None:
+                return audio
+
+        start = time.time()
+        audio = await self.engine.synthesize(text)
+        TTS_SYNTHESIS.observe(time.time() - start)
+        if self.cache is not None:
+            self.cache.put(text, settings, audio)
+        return audio
 
     async def _speaker_loop(self):
         while True:
             try:
-                sentence = await self._speak_queue.get()
-                if sentence:
-                    self.is_speaking = True
-                    self.chunk_count += 1
-                    logger.info(f"🔊 Chunk {self.chunk_count}: {sentence}")
-                    await self._synthesize_and_play(sentence)
-                    self.is_speaking = False
-                    self._speak_queue.task_done()
+                while not self._ready:
+                    self._ready_changed.clear()
+                    await self._ready_changed.wait()
+
+                audio, start, end = self._ready.popleft()
+                self._ready_bytes -= audio.size
+                self._ready_changed.set()
+
+                now = time.time()
+                if self._played_at is not None:
+                    TTS_GAP.observe(now - self._played_at)
+                self.is_speaking = True
+                self.chunk_count += 1
+                logger.info(f"🔊 Chunk {self.chunk_count}: {audio.text}")
+                self.tracer.mark_once("tts_played")
+                if self.on_chunk_start:
+                    started_at = asyncio.get_running_loop().time() + self.output.delay()
+                    self.on_chunk_start(start, end, started_at, audio.duration)
+                await self._play(audio)
+                self.is_speaking = False
+                self._ready_changed.set()
+                # A gap only counts while the next sentence is already waiting
+                self._played_at = time.time() if self.queue_depth() else None
+                self._speak_queue.task_done()
             except asyncio.CancelledError:
                 break
 
+    async def _play(self, audio: SynthesizedAudio):
+        self._playback = asyncio.create_task(self._play_audio(audio))
+        try:
+            # wait() instead of awaiting the task so cancel() can stop the
+            # sentence without tearing down the speaker loop
+            await asyncio.wait((self._playback,))
+        except asyncio.CancelledError:
+            self._playback.cancel()
+            raise
+        finally:
+            self._playback = None
+
+    async def _play_audio(self, audio: SynthesizedAudio):
+        await self.output.play(audio.pcm, audio.sample_rate, more=self.queue_depth)
+
     def feed_text(self, text: str):
         self.sentence_buffer += text
-        
+        buffer = self.sentence_buffer
+        cursor = self._scan_from
+
+        if self._first_text_at is None:
+            self._first_text_at = time.time()
+
         while True:
-            buffer = self.sentence_buffer
-            
-            if len(buffer) < 2:
-                break
-            
-            ELLIPSIS_PLACEHOLDER = '\x00\x00\x00'
-            DECIMAL_PLACEHOLDER = '\x01'
-            
-            temp = buffer.replace('...', ELLIPSIS_PLACEHOLDER)
-            temp = re.sub(r'(\d)\.(\d)', rf'\1{DECIMAL_PLACEHOLDER}\2', temp)
-            
-            best_match = None
-            for match in re.finditer(r'[.!?。！？]', temp):
-                pos = match.end()
-                
-                if pos < len(temp):
-                    next_char = temp[pos]
-                    if next_char in ' \n\t\r':
-                        best_match = match
-                        break
-                else:
-                    pass
-            
-            if not best_match:
-                break
-            
-            end_pos = best_match.end()
-            
-            sentence = buffer[:end_pos].strip()
-            self.sentence_buffer = buffer[end_pos:].lstrip()
-            
+            end_pos = self._find_boundary(buffer, cursor)
+            reason = "sentence"
+            if self.chunk_policy is not None and self.chunk_policy.allows_early_cut(self._chunks_cut):
+                cut, why = self.chunk_policy.find_cut(buffer, self._chunks_cut)
+                if cut >= 0 and (end_pos < 0 or cut < end_pos):
+                    end_pos, reason = cut, why
+            if end_pos < 0:
+                # The last character may be punctuation still waiting for its whitespace
+                self._scan_from = max(0, len(buffer) - 1)
+                return
+
+            head = buffer[:end_pos]
+            sentence = head.strip()
+            start = self._offset + len(head) - len(head.lstrip())
+            buffer = buffer[end_pos:].lstrip()
+            self._offset += len(self.sentence_buffer) - len(buffer)
+            self.sentence_buffer = buffer
+            cursor = 0
+
             if sentence and len(sentence) > 1:
-                asyncio.create_task(self._speak_queue.put(sentence))
+                self._queue_chunk(sentence, start, reason)
+
+    def _queue_chunk(self, sentence: str, start: int, reason: str):
+        if self._chunks_cut == 0 and self._first_text_at is not None:
+            elapsed = time.time() - self._first_text_at
+            TTS_FIRST_CHUNK.observe(elapsed, reason=reason)
+            logger.info(f"⏱️ First TTS chunk after {elapsed * 1000:.0f} ms ({reason}, {len(sentence.split())} words)")
+        self._chunks_cut += 1
+        self.tracer.mark_once("tts_queued")
+        self._speak_queue.put_nowait((sentence, start, start + len(sentence)))
+
+    @staticmethod
+    def _find_boundary(buffer: str, cursor: int) -> int:
+        # Punctuation followed by whitespace ends a sentence. A decimal point
+        # is always followed by a digit, so it never matches. A run of dots
+        # ends one only when the run is not made of whole "..." ellipses.
+        while True:
+            match = SENTENCE_END.search(buffer, cursor)
+            if match is None:
+                return -1
+            pos = match.start()
+            if buffer[pos] != ".":
+                return pos + 1
+
+            run_start = pos
+            while run_start > 0 and buffer[run_start - 1] == ".":
+                run_start -= 1
+            if (pos + 1 - run_start) % 3:
+                return pos + 1
+            cursor = pos + 1
 
     async def flush(self):
-        if self.sentence_buffer.strip():
-            await self._speak_queue.put(self.sentence_buffer.strip())
+        sentence = self.sentence_buffer.strip()
+        if sentence:
+            start = self._offset + len(self.sentence_buffer) - len(self.sentence_buffer.lstrip())
+            self._queue_chunk(sentence, start, "flush")
+            self._offset += len(self.sentence_buffer)
             self.sentence_buffer = ""
+            self._scan_from = 0
         
         await self._speak_queue.join()
         
@@ -86,12 +254,49 @@ class TTSHandler:
             logger.success("TTS completed")
         self.chunk_count = 0
 
-    async def _synthesize_and_play(self, text: str):
-        await asyncio.sleep(len(text) * 0.05)
-
     def reset(self):
         self.sentence_buffer = ""
         self.chunk_count = 0
+        self._offset = 0
+        self._scan_from = 0
+        self._chunks_cut = 0
+        self._first_text_at = None
+
+    def cancel(self) -> int:
+        self._epoch += 1
+        dropped = 0
+        while True:
+            try:
+                self._speak_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            self._speak_queue.task_done()
+            dropped += 1
+
+        while self._ready:
+            self._ready.popleft()
+            self._speak_queue.task_done()
+            dropped += 1
+        self._ready_bytes = 0
+        self._ready_changed.set()
+
+        if self._in_synthesis:
+            if self._synthesis is not None:
+                self._synthesis.cancel()
+            dropped += 1
+
+        if self._playback is not None and not self._playback.done():
+            self._playback.cancel()
+            dropped += 1
+        self.output.clear()
+
+        self.is_speaking = False
+        self._played_at = None
+        self.reset()
+        return dropped
+
+    def queue_depth(self) -> int:
+        return self._speak_queue.qsize() + len(self._ready) + self._in_synthesis
 
     def is_currently_speaking(self) -> bool:
-        return self.is_speaking
+        return self.output.is_playing
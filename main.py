@@ -8,6 +8,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from network.bridge_server import BridgeServer
+from utils.executor import executor
 from utils.logger import logger
 
 
@@ -51,6 +52,7 @@ def handle_exit(sig, frame):
     logger.info("Shutting down...")
     if npm_process:
         npm_process.terminate()
+    executor.shutdown(wait=False)
     sys.exit(0)
 
 
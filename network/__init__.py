@@ -1,2 +1,3 @@
 from network.llm_client import AnnieMieClient
+from network.session_manager import Session, SessionManager
 from network.bridge_server import BridgeServer
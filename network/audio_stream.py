@@ -0,0 +1,108 @@
+from collections import deque
+from typing import Dict, List, Optional
+
+import config
+from network.upload_protocol import (
+    build_audio_cancel_message,
+    build_audio_chunk_message,
+    build_audio_commit_message,
+)
+from utils.logger import logger
+
+
+class AudioStreamer:
+
+    def __init__(self, client):
+        self.client = client
+        self.enabled = False
+        self._forwarded = set()
+        self._seq: Dict[int, int] = {}
+        self._finished = deque()
+
+    def _can_forward(self) -> bool:
+        return (
+            self.enabled
+            and self.client.websocket is not None
+            and self.client.is_mic_enabled
+            and not self.client.is_llm_busy
+        )
+
+    async def pump(self):
+        recorder = self.client.recorder
+        if recorder is None:
+            return
+
+        pending: Dict[int, List[bytes]] = {}
+
+        while True:
+            event = recorder.read_audio_chunk()
+            if event is None:
+                break
+
+            kind, stream_id, payload = event
+
+            if kind == "start":
+                if self._can_forward():
+                    self._forwarded.add(stream_id)
+                    self._seq[stream_id] = 0
+                    logger.info(f"🎙️ Streaming audio (stream {stream_id})")
+            elif kind == "chunk":
+                if stream_id in self._forwarded:
+                    pending.setdefault(stream_id, []).append(payload)
+            elif kind == "end":
+                await self._send_pending(pending)
+                self._finished.append(stream_id)
+            elif kind == "cancel":
+                pending.pop(stream_id, None)
+                await self.cancel(stream_id)
+
+        await self._send_pending(pending)
+
+    async def _send_pending(self, pending: Dict[int, List[bytes]]):
+        for stream_id, chunks in list(pending.items()):
+            pcm = b"".join(chunks)
+            seq = self._seq.get(stream_id, 0)
+            self._seq[stream_id] = seq + 1
+
+            message = build_audio_chunk_message(
+                stream_id, seq, pcm, config.RATE, self.client.binary_upload
+            )
+            try:
+                await self.client.send_message(message)
+            except Exception as e:
+                logger.error(f"Failed to stream audio chunk: {e}")
+                self._drop(stream_id)
+        pending.clear()
+
+    async def finish(self) -> Optional[int]:
+        await self.pump()
+
+        if not self._finished:
+            return None
+
+        stream_id = self._finished.popleft()
+        if stream_id in self._forwarded:
+            return stream_id
+        return None
+
+    def build_commit(self, stream_id: int, metadata: Dict, frames: List[bytes]):
+        self._drop(stream_id)
+        return build_audio_commit_message(
+            stream_id, metadata, frames, self.client.binary_upload
+        )
+
+    async def cancel(self, stream_id: Optional[int]):
+        if stream_id is None or stream_id not in self._forwarded:
+            return
+
+        self._drop(stream_id)
+        if self.client.websocket:
+            try:
+                await self.client.send_message(build_audio_cancel_message(stream_id))
+                logger.info(f"🎙️ Stream {stream_id} cancelled")
+            except Exception as e:
+                logger.warning(f"Failed to cancel audio stream: {e}")
+
+    def _drop(self, stream_id: int):
+        self._forwarded.discard(stream_id)
+        self._seq.pop(stream_id, None)
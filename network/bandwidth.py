@@ -0,0 +1,132 @@
+import cv2
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+import config
+from utils.logger import logger
+
+
+class BandwidthEstimator:
+
+    def __init__(self, alpha: float = None, min_sample_bytes: int = None):
+        self.alpha = alpha if alpha is not None else config.BANDWIDTH_EWMA_ALPHA
+        self.min_sample_bytes = (
+            min_sample_bytes if min_sample_bytes is not None else config.BANDWIDTH_MIN_SAMPLE_BYTES
+        )
+        self.throughput = None
+        self.samples = 0
+
+    def observe(self, size: int, seconds: float):
+        if size < self.min_sample_bytes or seconds <= 0:
+            return
+
+        rate = size / seconds
+        if self.throughput is None:
+            self.throughput = rate
+        else:
+            self.throughput = self.alpha * rate + (1 - self.alpha) * self.throughput
+        self.samples += 1
+
+    def budget(self, target_secs: float) -> Optional[float]:
+        if self.throughput is None:
+            return None
+        return self.throughput * target_secs
+
+
+class AdaptiveFrameEncoder:
+
+    def __init__(
+        self,
+        estimator: BandwidthEstimator = None,
+        levels: Sequence[Tuple[float, int]] = None,
+        target_secs: float = None,
+        audio_only: bool = None,
+    ):
+        self.estimator = estimator or BandwidthEstimator()
+        self.levels = list(levels or config.UPLOAD_QUALITY_LEVELS)
+        self.target_secs = target_secs if target_secs is not None else config.UPLOAD_LATENCY_TARGET
+        self.audio_only = (
+            audio_only if audio_only is not None else config.UPLOAD_AUDIO_ONLY_WHEN_SATURATED
+        )
+        self.level = 0
+        self._ratios = {}
+
+    def _ratio(self, index: int) -> float:
+        if index in self._ratios:
+            return self._ratios[index]
+        scale, quality = self.levels[index]
+        base_quality = self.levels[0][1]
+        return min(1.0, scale * scale * quality / base_quality)
+
+    def _learn(self, index: int, original: int, encoded: int):
+        if original <= 0:
+            return
+        ratio = encoded / original
+        previous = self._ratios.get(index)
+        self._ratios[index] = ratio if previous is None else 0.5 * ratio + 0.5 * previous
+
+    def choose_level(self, frame_bytes: int, audio_bytes: int) -> Optional[int]:
+        budget = self.estimator.budget(self.target_secs)
+        if budget is None or frame_bytes == 0:
+            return 0
+
+        available = budget - audio_bytes
+        current = len(self.levels) if self.level is None else self.level
+        for index in range(len(self.levels)):
+            if frame_bytes * self._ratio(index) <= available:
+                # Step back up one level at a time so a single fast send does not flip quality
+                return max(index, current - 1)
+
+        return None if self.audio_only else len(self.levels) - 1
+
+    @staticmethod
+    def reencode(frame: bytes, scale: float, quality: int) -> bytes:
+        image = cv2.imdecode(np.frombuffer(frame, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return frame
+        if scale < 1.0:
+            height, width = image.shape[:2]
+            size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+        return data.tobytes() if ok else frame
+
+    def adapt(self, frames: List[bytes], audio_bytes: int = 0) -> List[bytes]:
+        if not frames:
+            return frames
+
+        original = sum(len(f) for f in frames)
+        level = self.choose_level(original, audio_bytes)
+
+        if level is None:
+            if self.level is not None:
+                logger.warning("📶 Upload link saturated, sending audio only")
+            self.level = None
+            return []
+
+        if level != self.level:
+            scale, quality = self.levels[level]
+            logger.info(f"📶 Upload quality → {scale:g}x q{quality} ({self.describe_throughput()})")
+        self.level = level
+
+        if level == 0:
+            return frames
+
+        scale, quality = self.levels[level]
+        adapted = [self.reencode(f, scale, quality) for f in frames]
+        self._learn(level, original, sum(len(f) for f in adapted))
+        return adapted
+
+    def observe(self, size: int, seconds: float):
+        self.estimator.observe(size, seconds)
+
+    def describe_level(self) -> str:
+        if self.level is None:
+            return "audio-only"
+        scale, quality = self.levels[self.level]
+        return f"{scale:g}x q{quality}"
+
+    def describe_throughput(self) -> str:
+        if self.estimator.throughput is None:
+            return "unmeasured"
+        return f"{self.estimator.throughput / 1024:.0f} KB/s"
@@ -0,0 +1,97 @@
+import time
+from typing import Optional
+
+import config
+from network.upload_protocol import build_cancel_message
+from utils.logger import logger
+from utils.metrics import metrics
+
+
+BARGE_INS = metrics.counter(
+    "annie_barge_ins_total", "Responses interrupted by the user speaking", ["result"]
+)
+BARGE_IN_LATENCY = metrics.histogram(
+    "annie_barge_in_seconds",
+    "Speech onset to detection, and speech onset to TTS silenced",
+    ["span"],
+    buckets=(0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.75, 1.0, 2.0),
+)
+
+
+class BargeInController:
+
+    def __init__(self, client):
+        self.client = client
+        self.enabled = config.BARGE_IN_ENABLED
+        self.cancel_supported = False
+        self.cancelled_generation: Optional[str] = None
+        self.interrupted = False
+        self.last_cutoff: Optional[float] = None
+
+    def _assistant_active(self) -> bool:
+        tts = self.client.tts_handler
+        return (
+            self.client.is_llm_busy
+            or tts.is_currently_speaking()
+            or tts.queue_depth() > 0
+        )
+
+    async def on_onset(self, segment_id: int, onset_time: float, payload: bytes = b""):
+        if not self.enabled or not self.client.is_mic_enabled or not self._assistant_active():
+            return
+
+        detected = time.time()
+        client = self.client
+        generation_id = client._generation_id
+
+        dropped = client.tts_handler.cancel()
+        silenced = time.time()
+        client.stream_parser.reset()
+        client.tag_scheduler.reset()
+        client.function_calls.reset()
+        client.is_thinking = False
+
+        self.interrupted = True
+        self.cancelled_generation = generation_id
+        client._generation_id = None
+        client.tracer.mark("barge_in")
+        client.tracer.finish()
+        client._set_llm_busy(False)
+
+        detect_latency = max(0.0, detected - onset_time)
+        cutoff_latency = max(0.0, silenced - onset_time)
+        self.last_cutoff = cutoff_latency
+        BARGE_IN_LATENCY.observe(detect_latency, span="detect")
+        BARGE_IN_LATENCY.observe(cutoff_latency, span="cutoff")
+        logger.info(
+            f"✋ Barge-in (segment {segment_id}): silenced {cutoff_latency * 1000:.0f} ms after onset "
+            f"(detect {detect_latency * 1000:.0f} ms, {dropped} sentence(s) dropped)"
+        )
+
+        if self.cancel_supported and client.websocket:
+            try:
+                await client.send_message(build_cancel_message(generation_id))
+                BARGE_INS.inc(result="server")
+                return
+            except Exception as e:
+                logger.warning(f"Failed to send cancel: {e}")
+        BARGE_INS.inc(result="local")
+
+    def accepts_text(self) -> bool:
+        return not self.interrupted
+
+    def on_generation(self, generation_id: Optional[str]) -> bool:
+        if self.interrupted and generation_id is not None and generation_id == self.cancelled_generation:
+            return False
+        self.interrupted = False
+        self.cancelled_generation = None
+        return True
+
+    def is_cancelled(self, generation_id: Optional[str]) -> bool:
+        return self.interrupted and (generation_id is None or generation_id == self.cancelled_generation)
+
+    def on_cancelled(self, generation_id: Optional[str]):
+        if generation_id == self.cancelled_generation:
+            logger.info(f"✋ Server cancelled generation {generation_id}")
+            self.interrupted = False
+            self.cancelled_generation = None
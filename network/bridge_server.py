@@ -5,186 +5,226 @@ import struct
 import websockets
 from websockets.server import serve
 
+from utils.codec import codec
+from utils.executor import executor
 from utils.logger import logger
-from network.llm_client import AnnieMieClient
+from utils.loop_monitor import LoopMonitor
+from utils.metrics import MetricsServer, metrics
+from network.session_manager import DEFAULT_SESSION_ID, SessionLimitError, SessionManager
+from network.upload_protocol import UploadMessage
+from handler.frame_overlay import render_overlay_frame
 import config
 
 
+FRAMES_SERVED = metrics.counter(
+    "annie_frames_served_total", "Annotated frames sent to frame clients", ["session"]
+)
+
+
 class BridgeServer:
     def __init__(self):
-        self.client = AnnieMieClient()
-        self.web_clients = set()
-        self.cam_enabled = False
+        self.sessions = SessionManager()
+        self.primary = None
+        self._web_sessions = {}
         self.camera_process = None
         self.frame_clients = []
         self.frame_server_socket = None
+        self.loop_monitor = LoopMonitor()
+        self.metrics_server = MetricsServer()
+        self._web_handlers = {
+            "toggle_mic": self._on_toggle_mic,
+            "toggle_cam": self._on_toggle_cam,
+            "toggle_think": self._on_toggle_think,
+            "show_feed": self._on_show_feed,
+            "text": self._on_text,
+            "simulate_server_message": self._on_simulate_server_message,
+            "sync": self._on_sync,
+            "save_simulator_messages": self._on_save_simulator_messages,
+            "load_simulator_messages": self._on_load_simulator_messages,
+            "latency_report": self._on_latency_report,
+        }
         
     async def start(self):
-        self.client.initialize_components()
-        await self.client.tts_handler.start()
-        
-        logger.info("Starting Rust Recorder (Audio + Video)...")
-        self.client.recorder.start()
-        self.client.recorder.stop_audio()
-        self.client.running = True
+        if config.LOOP_MONITOR_ENABLED:
+            self.loop_monitor.start()
+            asyncio.create_task(self.loop_monitor.report_periodically())
+
+        if config.METRICS_ENABLED:
+            self._register_gauges()
+            try:
+                await self.metrics_server.start()
+            except OSError as e:
+                logger.warning(f"Metrics endpoint unavailable: {e}")
+
+        self.primary = await self.sessions.get_or_create(DEFAULT_SESSION_ID)
         logger.success("Recorder ready! Toggle Mic/Camera in web UI.")
-        
+
         self._start_frame_server()
-        asyncio.create_task(self._process_audio_loop())
-        
-        connected = await self.client.connect()
-        if not connected:
-            logger.warning("Could not connect to LLM server. Simulation mode available.")
-        
-        # Always start handling server messages even if not connected initially
-        asyncio.create_task(self.client.handle_server_messages())
+        self.sessions.start_reaping()
         
         async with serve(self.handle_web_client, "localhost", 8768):
             logger.success("Bridge Server running on ws://localhost:8768")
             await asyncio.Future()
     
-    async def _process_audio_loop(self):
-        import os
-        while self.client.running:
-            if not self.client.is_mic_enabled:
-                filepath = self.client.recorder.read_speech_event()
-                if filepath and os.path.exists(filepath):
-                    try:
-                        os.remove(filepath)
-                    except:
-                        pass
-                await asyncio.sleep(0.1)
-                continue
-                
-            filepath = self.client.recorder.read_speech_event()
-            if filepath:
-                try:
-                    is_speech = self.client.speech_detector.is_speech(filepath)
-                    if not is_speech:
-                        if os.path.exists(filepath):
-                            os.remove(filepath)
-                        continue
-                        
-                    logger.success("Speech detected!")
-                    
-                    if self.client.websocket:
-                        await self.client._process_and_send_message(filepath)
-                    else:
-                        logger.warning("LLM not connected - speech ignored")
-                        if os.path.exists(filepath):
-                            os.remove(filepath)
-                            
-                except Exception as e:
-                    logger.error(f"Audio processing error: {e}")
-                    if os.path.exists(filepath):
-                        os.remove(filepath)
-                        
-            await asyncio.sleep(0.1)
-            
+    def _register_gauges(self):
+        sessions = self.sessions.sessions
+        metrics.gauge("annie_web_clients", "Connected web UI clients").set_function(
+            lambda: len(self._web_sessions)
+        )
+        metrics.gauge("annie_frame_clients", "Connected frame clients").set_function(
+            lambda: len(self.frame_clients)
+        )
+        metrics.gauge("annie_identity_store_size", "Identities in the identity store").set_function(
+            lambda: len(self.sessions.shared.identity_manager.get_all_identities())
+        )
+        metrics.gauge("annie_tts_queue_depth", "Sentences waiting for TTS").set_function(
+            lambda: sum(session.client.tts_handler.queue_depth() for session in sessions.values())
+        )
+        metrics.gauge("annie_llm_connected", "Sessions whose LLM server link is up").set_function(
+            lambda: sum(1 for session in sessions.values() if session.client.websocket)
+        )
+
+    @staticmethod
+    def _session_id(websocket) -> str:
+        path = getattr(websocket, "path", "") or ""
+        return path.split("?")[0].strip("/") or DEFAULT_SESSION_ID
+
     async def handle_web_client(self, websocket):
-        self.web_clients.add(websocket)
-        logger.info(f"Web client connected. Total: {len(self.web_clients)}")
+        session_id = self._session_id(websocket)
+        try:
+            session = await self.sessions.get_or_create(session_id)
+            session.add_web_client(websocket)
+        except SessionLimitError as e:
+            logger.warning(f"Refused web client for session {session_id}: {e}")
+            await self.send_to_web(websocket, {"type": "error", "error": str(e)})
+            await websocket.close(1013, "session limit")
+            return
+
+        self._web_sessions[websocket] = session
+        logger.info(f"Web client connected to {session.id}. Total: {len(self._web_sessions)}")
         
-        connected = self.client.websocket is not None
+        connected = session.client.websocket is not None
         await self.send_to_web(websocket, {
             "type": "status", 
             "connected": connected,
-            "mic_on": self.client.is_mic_enabled,
-            "cam_on": self.cam_enabled
+            "mic_on": session.client.is_mic_enabled,
+            "cam_on": session.cam_enabled,
+            "session": session.id
         })
         
         try:
             async for message in websocket:
-                await self.process_web_message(websocket, json.loads(message))
+                try:
+                    data = codec.loads(message)
+                except ValueError as e:
+                    logger.error(f"Invalid web message: {e}")
+                    continue
+                await self.process_web_message(websocket, data)
         except websockets.exceptions.ConnectionClosed:
             pass
         finally:
-            self.web_clients.discard(websocket)
-            logger.info(f"Web client disconnected. Total: {len(self.web_clients)}")
+            session.remove_web_client(websocket)
+            self._web_sessions.pop(websocket, None)
+            logger.info(f"Web client disconnected from {session.id}. Total: {len(self._web_sessions)}")
             
     async def process_web_message(self, websocket, data):
         msg_type = data.get("type")
-        logger.info(f"📨 Received: {msg_type}")
+        session = self._web_sessions[websocket]
+        logger.info(f"📨 [{session.id}] Received: {msg_type}")
+        session.touch()
         
-        if msg_type == "toggle_mic":
-            enabled = data.get("enabled", False)
-            self.client.is_mic_enabled = enabled
-            
-            if enabled:
-                self.client.recorder.start_audio()
-                logger.info("🎤 Microphone: ON (Rust recorder active)")
-            else:
-                self.client.recorder.stop_audio()
-                logger.info("🎤 Microphone: OFF (Rust recorder paused)")
-                
-        elif msg_type == "toggle_cam":
-            self.cam_enabled = data.get("enabled", False)
-            self.client.is_cam_enabled = self.cam_enabled
-            
-            if self.cam_enabled:
-                self.launch_camera_window()
-                logger.info("📷 Camera: ON")
-            else:
-                await self.stop_camera_window()
-                logger.info("📷 Camera: OFF")
-                
-        elif msg_type == "toggle_think":
-            enabled = data.get("enabled", False)
-            self.client.tts_handler.speak_thoughts = enabled
-            status = "ON" if enabled else "OFF"
-            logger.info(f"🧠 Think Mode: {status}")
-                
-        elif msg_type == "show_feed":
-            if self.cam_enabled:
-                if not self.camera_process or self.camera_process.poll() is not None:
-                    self.launch_camera_window()
-                    logger.info("👁️ Show Feed - reopening camera window")
-                else:
-                    logger.info("👁️ Show Feed - camera already visible")
-            else:
-                logger.info("👁️ Show Feed - turn on Camera first")
-                
-        elif msg_type == "text":
-            text = data.get("text", "")
-            if text and self.client.websocket:
-                logger.info(f"💬 User: {text}")
-                await self.client.websocket.send(json.dumps({
-                    "type": "text",
-                    "text": text
-                }))
+        handler = self._web_handlers.get(msg_type)
+        if handler:
+            await handler(session, websocket, data)
+
+    async def _on_toggle_mic(self, session, websocket, data):
+        enabled = data.get("enabled", False)
+        session.client.is_mic_enabled = enabled
         
-        elif msg_type == "simulate_server_message":
-            text = data.get("text", "")
-            tokens_per_sec = float(data.get("tokens_per_sec", 10.0))
-            first_token_latency = float(data.get("first_token_latency", 0.5))
-            
-            # Run simulation in the background so it doesn't block the loop
-            asyncio.create_task(self.client.simulate_message_stream(text, tokens_per_sec, first_token_latency))
-            
-        elif msg_type == "sync":
-            logger.info("🔄 Sync requested...")
-            if not self.client.websocket:
-                connected = await self.client.connect()
-                if connected:
-                    for client in self.web_clients:
-                        await self.send_to_web(client, {"type": "connection", "status": "connected"})
-                else:
-                    for client in self.web_clients:
-                        await self.send_to_web(client, {"type": "connection", "status": "disconnected"})
-            else:
-                logger.info("Already connected to LLM server")
-                for client in self.web_clients:
-                    await self.send_to_web(client, {"type": "connection", "status": "connected"})
+        if enabled:
+            session.client.recorder.start_audio()
+            logger.info("🎤 Microphone: ON (Rust recorder active)")
+        else:
+            session.client.recorder.stop_audio()
+            logger.info("🎤 Microphone: OFF (Rust recorder paused)")
+
+    async def _on_toggle_cam(self, session, websocket, data):
+        session.cam_enabled = data.get("enabled", False)
+        session.client.is_cam_enabled = session.cam_enabled
         
-        elif msg_type == "save_simulator_messages":
-            messages = data.get("messages", [])
-            self._save_simulator_messages(messages)
-            await self.send_to_web(websocket, {"type": "save_result", "success": True})
+        if session is not self.primary:
+            state = "ON" if session.cam_enabled else "OFF"
+            logger.info(f"📷 [{session.id}] Camera: {state}")
+        elif session.cam_enabled:
+            self.launch_camera_window()
+            logger.info("📷 Camera: ON")
+        else:
+            await self.stop_camera_window()
+            logger.info("📷 Camera: OFF")
+
+    async def _on_toggle_think(self, session, websocket, data):
+        enabled = data.get("enabled", False)
+        session.client.tts_handler.speak_thoughts = enabled
+        status = "ON" if enabled else "OFF"
+        logger.info(f"🧠 Think Mode: {status}")
+
+    async def _on_show_feed(self, session, websocket, data):
+        if session is not self.primary:
+            logger.info(f"👁️ Show Feed - only available for the {DEFAULT_SESSION_ID} session")
+        elif session.cam_enabled:
+            if not self.camera_process or self.camera_process.poll() is not None:
+                self.launch_camera_window()
+                logger.info("👁️ Show Feed - reopening camera window")
+            else:
+                logger.info("👁️ Show Feed - camera already visible")
+        else:
+            logger.info("👁️ Show Feed - turn on Camera first")
+
+    async def _on_text(self, session, websocket, data):
+        text = data.get("text", "")
+        if text:
+            logger.info(f"💬 User: {text}")
+            await session.client.send_or_queue(UploadMessage(codec.dumps({
+                "type": "text",
+                "text": text
+            })), "text message")
+
+    async def _on_simulate_server_message(self, session, websocket, data):
+        text = data.get("text", "")
+        tokens_per_sec = float(data.get("tokens_per_sec", 10.0))
+        first_token_latency = float(data.get("first_token_latency", 0.5))
         
-        elif msg_type == "load_simulator_messages":
-            messages = self._load_simulator_messages()
-            await self.send_to_web(websocket, {"type": "simulator_messages", "messages": messages})
+        # Run simulation in the background so it doesn't block the loop
+        asyncio.create_task(session.client.simulate_message_stream(text, tokens_per_sec, first_token_latency))
+
+    async def _on_sync(self, session, websocket, data):
+        logger.info("🔄 Sync requested...")
+        if not session.client.websocket:
+            connected = await session.client.connect()
+            if not connected:
+                session.client.request_reconnect()
+                await session.broadcast({"type": "connection", "status": "disconnected"})
+        else:
+            logger.info("Already connected to LLM server")
+            await session.broadcast({"type": "connection", "status": "connected"})
+
+    async def _on_save_simulator_messages(self, session, websocket, data):
+        messages = data.get("messages", [])
+        self._save_simulator_messages(messages)
+        await self.send_to_web(websocket, {"type": "save_result", "success": True})
+
+    async def _on_load_simulator_messages(self, session, websocket, data):
+        messages = self._load_simulator_messages()
+        await self.send_to_web(websocket, {"type": "simulator_messages", "messages": messages})
     
+    async def _on_latency_report(self, session, websocket, data):
+        session.client.tracer.log_report()
+        await self.send_to_web(websocket, {
+            "type": "latency_report",
+            "report": session.client.tracer.report(),
+            "stages": session.client.tracer.stage_stats(),
+        })
+
     def _save_simulator_messages(self, messages):
         import os
         data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "message_simulator")
@@ -209,7 +249,7 @@ class BridgeServer:
                 
     async def send_to_web(self, websocket, data):
         try:
-            await websocket.send(json.dumps(data))
+            await websocket.send(codec.dumps(data))
         except Exception:
             pass
 
@@ -242,6 +282,24 @@ class BridgeServer:
         asyncio.create_task(self._frame_server_loop())
         logger.info("📷 Frame server started on port 8769")
         
+    def _send_frame(self, frame_bytes: bytes, session_id: str):
+        header = struct.pack('>I', len(frame_bytes))
+        
+        dead_clients = []
+        for client in self.frame_clients:
+            try:
+                client.sendall(header + frame_bytes)
+                FRAMES_SERVED.inc(session=session_id)
+            except Exception:
+                dead_clients.append(client)
+        
+        for client in dead_clients:
+            self.frame_clients.remove(client)
+            try:
+                client.close()
+            except:
+                pass
+        
     async def _frame_server_loop(self):
         import select
         import cv2
@@ -249,9 +307,10 @@ class BridgeServer:
         
         frame_count = 0
         last_faces = []
+        session = self.primary
         
         try:
-            while self.client.running:
+            while session.client.running:
                 try:
                     readable, _, _ = select.select([self.frame_server_socket], [], [], 0.001)
                     if readable:
@@ -264,24 +323,24 @@ class BridgeServer:
                 except Exception:
                     pass
                 
-                if self.cam_enabled and self.frame_clients:
+                if session.cam_enabled and self.frame_clients:
                     try:
-                        frame_data = self.client.recorder.get_latest_frame()
+                        frame_data = session.client.recorder.get_latest_frame()
                         if frame_data:
                             frame_count += 1
                             
                             nparr = np.frombuffer(frame_data, np.uint8)
-                            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+                            frame = await executor.run(cv2.imdecode, nparr, cv2.IMREAD_COLOR)
                             
                             if frame is not None:
-                                if frame_count % 5 == 0 and self.client.identity_manager.is_face_detection_available():
+                                if frame_count % 5 == 0 and session.client.identity_manager.is_face_detection_available():
                                     try:
-                                        faces = self.client.identity_manager.face_detector.detect_faces(frame)
+                                        faces = await session.client.identity_manager.face_detector.detect_faces_async(frame)
                                         last_faces = []
                                         for face in faces:
                                             embedding = face.get("embedding")
                                             if embedding is not None:
-                                                matched_id = self.client.identity_manager.identity_store.find_identity(embedding)
+                                                matched_id = session.client.identity_manager.identity_store.find_identity(embedding)
                                                 face["identity_id"] = matched_id if matched_id else "unknown"
                                             else:
                                                 face["identity_id"] = "unknown"
@@ -289,44 +348,9 @@ class BridgeServer:
                                     except Exception:
                                         last_faces = []
                                 
-                                if last_faces:
-                                    for face in last_faces:
-                                        bbox = face.get("bbox", [])
-                                        if len(bbox) >= 4:
-                                            x, y, x2, y2 = [int(v) for v in bbox[:4]]
-                                            
-                                            identity_id = face.get("identity_id", "?")
-                                            short_id = identity_id[-8:] if len(identity_id) > 8 else identity_id
-                                            score = face.get("det_score", 0.0)
-                                            label = f"{short_id} {score:.0%}"
-                                            
-                                            color = (76, 175, 80)
-                                            cv2.rectangle(frame, (x, y), (x2, y2), color, 2)
-                                            
-                                            (tw, th), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
-                                            cv2.rectangle(frame, (x, y - th - 10), (x + tw + 10, y), color, -1)
-                                            cv2.putText(frame, label, (x + 5, y - 5), 
-                                                      cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-                                
-                                _, processed_data = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                                frame_bytes = processed_data.tobytes()
-                                
-                                size = len(frame_bytes)
-                                header = struct.pack('>I', size)
-                                
-                                dead_clients = []
-                                for client in self.frame_clients:
-                                    try:
-                                        client.sendall(header + frame_bytes)
-                                    except Exception:
-                                        dead_clients.append(client)
-                                
-                                for client in dead_clients:
-                                    self.frame_clients.remove(client)
-                                    try:
-                                        client.close()
-                                    except:
-                                        pass
+                                frame_bytes = await executor.run(render_overlay_frame, frame, last_faces)
+                                if frame_bytes:
+                                    self._send_frame(frame_bytes, session.id)
                     except Exception:
                         pass
                 
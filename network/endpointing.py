@@ -0,0 +1,99 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+import config
+from utils.executor import executor
+from utils.logger import logger
+from utils.metrics import metrics
+
+
+ENDPOINTS = metrics.counter(
+    "annie_endpoints_total", "How speech segments were ended", ["result"]
+)
+ENDPOINT_SAVED = metrics.histogram(
+    "annie_endpoint_saved_seconds",
+    "Time cut from the silence limit by semantic endpointing",
+    buckets=(0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0),
+)
+ENDPOINT_INFERENCE = metrics.histogram(
+    "annie_endpoint_inference_seconds", "Semantic turn model time on a partial segment"
+)
+
+
+class SemanticEndpointer:
+
+    def __init__(self, client):
+        self.client = client
+        self.enabled = config.SEMANTIC_ENDPOINTING
+        self._task: Optional[asyncio.Task] = None
+        self._saved: Dict[int, float] = {}
+
+    def _available(self) -> bool:
+        model = self.client.semantic_recognition
+        return self.enabled and model is not None and model.is_available()
+
+    async def on_pause(self, segment_id: int, voiced_until: float, pcm: bytes):
+        client = self.client
+        if not self._available() or not client.is_mic_enabled or client.is_llm_busy:
+            return
+        if self._task is not None and not self._task.done():
+            # Still deciding on an earlier pause; the silence limit covers this one
+            return
+        self._task = asyncio.create_task(self._decide(segment_id, voiced_until, pcm))
+
+    async def _decide(self, segment_id: int, voiced_until: float, pcm: bytes):
+        start = time.time()
+        audio = np.frombuffer(pcm, dtype=np.int16)
+        try:
+            complete = await self.client.semantic_recognition.is_turn_complete_async(
+                audio, config.RATE, raise_errors=True
+            )
+        except Exception as e:
+            ENDPOINTS.inc(result="error")
+            logger.error(f"Semantic endpointing failed, waiting for the silence limit: {e}")
+            return
+        ENDPOINT_INFERENCE.observe(time.time() - start)
+
+        if not complete:
+            ENDPOINTS.inc(result="incomplete")
+            return
+        if not self.client.running:
+            return
+
+        # Finalizing takes the VAD lock and encodes the segment in the recorder
+        if not await executor.run(self.client.recorder.finalize_segment, segment_id):
+            ENDPOINTS.inc(result="stale")
+            return
+
+        saved = max(0.0, voiced_until + config.SILENCE_LIMIT - time.time())
+        # Older segments can no longer be taken
+        for stale_id in [key for key in self._saved if key < segment_id]:
+            del self._saved[stale_id]
+        self._saved[segment_id] = saved
+        ENDPOINTS.inc(result="early")
+        ENDPOINT_SAVED.observe(saved)
+        logger.info(
+            f"⚡ Early endpoint (segment {segment_id}): {saved * 1000:.0f} ms before the silence limit "
+            f"(model {(time.time() - start) * 1000:.0f} ms)"
+        )
+
+    def reset(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self._saved.clear()
+
+    def forget(self, segment):
+        self._saved.pop(getattr(segment, "id", None), None)
+
+    def take(self, segment) -> Optional[float]:
+        if not self._available():
+            return None
+
+        saved = self._saved.pop(getattr(segment, "id", None), None)
+        if saved is None:
+            ENDPOINTS.inc(result="silence")
+        return saved
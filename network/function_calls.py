@@ -0,0 +1,79 @@
+import itertools
+import time
+from typing import Any, Optional
+
+import config
+from handler.json_scanner import JsonObjectScanner
+from handler.tools import TOOL_CALLS, ToolCall, ToolCallError, ToolExecutor, default_registry
+from network.upload_protocol import build_function_result_message
+from utils.logger import logger
+from utils.metrics import metrics
+
+
+FUNCTION_RESULT_LEAD = metrics.histogram(
+    "annie_function_result_seconds",
+    "Function call JSON complete to result sent",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+class FunctionCallHandler:
+
+    def __init__(self, client, registry=None):
+        self.client = client
+        self.enabled = config.TOOLS_ENABLED
+        self.registry = registry or default_registry()
+        self.executor = ToolExecutor()
+        self.scanner = JsonObjectScanner()
+        self.results_supported = False
+        self._ids = itertools.count(1)
+        self._block_calls = 0
+
+    def on_start(self):
+        self.scanner.reset()
+        self._block_calls = 0
+
+    def on_delta(self, text: str):
+        if not self.enabled:
+            return
+        for raw in self.scanner.feed(text):
+            self._dispatch(raw)
+
+    def on_end(self, content: str):
+        if not self.enabled:
+            logger.info(f"[Function: {content[:60]}...]")
+            return
+        if self._block_calls == 0 and content.strip():
+            # Nothing parsed while streaming; let the registry report why
+            self._dispatch(content.strip())
+        self.scanner.reset()
+
+    def reset(self) -> int:
+        self.scanner.reset()
+        return self.executor.cancel()
+
+    def _dispatch(self, raw: str):
+        self._block_calls += 1
+        generation_id = self.client._generation_id
+        call_id = f"{generation_id or 'local'}-{next(self._ids)}"
+        try:
+            call = self.registry.parse(raw, call_id, generation_id)
+        except ToolCallError as e:
+            TOOL_CALLS.inc(tool="", result="invalid")
+            logger.warning(f"🛠️ Rejected function call: {e}")
+            self.executor.spawn(self._send_result(call_id, None, generation_id, error=str(e)))
+            return
+
+        logger.info(f"🛠️ Calling {call.tool.name} ({call.call_id})")
+        self.executor.submit(call, self._on_result)
+
+    async def _on_result(self, call: ToolCall, result: Any, error: Optional[str]):
+        await self._send_result(call.call_id, call.tool.name, call.generation_id, result, error)
+        FUNCTION_RESULT_LEAD.observe(time.time() - call.parsed_at)
+
+    async def _send_result(self, call_id: str, name: Optional[str], generation_id: Optional[str],
+                           result: Any = None, error: Optional[str] = None):
+        if not self.results_supported:
+            return
+        message = build_function_result_message(generation_id, call_id, name, result, error)
+        await self.client.send_or_queue(message, "function result")
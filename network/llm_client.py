@@ -2,36 +2,84 @@ import asyncio
 import websockets
 import json
 import os
+import random
 import sys
-import base64
-import wave
+import uuid
 from pathlib import Path
 import cv2
 import numpy as np
+import soundfile as sf
 
 import config
 from config import MessageType, StatusType, StatsType
+from utils.codec import codec
+from utils.executor import executor
 from utils.logger import logger
-from detector import SpeechDetector
+from utils.metrics import metrics
+from utils.turn_trace import tracer
+from detector import SemanticRecognition, SpeechDetector
 from handler import StreamParser
 from handler import TTSHandler
+from handler import TagScheduler
 from handler import IdentityManager
+from handler import FrameSelector
+from network.audio_stream import AudioStreamer
+from network.bandwidth import AdaptiveFrameEncoder
+from network.barge_in import BargeInController
+from network.endpointing import SemanticEndpointer
+from network.function_calls import FunctionCallHandler
+from network.outbound_queue import OutboundQueue
+from network.speech_events import SpeechEventNotifier
+from network.upload_protocol import (
+    AUDIO_STREAM_CAPABILITY,
+    BINARY_UPLOAD_CAPABILITY,
+    CANCEL_CAPABILITY,
+    FUNCTION_RESULT_CAPABILITY,
+    UploadMessage,
+    build_hello_message,
+    build_upload_message,
+    negotiated_capabilities,
+)
 
 WORKSPACE_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(WORKSPACE_ROOT))
 
-from recorder import NativeRecorder
+
+SPEECH_SEGMENTS = metrics.counter(
+    "annie_speech_segments_total", "Speech segments delivered by the recorder", ["result"]
+)
+RECONNECTS = metrics.counter(
+    "annie_llm_reconnects_total", "Reconnect attempts to the LLM server", ["result"]
+)
 
 
 class AnnieMieClient:
-    def __init__(self, server_uri=None):
+    def __init__(
+        self,
+        server_uri=None,
+        speech_detector=None,
+        identity_manager=None,
+        recorder_config=None,
+        turn_tracer=None,
+        semantic_recognition=None,
+    ):
         self.server_uri = server_uri or config.SERVER_URI
         self.websocket = None
         self.recorder = None
-        self.speech_detector = SpeechDetector()
+        self.recorder_config = recorder_config
+        self._shared_models = speech_detector is not None and identity_manager is not None
+        self.speech_detector = speech_detector or SpeechDetector()
         self.stream_parser = StreamParser()
         self.tts_handler = TTSHandler()
-        self.identity_manager = IdentityManager()
+        self.tag_scheduler = TagScheduler(self._on_tag_fired)
+        self.identity_manager = identity_manager or IdentityManager()
+        self.semantic_recognition = semantic_recognition
+        if semantic_recognition is None and config.SEMANTIC_ENDPOINTING and not self._shared_models:
+            self.semantic_recognition = SemanticRecognition()
+        self.frame_selector = FrameSelector()
+        self.frame_encoder = AdaptiveFrameEncoder()
+        self.tracer = turn_tracer or tracer
+        self.tts_handler.tracer = self.tracer
         self.running = False
         self.is_mic_enabled = False
         self.is_cam_enabled = False
@@ -41,54 +89,248 @@ class AnnieMieClient:
         self._pending_stats = None
         self._retry_count = 0
         self._is_simulating = False
+        self.binary_upload = False
+        self.audio_streamer = AudioStreamer(self)
+        self.barge_in = BargeInController(self)
+        self.endpointer = SemanticEndpointer(self)
+        self.function_calls = FunctionCallHandler(self)
+        self._voice_handlers = {
+            "onset": self.barge_in.on_onset,
+            "pause": self.endpointer.on_pause,
+        }
+        self.speech_events = SpeechEventNotifier()
+        self.outbound_queue = OutboundQueue(
+            config.OUTBOUND_QUEUE_MAX_ITEMS, config.OUTBOUND_QUEUE_MAX_AGE, config.OUTBOUND_QUEUE_MAX_BYTES
+        )
+        self.on_connection_change = None
+        self.on_tag_event = None
+        self._connect_lock = asyncio.Lock()
+        self._send_lock = asyncio.Lock()
+        self._connected = asyncio.Event()
+        self._disconnected = asyncio.Event()
+        self._disconnected.set()
+        self._reconnect_now = asyncio.Event()
+        self._generation_id = None
+        self._last_seq = -1
+        self._server_handlers = {
+            MessageType.STATUS: self._on_status,
+            MessageType.TEXT: self._on_text,
+            MessageType.IDENTITY: self._on_identity,
+            MessageType.STATS: self._on_stats,
+            MessageType.ERROR: self._on_error,
+            MessageType.PONG: self._on_pong,
+        }
+        self._status_handlers = {
+            StatusType.GENERATING: self._on_generating,
+            StatusType.DONE: self._on_done,
+            StatusType.CANCELLED: self._on_cancelled,
+        }
 
     async def connect(self):
-        logger.info(f"Connecting to server: {self.server_uri}")
+        async with self._connect_lock:
+            if self.websocket:
+                return True
 
-        try:
-            self.websocket = await websockets.connect(
-                self.server_uri,
-                max_size=10 * 1024 * 1024,
-                ping_interval=20,
-                ping_timeout=60,
+            logger.info(f"Connecting to server: {self.server_uri}")
+
+            try:
+                self.websocket = await websockets.connect(
+                    self.server_uri,
+                    max_size=10 * 1024 * 1024,
+                    ping_interval=20,
+                    ping_timeout=60,
+                )
+                self._send_lock = asyncio.Lock()
+                logger.success("Connected to server!")
+
+                capabilities = await self._negotiate_protocol()
+                self.binary_upload = BINARY_UPLOAD_CAPABILITY in capabilities
+                self.audio_streamer.enabled = AUDIO_STREAM_CAPABILITY in capabilities
+                self.barge_in.cancel_supported = CANCEL_CAPABILITY in capabilities
+                self.function_calls.results_supported = FUNCTION_RESULT_CAPABILITY in capabilities
+                mode = "binary" if self.binary_upload else "JSON"
+                streaming = "on" if self.audio_streamer.enabled else "off"
+                logger.info(f"Upload protocol: {mode}, audio streaming: {streaming}")
+
+            except Exception as e:
+                logger.error(f"Failed to connect: {e}")
+                self.websocket = None
+                return False
+
+            self._disconnected.clear()
+            self._connected.set()
+            self._notify_connection(True)
+
+            await self._resume_generation()
+            await self._replay_outbound()
+            return self.websocket is not None
+
+    def _handle_disconnect(self):
+        if self.websocket is None:
+            return
+
+        self.websocket = None
+        self._connected.clear()
+        self._disconnected.set()
+        self._notify_connection(False)
+
+    def _notify_connection(self, connected: bool):
+        if self.on_connection_change:
+            self.on_connection_change(connected)
+
+    def request_reconnect(self):
+        self._reconnect_now.set()
+
+    async def connection_supervisor(self):
+        attempt = 0
+
+        while self.running:
+            try:
+                await asyncio.wait_for(self._disconnected.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                continue
+
+            if await self.connect():
+                RECONNECTS.inc(result="success")
+                attempt = 0
+                continue
+
+            RECONNECTS.inc(result="failure")
+
+            delay = min(
+                config.RECONNECT_MAX_DELAY,
+                config.RECONNECT_BASE_DELAY * (2 ** min(attempt, 16)),
             )
-            logger.success("Connected to server!")
-            return True
+            delay = random.uniform(delay / 2, delay)
+            attempt += 1
+            logger.info(f"🔁 Reconnecting in {delay:.1f}s (attempt {attempt})")
 
+            self._reconnect_now.clear()
+            try:
+                await asyncio.wait_for(self._reconnect_now.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _resume_generation(self):
+        if self._generation_id is None or not self.is_llm_busy:
+            return
+
+        logger.info(f"🔁 Resuming generation {self._generation_id} after seq {self._last_seq}")
+        try:
+            await self.send_message(UploadMessage(codec.dumps({
+                "type": MessageType.RESUME,
+                "generation_id": self._generation_id,
+                "last_seq": self._last_seq,
+            })))
         except Exception as e:
-            logger.error(f"Failed to connect: {e}")
-            return False
+            logger.warning(f"Failed to request resume: {e}")
+            self._handle_disconnect()
+
+    async def _replay_outbound(self):
+        while self.websocket:
+            entry = self.outbound_queue.pop()
+            if entry is None:
+                break
+
+            _, label, message = entry
+            try:
+                await self.send_message(message)
+                logger.info(f"📤 Replayed queued {label}")
+            except Exception as e:
+                logger.warning(f"Replay of {label} failed: {e}")
+                self.outbound_queue.restore(entry)
+                self._handle_disconnect()
+
+    async def send_message(self, message: UploadMessage):
+        # A binary message is a header frame followed by its parts; holding
+        # the connection's lock keeps other senders from landing in between
+        websocket, lock = self.websocket, self._send_lock
+        if websocket is None:
+            raise ConnectionError("not connected")
+        async with lock:
+            await message.send(websocket)
+
+    async def send_or_queue(self, message, label: str = "turn", queue: bool = True) -> bool:
+        if self.websocket:
+            try:
+                await self.send_message(message)
+                return True
+            except Exception as e:
+                logger.error(f"❌ Failed to send {label}: {e}")
+                self._handle_disconnect()
+
+        if queue:
+            self.outbound_queue.push(message, label)
+        return False
+
+    async def _negotiate_protocol(self) -> list:
+        requested = []
+        if config.BINARY_UPLOAD:
+            requested.append(BINARY_UPLOAD_CAPABILITY)
+        if config.STREAM_AUDIO:
+            requested.append(AUDIO_STREAM_CAPABILITY)
+        if config.BARGE_IN_ENABLED:
+            requested.append(CANCEL_CAPABILITY)
+        if config.TOOLS_ENABLED:
+            requested.append(FUNCTION_RESULT_CAPABILITY)
+        if not requested:
+            return []
+
+        try:
+            await self.send_message(UploadMessage(build_hello_message(requested)))
+            reply = await asyncio.wait_for(
+                self.websocket.recv(), timeout=config.PROTOCOL_NEGOTIATION_TIMEOUT
+            )
+            return negotiated_capabilities(codec.loads(reply), requested)
+        except asyncio.TimeoutError:
+            logger.warning("No hello from server, falling back to JSON uploads")
+        except Exception as e:
+            logger.warning(f"Protocol negotiation failed: {e}")
+        return []
 
     def initialize_components(self):
-        logger.info("Initializing Speech Detector...")
-        self.speech_detector.initialize()
+        if not self._shared_models:
+            logger.info("Initializing Speech Detector...")
+            self.speech_detector.initialize()
+
+            logger.info("Initializing Identity Manager...")
+            self.identity_manager.initialize()
 
-        logger.info("Initializing Identity Manager...")
-        self.identity_manager.initialize()
+            if self.semantic_recognition is not None:
+                self.semantic_recognition.initialize()
 
         logger.info("Initializing Native Recorder...")
-        recorder_config = config.get_recorder_config()
+        from recorder import NativeRecorder
+        recorder_config = self.recorder_config or config.get_recorder_config()
         self.recorder = NativeRecorder(recorder_config)
+        self.speech_events.attach(self.recorder)
 
         self._setup_stream_parser()
 
         logger.success("All components initialized!")
 
+    async def pump_voice_events(self):
+        recorder = self.recorder
+        if recorder is None or not hasattr(recorder, "read_voice_event"):
+            return
+
+        while True:
+            event = recorder.read_voice_event()
+            if event is None:
+                break
+
+            kind, segment_id, event_time, payload = event
+            handler = self._voice_handlers.get(kind)
+            if handler:
+                await handler(segment_id, event_time, payload)
+
     def _setup_stream_parser(self):
         def on_text(text):
             if not self.is_thinking:
                 self.tts_handler.feed_text(text)
 
         def on_tag(tag):
-            tag_type = tag.get("type")
-            value = tag.get("value")
-            delay = tag.get("delay")
-            
-            if tag_type == "emotion":
-                logger.success(f"💜 EMOTION: {value}")
-            elif tag_type == "animate":
-                delay_str = f" (delay={delay}s)" if delay else ""
-                logger.success(f"🎭 ANIMATE: {value}{delay_str}")
+            self.tag_scheduler.add(tag)
 
         def on_think_start():
             self.is_thinking = True
@@ -97,85 +339,135 @@ class AnnieMieClient:
             self.is_thinking = False
             logger.info(f"🧠 Think: {content}")
 
-        def on_function_call(content):
-            logger.info(f"[Function: {content[:60]}...]")
-
         self.stream_parser.on_text = on_text
         self.stream_parser.on_tag = on_tag
         self.stream_parser.on_think_start = on_think_start
         self.stream_parser.on_think_end = on_think_end
-        self.stream_parser.on_function_call = on_function_call
+        self.stream_parser.on_function_start = self.function_calls.on_start
+        self.stream_parser.on_function_delta = self.function_calls.on_delta
+        self.stream_parser.on_function_call = self.function_calls.on_end
+        self.tts_handler.on_chunk_start = self.tag_scheduler.on_chunk_start
+
+    def _on_tag_fired(self, tag):
+        tag_type = tag.get("type")
+        value = tag.get("value")
+        delay = tag.get("delay")
+
+        if tag_type == "emotion":
+            logger.success(f"💜 EMOTION: {value}")
+        elif tag_type == "animate":
+            delay_str = f" (delay={delay}s)" if delay else ""
+            logger.success(f"🎭 ANIMATE: {value}{delay_str}")
+
+        if self.on_tag_event:
+            self.on_tag_event(tag)
 
     async def handle_server_messages(self):
         while self.running:
             try:
                 if not self.websocket:
-                    await asyncio.sleep(2)
+                    try:
+                        await asyncio.wait_for(self._connected.wait(), timeout=1.0)
+                    except asyncio.TimeoutError:
+                        pass
                     continue
                 
-                async for message in self.websocket:
+                websocket = self.websocket
+                async for message in websocket:
                     try:
-                        data = json.loads(message)
-                        msg_type = data.get("type")
-
-                        if msg_type == MessageType.STATUS:
-                            status = data.get("status")
-                            if status == StatusType.GENERATING:
-                                logger.info("🎯 Generating response...")
-                                self.is_llm_busy = True
-                                self.is_thinking = False
-                                self.stream_parser.reset()
-                                self.tts_handler.reset()
-                                self._set_llm_busy(True)
-                            elif status == StatusType.DONE:
-                                logger.success("✅ Response complete")
-                                await self._handle_stream_complete()
-                                self._set_llm_busy(False)
-
-                        elif msg_type == MessageType.TEXT:
-                            text = data.get("text", "")
-                            if text:
-                                self.stream_parser.feed(text)
-
-                        elif msg_type == "identity":
-                            self._handle_identity_message(data)
-
-                        elif msg_type == MessageType.STATS:
-                            stat = data.get("stat")
-                            if stat == StatsType.FIRST_TOKEN:
-                                time_val = data.get("time")
-                                logger.info(f"First token: {time_val:.2f}s")
-                            elif stat == StatsType.COMPLETE:
-                                tokens = data.get("tokens")
-                                time_val = data.get("time")
-                                tok_per_sec = data.get("tok_per_sec")
-                                self._pending_stats = f"Generated {tokens} tokens in {time_val:.2f}s ({tok_per_sec:.2f} tok/s)"
-
-                        elif msg_type == MessageType.ERROR:
-                            error = data.get("error")
-                            logger.error(f"Server error: {error}")
-                            self.is_llm_busy = False
-
-                        elif msg_type == MessageType.PONG:
-                            pass
-                    except json.JSONDecodeError as je:
+                        decoded = codec.decode_server_message(message)
+                        if decoded is None:
+                            continue
+                        handler = self._server_handlers.get(decoded.TYPE)
+                        if handler:
+                            await handler(decoded)
+                    except ValueError as je:
                         logger.error(f"Failed to parse JSON: {je}")
                     except Exception as inner_e:
                         logger.error(f"Error processing message: {inner_e}")
 
+                if websocket is self.websocket:
+                    logger.warning("🔌 Connection closed by server")
+                    self._handle_disconnect()
+
             except websockets.exceptions.ConnectionClosed as cc:
                 logger.warning(f"🔌 Connection closed: {cc}")
-                self.websocket = None
+                self._handle_disconnect()
             except Exception as e:
                 logger.error(f"Error in message handler: {e}")
-                self.websocket = None
-            
-            await asyncio.sleep(1)
+                self._handle_disconnect()
 
-    def _handle_identity_message(self, data):
-        identity_ids = data.get("identity_ids", [])
-        profiles = data.get("profiles", [])
-        
+    async def _on_status(self, message):
+        handler = self._status_handlers.get(message.status)
+        if handler:
+            await handler(message)
+
+    async def _on_generating(self, message):
+        generation_id = message.generation_id
+        if generation_id is not None and generation_id == self._generation_id:
+            logger.info(f"🎯 Generation {generation_id} resumed")
+            return
+        if not self.barge_in.on_generation(generation_id):
+            return
+
+        logger.info("🎯 Generating response...")
+        self.tracer.mark_once("generating")
+        self._generation_id = generation_id
+        self._last_seq = -1
+        self.is_thinking = False
+        self.stream_parser.reset()
+        self.tts_handler.reset()
+        self.tag_scheduler.reset()
+        self._set_llm_busy(True)
+
+    async def _on_done(self, message):
+        if self.barge_in.is_cancelled(message.generation_id):
+            self.barge_in.on_cancelled(self.barge_in.cancelled_generation)
+            return
+
+        logger.success("✅ Response complete")
+        self.tracer.mark("done")
+        self._generation_id = None
+        await self._handle_stream_complete()
+        self.tracer.finish()
+
+    async def _on_cancelled(self, message):
+        self.barge_in.on_cancelled(message.generation_id)
+
+    async def _on_text(self, message):
+        if not self.barge_in.accepts_text():
+            return
+
+        seq = message.seq
+        if seq is not None:
+            if seq <= self._last_seq:
+                return
+            self._last_seq = seq
+
+        if message.text:
+            self.tracer.mark_once("first_token")
+            self.stream_parser.feed(message.text)
+
+    async def _on_identity(self, message):
+        self._handle_identity_message(message.identity_ids, message.profiles)
+
+    async def _on_stats(self, message):
+        if message.stat == StatsType.COMPLETE:
+            self._pending_stats = (
+                f"Generated {message.tokens} tokens in {message.time:.2f}s "
+                f"({message.tok_per_sec:.2f} tok/s)"
+            )
+
+    async def _on_error(self, message):
+        logger.error(f"Server error: {message.error}")
+        self.tracer.discard()
+        self._generation_id = None
+        self._set_llm_busy(False)
+
+    async def _on_pong(self, message):
+        pass
+
+    def _handle_identity_message(self, identity_ids, profiles):
         self.current_identity = {
             "identity_ids": identity_ids,
             "profiles": profiles
@@ -195,71 +487,94 @@ class AnnieMieClient:
     async def _handle_stream_complete(self):
         self.stream_parser.finish()
         await self.tts_handler.flush()
+        self.tag_scheduler.drain()
         
         if self._pending_stats:
             logger.info(self._pending_stats)
             self._pending_stats = None
         
-        self.is_llm_busy = False
+        self._set_llm_busy(False)
         self.tts_handler.reset()
 
     def _set_llm_busy(self, busy: bool):
-        flag_file = config.LLM_BUSY_FLAG
-        if busy:
-            flag_file.touch()
-        else:
-            flag_file.unlink(missing_ok=True)
-
-    def _is_llm_busy_flag(self) -> bool:
-        return config.LLM_BUSY_FLAG.exists()
+        self.is_llm_busy = busy
+        if self.recorder:
+            self.recorder.set_llm_busy(busy)
 
     def _get_audio_duration(self, audio_path: str) -> float:
-        if audio_path.endswith(".wav"):
-            try:
-                with wave.open(audio_path, "rb") as wf:
-                    return wf.getnframes() / float(wf.getframerate())
-            except Exception:
-                pass
-        elif audio_path.endswith(".flac"):
+        try:
+            return sf.info(audio_path).duration
+        except Exception:
+            return 3.0
+
+    def _read_speech_segment(self):
+        return self.recorder.read_speech_event(config.IN_MEMORY_SEGMENTS)
+
+    @staticmethod
+    def _segment_label(segment) -> str:
+        if isinstance(segment, str):
+            return os.path.basename(segment)
+        return f"segment-{segment.id}"
+
+    def _discard_segment(self, segment):
+        self.endpointer.forget(segment)
+        if isinstance(segment, str) and os.path.exists(segment):
             try:
-                with open(audio_path, "rb") as f:
-                    data = f.read()
-                    sample_rate = config.RATE
-                    samples = len(data) * 8 // 16
-                    return samples / sample_rate * 0.5
-            except Exception:
-                pass
-        return 3.0
+                os.remove(segment)
+            except Exception as e:
+                logger.warning(f"Could not delete audio file: {e}")
+
+    async def _segment_audio_bytes(self, segment) -> bytes:
+        if isinstance(segment, str):
+            return await executor.run(self._read_file, segment)
+        return segment.encoded
+
+    @staticmethod
+    def _read_file(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
 
-    async def _process_and_send_message(self, audio_path: str):
+    async def _process_and_send_message(self, segment, stream_id=None):
         from datetime import datetime
+        import time
 
-        duration = self._get_audio_duration(audio_path)
+        if isinstance(segment, str):
+            duration = self._get_audio_duration(segment)
+            frame_window = duration + 0.5
+        else:
+            duration = segment.duration
+            frame_window = max(duration, time.time() - segment.start_time)
+        endpoint_saved = self.endpointer.take(segment)
 
         frames_bytes = []
         latest_frame = None
         decoded_frame = None
         
         if self.is_cam_enabled:
-            frames_bytes = self.recorder.get_frames_for_duration(duration + 0.5)
+            frames_bytes = self.recorder.get_frames_for_duration(frame_window)
             latest_frame = self.recorder.get_latest_frame()
             frame_for_identity = frames_bytes[-1] if frames_bytes else latest_frame
             
             if frame_for_identity:
                 jpeg_array = np.frombuffer(frame_for_identity, dtype=np.uint8)
-                decoded_frame = cv2.imdecode(jpeg_array, cv2.IMREAD_COLOR)
+                decoded_frame = await executor.run(cv2.imdecode, jpeg_array, cv2.IMREAD_COLOR)
+
+        identity_result = await self.identity_manager.identify_speaker_async(decoded_frame)
+        self.tracer.mark("identity_done")
 
-        identity_result = self.identity_manager.identify_speaker(decoded_frame)
+        if stream_id is not None and not self.websocket:
+            await self.audio_streamer.cancel(stream_id)
+            stream_id = None
 
-        with open(audio_path, "rb") as f:
-            audio_base64 = base64.b64encode(f.read()).decode("utf-8")
+        audio_bytes = b""
+        if stream_id is None:
+            audio_bytes = await self._segment_audio_bytes(segment)
 
         session_name = datetime.now().strftime("%d_%m_%y_%H%M%S")
         audio_format = self.recorder.get_audio_format()
 
-        message = {
-            "type": MessageType.AUDIO,
-            "audio_base64": audio_base64,
+        metadata = {
+            "turn_id": self.tracer.active.trace_id if self.tracer.active else uuid.uuid4().hex[:8],
             "audio_format": audio_format,
             "session_name": session_name,
             "identity_ids": identity_result["detected_ids"],
@@ -269,70 +584,75 @@ class AnnieMieClient:
             logger.info(f"Detected identities: {identity_result['detected_ids']}")
         
         if identity_result["new_ids"]:
-            message["new_identity_ids"] = identity_result["new_ids"]
+            metadata["new_identity_ids"] = identity_result["new_ids"]
             logger.info(f"New identities created: {identity_result['new_ids']}")
 
+        sampled_frames = []
         if frames_bytes:
-            total = len(frames_bytes)
-            max_frames = max(1, min(3, total // 60 + 1))
+            frame_shape = decoded_frame.shape[:2] if decoded_frame is not None else None
+            sampled_frames = await executor.run(
+                self.frame_selector.select,
+                frames_bytes,
+                identity_result.get("face_boxes"),
+                frame_shape,
+            )
             
-            if total <= max_frames:
-                sampled_frames = frames_bytes
-            else:
-                step = total // max_frames
-                indices = [i * step for i in range(max_frames)]
-                sampled_frames = [frames_bytes[i] for i in indices]
+            if config.ADAPTIVE_UPLOAD:
+                sampled_frames = await executor.run(
+                    self.frame_encoder.adapt, sampled_frames, len(audio_bytes)
+                )
             
-            encoded_frames = [
-                base64.b64encode(frame).decode("utf-8") for frame in sampled_frames
-            ]
-            message["video_frames"] = encoded_frames
             logger.info(
-                f"{total} frames → {len(sampled_frames)} sent ({duration:.1f}s)"
+                f"{len(frames_bytes)} frames → {len(sampled_frames)} sent ({duration:.1f}s)"
             )
         elif latest_frame:
-            encoded_frame = base64.b64encode(latest_frame).decode("utf-8")
-            message["video_frames"] = [encoded_frame]
+            sampled_frames = [latest_frame]
             logger.info("1 frame sent")
         else:
             logger.warning("No frames available")
 
-        if self.websocket:
-            try:
-                import time
-                send_start = time.time()
-                message_json = json.dumps(message)
-                message_size = len(message_json)
-                    
-                await self.websocket.send(message_json)
-                send_time = time.time() - send_start
-                
-                logger.success("Message sent to server")
-                
-                if config.DEBUG_MESSAGE_STATS:
-                    frames_count = len(message.get("video_frames", []))
-                    audio_size = len(message.get("audio_base64", ""))
-                    stats = {
-                        "audio_file": os.path.basename(audio_path),
-                        "audio_duration": f"{duration:.2f}s",
-                        "audio_base64_size": f"{audio_size / 1024:.1f} KB",
-                        "video_frames": frames_count,
-                        "identities": message.get("identity_ids", []),
-                        "message_size": f"{message_size / 1024:.1f} KB",
-                        "send_time": f"{send_time * 1000:.0f}ms"
-                    }
-                    logger.info(f"📊 Message Stats:\n{json.dumps(stats, indent=2)}")
-            except Exception as e:
-                logger.error(f"❌ Failed to send message: {e}")
-                self.websocket = None
+        if stream_id is not None:
+            message = self.audio_streamer.build_commit(stream_id, metadata, sampled_frames)
         else:
-            logger.warning("Not connected to server, message not sent")
+            message = await executor.run_cpu(
+                build_upload_message, metadata, audio_bytes, sampled_frames, self.binary_upload
+            )
+        self.tracer.mark("payload_built")
+
+        send_start = time.monotonic()
+        sent = await self.send_or_queue(message, "turn", queue=stream_id is None)
+        if sent:
+            self.tracer.mark("sent")
+            self.frame_encoder.observe(message.size, time.monotonic() - send_start)
+
+        if not sent and stream_id is not None:
+            audio_bytes = await self._segment_audio_bytes(segment)
+            message = await executor.run_cpu(
+                build_upload_message, metadata, audio_bytes, sampled_frames, self.binary_upload
+            )
+            self.outbound_queue.push(message, "turn")
 
-        if os.path.exists(audio_path):
-            try:
-                os.remove(audio_path)
-            except Exception as e:
-                logger.warning(f"Could not delete audio file: {e}")
+        if sent:
+            logger.success("Message sent to server")
+            
+            if config.DEBUG_MESSAGE_STATS:
+                stats = {
+                    "audio_file": self._segment_label(segment),
+                    "audio_duration": f"{duration:.2f}s",
+                    "protocol": "binary" if message.binary else "json",
+                    "streamed": stream_id is not None,
+                    "audio_size": f"{len(audio_bytes) / 1024:.1f} KB",
+                    "video_frames": len(sampled_frames),
+                    "upload_quality": self.frame_encoder.describe_level(),
+                    "throughput": self.frame_encoder.describe_throughput(),
+                    "identities": metadata["identity_ids"],
+                    "message_size": f"{message.size / 1024:.1f} KB",
+                    "endpoint": f"early, saved {endpoint_saved:.2f}s" if endpoint_saved is not None else "silence limit",
+                    "turn_id": metadata["turn_id"]
+                }
+                logger.info(f"📊 Message Stats:\n{json.dumps(stats, indent=2)}")
+
+        self._discard_segment(segment)
 
     async def process_audio_events(self):
         logger.info("Starting audio recorder...")
@@ -340,38 +660,52 @@ class AnnieMieClient:
         self.recorder.stop_audio()
         logger.success("Recorder started! Turn on Microphone to interact with Mie.\n")
 
+        await self.run_audio_loop()
+
+    async def run_audio_loop(self, on_segment=None, log_prefix: str = ""):
         while self.running:
-            if not self.is_mic_enabled or self._is_llm_busy_flag():
-                filepath = self.recorder.read_speech_event()
-                if filepath and os.path.exists(filepath):
-                    try:
-                        os.remove(filepath)
-                    except:
-                        pass
-                await asyncio.sleep(0.1)
-                continue
+            await self.audio_streamer.pump()
+            await self.pump_voice_events()
 
-            filepath = self.recorder.read_speech_event()
+            segment = self._read_speech_segment()
+            if not segment:
+                await self.speech_events.wait()
+                continue
 
-            if filepath:
-                try:
-                    is_speech = self.speech_detector.is_speech(filepath)
+            if on_segment:
+                on_segment()
+            if not self.is_mic_enabled or self.is_llm_busy:
+                SPEECH_SEGMENTS.inc(result="ignored")
+                await self.audio_streamer.cancel(await self.audio_streamer.finish())
+                self._discard_segment(segment)
+                continue
 
-                    if not is_speech:
-                        if os.path.exists(filepath):
-                            os.remove(filepath)
-                        continue
+            stream_id = await self.audio_streamer.finish()
+            self.tracer.begin(segment)
+            try:
+                is_speech = await self.speech_detector.is_speech_async(segment)
+                self.tracer.mark("vad_done")
+
+                if not is_speech:
+                    SPEECH_SEGMENTS.inc(result="rejected")
+                    self.tracer.discard()
+                    await self.audio_streamer.cancel(stream_id)
+                    self._discard_segment(segment)
+                    continue
 
-                    logger.success("Speech detected - processing identity...")
+                SPEECH_SEGMENTS.inc(result="accepted")
 
-                    await self._process_and_send_message(filepath)
+                logger.success(f"{log_prefix}Speech detected - processing identity...")
 
-                except Exception as e:
-                    logger.error(f"Error processing audio: {e}")
-                    if os.path.exists(filepath):
-                        os.remove(filepath)
+                if not self.websocket:
+                    logger.warning(f"{log_prefix}LLM not connected - queueing speech for replay")
+                await self._process_and_send_message(segment, stream_id)
 
-            await asyncio.sleep(0.1)
+            except Exception as e:
+                logger.error(f"{log_prefix}Error processing audio: {e}")
+                self.tracer.discard()
+                await self.audio_streamer.cancel(stream_id)
+                self._discard_segment(segment)
 
     async def start(self):
         logger.header("Annie Mie Client")
@@ -385,10 +719,13 @@ class AnnieMieClient:
 
         await self.tts_handler.start()
         self.running = True
+        self.tracer.start_reporting()
 
         try:
             await asyncio.gather(
-                self.handle_server_messages(), self.process_audio_events()
+                self.handle_server_messages(),
+                self.process_audio_events(),
+                self.connection_supervisor(),
             )
 
         except KeyboardInterrupt:
@@ -400,6 +737,7 @@ class AnnieMieClient:
     async def stop(self):
         self.running = False
         self._set_llm_busy(False)
+        self.endpointer.reset()
 
         await self.tts_handler.stop()
 
@@ -408,7 +746,9 @@ class AnnieMieClient:
             logger.info("Recorder stopped")
 
         if self.websocket:
-            await self.websocket.close()
+            websocket = self.websocket
+            self._handle_disconnect()
+            await websocket.close()
             logger.info("Disconnected from server")
 
     async def simulate_message_stream(self, text: str, tokens_per_sec: float, first_token_latency: float):
@@ -420,10 +760,10 @@ class AnnieMieClient:
         logger.info(f"🧪 Simulating message: '{text[:20]}...' (Speed: {tokens_per_sec} tok/s, Init: {first_token_latency}s)")
         
         try:
-            self.is_llm_busy = True
             self.is_thinking = False
             self.stream_parser.reset()
             self.tts_handler.reset()
+            self.tag_scheduler.reset()
             self._set_llm_busy(True)
             
             if first_token_latency > 0:
@@ -436,6 +776,9 @@ class AnnieMieClient:
             delay_per_char = delay_per_token / chars_per_token
             
             for char in text:
+                if not self.is_llm_busy:
+                    logger.info("🧪 Simulation interrupted")
+                    return
                 self.stream_parser.feed(char)
                 await asyncio.sleep(delay_per_char)
                 
@@ -0,0 +1,60 @@
+import time
+from collections import deque
+
+from utils.logger import logger
+
+
+class OutboundQueue:
+
+    def __init__(self, max_items: int, max_age_secs: float, max_bytes: int = 0):
+        self.max_items = max_items
+        self.max_age_secs = max_age_secs
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._items = deque()
+
+    def __len__(self):
+        return len(self._items)
+
+    def push(self, message, label: str = "turn"):
+        self._expire()
+        size = self._size(message)
+        if self.max_bytes and size > self.max_bytes:
+            logger.warning(f"Dropped {label} ({size / 1024:.0f} KB), larger than the outbound queue")
+            return
+
+        while self._items and (
+            len(self._items) >= self.max_items
+            or (self.max_bytes and self.bytes + size > self.max_bytes)
+        ):
+            dropped = self._popleft()
+            logger.warning(f"Outbound queue full, dropped oldest {dropped[1]}")
+
+        self._items.append((time.monotonic(), label, message))
+        self.bytes += size
+        logger.info(f"📥 Queued {label} for replay ({len(self._items)} pending)")
+
+    def pop(self):
+        self._expire()
+        if not self._items:
+            return None
+        return self._popleft()
+
+    def restore(self, entry):
+        self._items.appendleft(entry)
+        self.bytes += self._size(entry[2])
+
+    def _popleft(self):
+        entry = self._items.popleft()
+        self.bytes -= self._size(entry[2])
+        return entry
+
+    @staticmethod
+    def _size(message) -> int:
+        return getattr(message, "size", 0)
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.max_age_secs
+        while self._items and self._items[0][0] < cutoff:
+            _, label, _ = self._popleft()
+            logger.warning(f"Dropped stale {label} from outbound queue")
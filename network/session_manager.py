@@ -0,0 +1,310 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+import config
+from detector import SemanticRecognition, SpeechDetector
+from handler import IdentityManager
+from network.llm_client import AnnieMieClient
+from utils.codec import codec
+from utils.logger import logger
+from utils.metrics import metrics
+from utils.turn_trace import TurnTracer, tracer
+
+
+DEFAULT_SESSION_ID = "default"
+MB = 1024 * 1024
+
+# int16 PCM held by the recorder, its encoded copy, and the float64 copy the
+# VAD makes while classifying the segment
+SPEECH_BYTES_PER_SAMPLE = 2 + 2 + 8
+
+SESSIONS_ACTIVE = metrics.gauge("annie_sessions", "Sessions hosted by this bridge")
+SESSION_MEMORY_BOUND = metrics.gauge(
+    "annie_session_memory_bound_bytes", "Estimated worst-case memory per session", ["session"]
+)
+SESSIONS_REFUSED = metrics.counter(
+    "annie_sessions_refused_total", "Session or web client requests refused by limits", ["reason"]
+)
+
+
+class SessionLimitError(RuntimeError):
+    pass
+
+
+def estimate_session_memory(recorder_config: Dict) -> Dict[str, int]:
+    video = 0
+    if recorder_config.get("video_enabled"):
+        frame_bytes = (
+            recorder_config["video_width"] * recorder_config["video_height"] * config.SESSION_JPEG_BYTES_PER_PIXEL
+        )
+        video = recorder_config["video_fps"] * recorder_config["buffer_duration_secs"] * frame_bytes
+
+    speech = recorder_config["target_sample_rate"] * config.SESSION_MAX_SPEECH_SECS * SPEECH_BYTES_PER_SAMPLE
+
+    return {
+        "video_buffer": int(video),
+        "speech_segment": int(speech),
+        "outbound_queue": int(config.OUTBOUND_QUEUE_MAX_BYTES),
+        "base": int(config.SESSION_BASE_MEMORY_MB * MB),
+    }
+
+
+def fit_recorder_config(recorder_config: Dict, limit_bytes: int) -> Dict:
+    estimate = estimate_session_memory(recorder_config)
+    total = sum(estimate.values())
+    if not limit_bytes or total <= limit_bytes:
+        return recorder_config
+
+    fixed = total - estimate["video_buffer"]
+    per_second = estimate["video_buffer"] / recorder_config["buffer_duration_secs"]
+    buffer_secs = (limit_bytes - fixed) / per_second if per_second > 0 else 0.0
+    if buffer_secs < config.SESSION_MIN_BUFFER_SECS:
+        raise SessionLimitError(
+            f"Session needs {total / MB:.0f} MB, limit is {limit_bytes / MB:.0f} MB "
+            f"even with a {config.SESSION_MIN_BUFFER_SECS:.0f}s video buffer"
+        )
+
+    logger.warning(
+        f"Video buffer cut from {recorder_config['buffer_duration_secs']:.0f}s to {buffer_secs:.0f}s "
+        f"to fit the {limit_bytes / MB:.0f} MB session limit"
+    )
+    fitted = dict(recorder_config)
+    fitted["buffer_duration_secs"] = float(int(buffer_secs))
+    return fitted
+
+
+class SharedModels:
+
+    def __init__(self):
+        self.speech_detector = SpeechDetector()
+        self.identity_manager = IdentityManager()
+        self.semantic_recognition = SemanticRecognition() if config.SEMANTIC_ENDPOINTING else None
+        self._initialized = False
+
+    def initialize(self):
+        if self._initialized:
+            return
+
+        logger.info("Initializing Speech Detector (shared)...")
+        self.speech_detector.initialize()
+
+        logger.info("Initializing Identity Manager (shared)...")
+        self.identity_manager.initialize()
+
+        if self.semantic_recognition is not None:
+            logger.info("Initializing Semantic Recognition (shared)...")
+            self.semantic_recognition.initialize()
+        self._initialized = True
+
+
+class Session:
+
+    def __init__(self, session_id: str, client: AnnieMieClient, recorder_config: Dict):
+        self.id = session_id
+        self.client = client
+        self.recorder_config = recorder_config
+        self.web_clients = set()
+        self.cam_enabled = False
+        self.last_active = time.monotonic()
+        self._tasks = []
+
+    def memory_bound(self) -> Dict[str, int]:
+        return estimate_session_memory(self.recorder_config)
+
+    async def start(self):
+        client = self.client
+        client.initialize_components()
+        await client.tts_handler.start()
+
+        logger.info(f"[{self.id}] Starting Rust Recorder (Audio + Video)...")
+        client.recorder.start()
+        client.recorder.stop_audio()
+        client.running = True
+        client.tracer.start_reporting()
+
+        client.on_connection_change = self._on_llm_connection_change
+        client.on_tag_event = self._on_tag_event
+        self._tasks.append(asyncio.create_task(self._process_audio_loop()))
+
+        if not await client.connect():
+            logger.warning(f"[{self.id}] Could not connect to LLM server. Reconnecting in background.")
+
+        self._tasks.append(asyncio.create_task(client.handle_server_messages()))
+        self._tasks.append(asyncio.create_task(client.connection_supervisor()))
+        logger.success(f"[{self.id}] Session ready")
+
+    async def stop(self):
+        client = self.client
+        client.running = False
+        client._set_llm_busy(False)
+
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        client.tracer.stop_reporting()
+        client.tag_scheduler.reset()
+        client.function_calls.reset()
+        client.endpointer.reset()
+        await client.tts_handler.stop()
+
+        if client.recorder:
+            client.recorder.stop()
+
+        if client.websocket:
+            websocket = client.websocket
+            client._handle_disconnect()
+            await websocket.close()
+
+        for websocket in list(self.web_clients):
+            await websocket.close()
+        logger.info(f"[{self.id}] Session closed")
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def is_idle(self, timeout: float) -> bool:
+        if self.web_clients or self.client.is_mic_enabled or self.client.is_llm_busy:
+            return False
+        return time.monotonic() - self.last_active > timeout
+
+    def add_web_client(self, websocket):
+        if len(self.web_clients) >= config.SESSION_MAX_WEB_CLIENTS:
+            SESSIONS_REFUSED.inc(reason="web_clients")
+            raise SessionLimitError(
+                f"Session {self.id} already has {len(self.web_clients)} web clients"
+            )
+        self.web_clients.add(websocket)
+        self.touch()
+
+    def remove_web_client(self, websocket):
+        self.web_clients.discard(websocket)
+        self.touch()
+
+    async def broadcast(self, data):
+        if not self.web_clients:
+            return
+        payload = codec.dumps(data)
+        for websocket in list(self.web_clients):
+            try:
+                await websocket.send(payload)
+            except Exception:
+                pass
+
+    def _on_llm_connection_change(self, connected: bool):
+        status = "connected" if connected else "disconnected"
+        asyncio.create_task(self.broadcast({"type": "connection", "status": status}))
+
+    def _on_tag_event(self, tag):
+        event = {"type": "tag", "tag": tag.get("type"), "value": tag.get("value")}
+        asyncio.create_task(self.broadcast(event))
+
+    async def _process_audio_loop(self):
+        await self.client.run_audio_loop(on_segment=self.touch, log_prefix=f"[{self.id}] ")
+
+
+class SessionManager:
+
+    def __init__(self, session_configs: Dict[str, Dict] = None, shared: SharedModels = None):
+        self.session_configs = session_configs if session_configs is not None else config.SESSIONS
+        self.shared = shared or SharedModels()
+        self.sessions: Dict[str, Session] = {}
+        self._lock = asyncio.Lock()
+        self._reaper = None
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def get(self, session_id: str) -> Optional[Session]:
+        return self.sessions.get(session_id)
+
+    def memory_bound(self) -> int:
+        return sum(sum(session.memory_bound().values()) for session in self.sessions.values())
+
+    async def get_or_create(self, session_id: str) -> Session:
+        async with self._lock:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                return session
+
+            if session_id not in self.session_configs:
+                SESSIONS_REFUSED.inc(reason="unknown")
+                raise SessionLimitError(f"Unknown session '{session_id}'")
+            if len(self.sessions) >= config.SESSION_MAX_SESSIONS:
+                SESSIONS_REFUSED.inc(reason="sessions")
+                raise SessionLimitError(f"Bridge already hosts {len(self.sessions)} sessions")
+
+            overrides = dict(self.session_configs[session_id])
+            server_uri = overrides.pop("server_uri", None)
+            recorder_config = config.get_recorder_config()
+            recorder_config.update(overrides)
+            try:
+                recorder_config = fit_recorder_config(recorder_config, config.SESSION_MEMORY_LIMIT_MB * MB)
+            except SessionLimitError:
+                SESSIONS_REFUSED.inc(reason="memory")
+                raise
+
+            bound = sum(estimate_session_memory(recorder_config).values())
+            total_limit = config.SESSION_TOTAL_MEMORY_LIMIT_MB * MB
+            if total_limit and self.memory_bound() + bound > total_limit:
+                SESSIONS_REFUSED.inc(reason="memory")
+                raise SessionLimitError(
+                    f"Session {session_id} would take the bridge past {config.SESSION_TOTAL_MEMORY_LIMIT_MB} MB"
+                )
+
+            self.shared.initialize()
+            client = AnnieMieClient(
+                server_uri,
+                speech_detector=self.shared.speech_detector,
+                identity_manager=self.shared.identity_manager,
+                recorder_config=recorder_config,
+                turn_tracer=tracer if session_id == DEFAULT_SESSION_ID else TurnTracer(),
+                semantic_recognition=self.shared.semantic_recognition,
+            )
+            session = Session(session_id, client, recorder_config)
+            try:
+                await session.start()
+            except Exception:
+                await session.stop()
+                raise
+
+            self.sessions[session_id] = session
+            SESSIONS_ACTIVE.set(len(self.sessions))
+            SESSION_MEMORY_BOUND.set(bound, session=session_id)
+            logger.info(
+                f"🧩 Session {session_id} up ({len(self.sessions)} total), "
+                f"memory bound {bound / MB:.0f} MB, bridge bound {self.memory_bound() / MB:.0f} MB"
+            )
+            return session
+
+    async def close(self, session_id: str):
+        async with self._lock:
+            session = self.sessions.pop(session_id, None)
+            if session is None:
+                return
+            SESSIONS_ACTIVE.set(len(self.sessions))
+            SESSION_MEMORY_BOUND.remove(session=session_id)
+        await session.stop()
+
+    async def close_all(self):
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
+        for session_id in list(self.sessions):
+            await self.close(session_id)
+
+    def start_reaping(self, timeout: float = None, keep=(DEFAULT_SESSION_ID,)):
+        timeout = timeout if timeout is not None else config.SESSION_IDLE_TIMEOUT
+        if timeout and self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_periodically(timeout, set(keep)))
+
+    async def reap_idle(self, timeout: float, keep=()):
+        for session_id, session in list(self.sessions.items()):
+            if session_id not in keep and session.is_idle(timeout):
+                logger.info(f"🧩 Closing idle session {session_id}")
+                await self.close(session_id)
+
+    async def _reap_periodically(self, timeout: float, keep):
+        while True:
+            await asyncio.sleep(min(timeout, 60.0))
+            await self.reap_idle(timeout, keep)
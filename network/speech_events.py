@@ -0,0 +1,38 @@
+import asyncio
+
+import config
+from utils.logger import logger
+
+
+class SpeechEventNotifier:
+
+    def __init__(self):
+        self.native = False
+        self._event = asyncio.Event()
+        self._loop = None
+
+    def attach(self, recorder):
+        self._loop = asyncio.get_running_loop()
+
+        if hasattr(recorder, "set_event_callback"):
+            recorder.set_event_callback(self._on_native_event)
+            self.native = True
+            logger.info("Speech events: native notifications")
+        else:
+            logger.warning(
+                f"Recorder has no event callback, polling every {config.SPEECH_EVENT_POLL_INTERVAL * 1000:.0f}ms"
+            )
+
+    def _on_native_event(self):
+        self._loop.call_soon_threadsafe(self._event.set)
+
+    async def wait(self):
+        if not self.native:
+            await asyncio.sleep(config.SPEECH_EVENT_POLL_INTERVAL)
+            return
+
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=config.SPEECH_EVENT_WAIT_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        self._event.clear()
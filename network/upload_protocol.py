@@ -0,0 +1,136 @@
+import base64
+from typing import Any, Dict, List, Optional
+
+from config import MessageType
+from utils.codec import codec
+from utils.metrics import metrics
+
+BINARY_UPLOAD_CAPABILITY = "binary_upload"
+AUDIO_STREAM_CAPABILITY = "audio_stream"
+CANCEL_CAPABILITY = "cancel"
+FUNCTION_RESULT_CAPABILITY = "function_result"
+
+UPLOAD_BYTES = metrics.counter(
+    "annie_upload_bytes_total", "Bytes sent to the LLM server", ["protocol"]
+)
+
+
+class UploadMessage:
+
+    def __init__(self, header: str, parts: Optional[List[bytes]] = None, binary: bool = False):
+        self.header = header
+        self.parts = parts or []
+        self.binary = binary
+
+    @property
+    def size(self) -> int:
+        return len(self.header) + sum(len(part) for part in self.parts)
+
+    async def send(self, websocket):
+        await websocket.send(self.header)
+        for part in self.parts:
+            await websocket.send(part)
+        UPLOAD_BYTES.inc(self.size, protocol="binary" if self.binary else "json")
+
+
+def build_hello_message(capabilities: List[str]) -> str:
+    return codec.dumps({
+        "type": MessageType.HELLO,
+        "capabilities": capabilities,
+    })
+
+
+def negotiated_capabilities(hello: Dict, requested: List[str]) -> List[str]:
+    if hello.get("type") != MessageType.HELLO:
+        return []
+    offered = hello.get("capabilities", [])
+    return [capability for capability in requested if capability in offered]
+
+
+def build_json_message(metadata: Dict, audio_bytes: Optional[bytes], frames: List[bytes],
+                       msg_type: str = MessageType.AUDIO) -> UploadMessage:
+    message = {"type": msg_type}
+    if audio_bytes is not None:
+        message["audio_base64"] = base64.b64encode(audio_bytes).decode("utf-8")
+    message.update(metadata)
+
+    if frames:
+        message["video_frames"] = [
+            base64.b64encode(frame).decode("utf-8") for frame in frames
+        ]
+
+    return UploadMessage(codec.dumps(message))
+
+
+def build_binary_message(metadata: Dict, audio_bytes: Optional[bytes], frames: List[bytes],
+                         msg_type: str = MessageType.AUDIO_BINARY) -> UploadMessage:
+    header = {"type": msg_type}
+    header.update(metadata)
+
+    parts = []
+    descriptors = []
+    if audio_bytes is not None:
+        parts.append(audio_bytes)
+        descriptors.append({"kind": "audio", "size": len(audio_bytes)})
+    for frame in frames:
+        parts.append(frame)
+        descriptors.append({"kind": "video_frame", "size": len(frame)})
+    header["parts"] = descriptors
+
+    return UploadMessage(codec.dumps(header), parts, binary=True)
+
+
+def build_upload_message(metadata: Dict, audio_bytes: bytes, frames: List[bytes], binary: bool) -> UploadMessage:
+    if binary:
+        return build_binary_message(metadata, audio_bytes, frames)
+    return build_json_message(metadata, audio_bytes, frames)
+
+
+def build_audio_chunk_message(stream_id: int, seq: int, pcm: bytes, sample_rate: int,
+                              binary: bool) -> UploadMessage:
+    metadata = {
+        "stream_id": stream_id,
+        "seq": seq,
+        "audio_format": "pcm_s16le",
+        "sample_rate": sample_rate,
+    }
+    if binary:
+        return build_binary_message(metadata, pcm, [], msg_type=MessageType.AUDIO_CHUNK)
+    return build_json_message(metadata, pcm, [], msg_type=MessageType.AUDIO_CHUNK)
+
+
+def build_audio_commit_message(stream_id: int, metadata: Dict, frames: List[bytes],
+                               binary: bool) -> UploadMessage:
+    metadata = dict(metadata, stream_id=stream_id)
+    if binary:
+        return build_binary_message(metadata, None, frames, msg_type=MessageType.AUDIO_COMMIT)
+    return build_json_message(metadata, None, frames, msg_type=MessageType.AUDIO_COMMIT)
+
+
+def build_audio_cancel_message(stream_id: int) -> UploadMessage:
+    return UploadMessage(codec.dumps({
+        "type": MessageType.AUDIO_CANCEL,
+        "stream_id": stream_id,
+    }))
+
+
+def build_cancel_message(generation_id: Optional[str]) -> UploadMessage:
+    return UploadMessage(codec.dumps({
+        "type": MessageType.CANCEL,
+        "generation_id": generation_id,
+    }))
+
+
+def build_function_result_message(generation_id: Optional[str], call_id: str, name: Optional[str],
+                                  result: Any = None, error: Optional[str] = None) -> UploadMessage:
+    message = {
+        "type": MessageType.FUNCTION_RESULT,
+        "generation_id": generation_id,
+        "call_id": call_id,
+        "name": name,
+    }
+    if error is not None:
+        message["error"] = error
+    else:
+        message["result"] = result
+    return UploadMessage(codec.dumps(message))
@@ -1,21 +1,36 @@
 use cpal::traits::{DeviceTrait, HostTrait, StreamTrait};
+use std::sync::atomic::AtomicBool;
 use std::sync::{Arc, Mutex};
 use crossbeam_channel::Sender;
 use anyhow::Result;
 use crate::config::AudioConfig;
-use crate::vad::VoiceActivityDetector;
+use crate::segment::SpeechSegment;
+use crate::vad::{StreamEvent, VoiceActivityDetector, VoiceEvent};
 
 pub struct AudioRecorder {
     stream: Option<cpal::Stream>,
     vad: Arc<Mutex<VoiceActivityDetector>>,
-    filepath_sender: Sender<String>,
+    segment_sender: Sender<SpeechSegment>,
+    notify_sender: Sender<()>,
 }
 
 impl AudioRecorder {
-    pub fn new(config: AudioConfig, filepath_sender: Sender<String>) -> Result<Self> {
+    pub fn new(
+        config: AudioConfig,
+        segment_sender: Sender<SpeechSegment>,
+        stream_sender: Option<Sender<StreamEvent>>,
+        voice_sender: Sender<VoiceEvent>,
+        llm_busy: Arc<AtomicBool>,
+        notify_sender: Sender<()>,
+    ) -> Result<Self> {
         let host = cpal::default_host();
-        let device = host.default_input_device()
-            .ok_or_else(|| anyhow::anyhow!("No input device found"))?;
+        let device = match &config.input_device {
+            Some(name) => host.input_devices()?
+                .find(|device| device.name().map(|n| n.contains(name.as_str())).unwrap_or(false))
+                .ok_or_else(|| anyhow::anyhow!("Input device '{}' not found", name))?,
+            None => host.default_input_device()
+                .ok_or_else(|| anyhow::anyhow!("No input device found"))?,
+        };
 
         let default_config = device.default_input_config()?;
         let sample_rate = default_config.sample_rate().0;
@@ -28,9 +43,16 @@ impl AudioRecorder {
         let mut sample_buffer: Vec<f32> = Vec::new();
 
         // Initialize VAD
-        let vad = Arc::new(Mutex::new(VoiceActivityDetector::new(config)));
+        let vad = Arc::new(Mutex::new(VoiceActivityDetector::new(
+            config,
+            stream_sender,
+            voice_sender,
+            llm_busy,
+            notify_sender.clone(),
+        )));
         let vad_clone = Arc::clone(&vad);
-        let sender_clone = filepath_sender.clone();
+        let sender_clone = segment_sender.clone();
+        let notify_clone = notify_sender.clone();
 
         let err_fn = |err| eprintln!("an error occurred on stream: {}", err);
 
@@ -62,11 +84,12 @@ impl AudioRecorder {
 
                     // Process through VAD
                     if let Ok(mut vad) = vad_clone.lock() {
-                        if let Some(filepath) = vad.process_chunk(pcm_chunk) {
-                            // Speech segment completed, send filepath
-                            if let Err(e) = sender_clone.send(filepath) {
-                                eprintln!("Failed to send filepath: {}", e);
+                        if let Some(segment) = vad.process_chunk(pcm_chunk) {
+                            // Speech segment completed, hand it to Python
+                            if let Err(e) = sender_clone.send(segment) {
+                                eprintln!("Failed to send speech segment: {}", e);
                             }
+                            let _ = notify_clone.try_send(());
                         }
                     }
                 }
@@ -78,10 +101,29 @@ impl AudioRecorder {
         Ok(Self {
             stream: Some(stream),
             vad,
-            filepath_sender,
+            segment_sender,
+            notify_sender,
         })
     }
 
+    pub fn finalize_segment(&self, segment_id: u64) -> Result<bool> {
+        let segment = match self.vad.lock() {
+            Ok(mut vad) => vad.finalize_segment(segment_id),
+            Err(_) => return Err(anyhow::anyhow!("VAD lock poisoned")),
+        };
+
+        match segment {
+            Some(segment) => {
+                self.segment_sender
+                    .send(segment)
+                    .map_err(|e| anyhow::anyhow!("Failed to send speech segment: {}", e))?;
+                let _ = self.notify_sender.try_send(());
+                Ok(true)
+            }
+            None => Ok(false),
+        }
+    }
+
     pub fn start(&self) -> Result<()> {
         if let Some(ref stream) = self.stream {
             stream.play()?;
@@ -26,6 +26,11 @@ pub struct AudioConfig {
     pub min_record_seconds: f32,
     pub background_alpha: f32,
     pub output_directory: String,
+    pub stream_audio: bool,
+    pub input_device: Option<String>,
+    pub onset_min_secs: f32,
+    pub barge_in_spike_factor: f32,
+    pub pause_secs: f32,
 }
 
 impl Default for AudioConfig {
@@ -43,6 +48,11 @@ impl Default for AudioConfig {
             min_record_seconds: 0.3,
             background_alpha: 0.95,
             output_directory: "data/recordings".to_string(),
+            stream_audio: false,
+            input_device: None,
+            onset_min_secs: 0.25,
+            barge_in_spike_factor: 4.0,
+            pause_secs: 0.0,
         }
     }
 }
@@ -130,6 +140,23 @@ impl RecorderConfig {
         if let Some(ConfigValue::String(val)) = dict.get("output_directory") {
             config.audio.output_directory = val.clone();
         }
+        if let Some(ConfigValue::Bool(val)) = dict.get("stream_audio") {
+            config.audio.stream_audio = *val;
+        }
+        if let Some(ConfigValue::Float(val)) = dict.get("onset_min_secs") {
+            config.audio.onset_min_secs = *val as f32;
+        }
+        if let Some(ConfigValue::Float(val)) = dict.get("barge_in_spike_factor") {
+            config.audio.barge_in_spike_factor = *val as f32;
+        }
+        if let Some(ConfigValue::Float(val)) = dict.get("pause_secs") {
+            config.audio.pause_secs = *val as f32;
+        }
+        if let Some(ConfigValue::String(val)) = dict.get("input_device") {
+            if !val.is_empty() {
+                config.audio.input_device = Some(val.clone());
+            }
+        }
 
         if let Some(ConfigValue::Bool(val)) = dict.get("video_enabled") {
             config.video.enabled = *val;
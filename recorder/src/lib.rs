@@ -1,23 +1,35 @@
-use crossbeam_channel::{unbounded, Receiver};
+use crossbeam_channel::{bounded, unbounded, Receiver};
+use parking_lot::Mutex;
 use pyo3::prelude::*;
 use pyo3::types::PyDict;
 use std::collections::HashMap;
+use std::sync::atomic::{AtomicBool, Ordering};
+use std::sync::Arc;
 
 mod audio;
 mod config;
 mod frame_buffer;
+mod segment;
 mod vad;
 mod video;
 
 use audio::AudioRecorder;
 use config::{ConfigValue, RecorderConfig};
+use segment::SpeechSegment;
+use vad::{StreamEvent, VoiceEvent};
 use video::VideoRecorder;
 
 #[pyclass(unsendable)]
 struct NativeRecorder {
     audio: Option<AudioRecorder>,
     video: Option<VideoRecorder>,
-    filepath_rx: Receiver<String>,
+    segment_rx: Receiver<SpeechSegment>,
+    stream_rx: Receiver<StreamEvent>,
+    voice_rx: Receiver<VoiceEvent>,
+    llm_busy: Arc<AtomicBool>,
+    notify_rx: Receiver<()>,
+    event_callback: Arc<Mutex<Option<PyObject>>>,
+    notifier_started: bool,
     config: RecorderConfig,
 }
 
@@ -28,9 +40,26 @@ impl NativeRecorder {
         let config_map = parse_python_dict(py_config)?;
         let config = RecorderConfig::from_python_dict(&config_map);
 
-        let (filepath_tx, filepath_rx) = unbounded();
+        let (segment_tx, segment_rx) = unbounded();
+        let (stream_tx, stream_rx) = unbounded();
+        let stream_sender = if config.audio.stream_audio {
+            Some(stream_tx)
+        } else {
+            None
+        };
+
+        let (voice_tx, voice_rx) = unbounded();
+        let llm_busy = Arc::new(AtomicBool::new(false));
+        let (notify_tx, notify_rx) = bounded(1);
 
-        let audio = AudioRecorder::new(config.audio.clone(), filepath_tx)
+        let audio = AudioRecorder::new(
+            config.audio.clone(),
+            segment_tx,
+            stream_sender,
+            voice_tx,
+            Arc::clone(&llm_busy),
+            notify_tx,
+        )
             .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
 
         let video = if config.video.enabled {
@@ -45,7 +74,13 @@ impl NativeRecorder {
         Ok(NativeRecorder {
             audio: Some(audio),
             video,
-            filepath_rx,
+            segment_rx,
+            stream_rx,
+            voice_rx,
+            llm_busy,
+            notify_rx,
+            event_callback: Arc::new(Mutex::new(None)),
+            notifier_started: false,
             config,
         })
     }
@@ -104,10 +139,100 @@ impl NativeRecorder {
         Ok(())
     }
 
-    fn read_speech_event(&self) -> PyResult<Option<String>> {
-        match self.filepath_rx.try_recv() {
-            Ok(filepath) => Ok(Some(filepath)),
-            Err(_) => Ok(None),
+    fn set_llm_busy(&self, busy: bool) {
+        self.llm_busy.store(busy, Ordering::Relaxed);
+    }
+
+    fn is_llm_busy(&self) -> bool {
+        self.llm_busy.load(Ordering::Relaxed)
+    }
+
+    fn set_event_callback(&mut self, callback: Option<PyObject>) {
+        *self.event_callback.lock() = callback;
+
+        if self.notifier_started {
+            return;
+        }
+        self.notifier_started = true;
+
+        let notify_rx = self.notify_rx.clone();
+        let event_callback = Arc::clone(&self.event_callback);
+        std::thread::spawn(move || {
+            while notify_rx.recv().is_ok() {
+                Python::with_gil(|py| {
+                    let callback = event_callback.lock().as_ref().map(|c| c.clone_ref(py));
+                    if let Some(callback) = callback {
+                        if let Err(e) = callback.call0(py) {
+                            e.print(py);
+                        }
+                    }
+                });
+            }
+        });
+    }
+
+    #[pyo3(signature = (as_segment=false))]
+    fn read_speech_event(&self, py: Python, as_segment: bool) -> PyResult<Option<PyObject>> {
+        let segment = match self.segment_rx.try_recv() {
+            Ok(segment) => segment,
+            Err(_) => return Ok(None),
+        };
+
+        if as_segment {
+            return Ok(Some(Py::new(py, segment)?.into_py(py)));
+        }
+
+        let filepath = segment
+            .write_to(&self.config.audio.output_directory)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyIOError, _>(e.to_string()))?;
+        Ok(Some(filepath.into_py(py)))
+    }
+
+    fn read_audio_chunk(&self, py: Python) -> PyResult<Option<(String, u64, PyObject)>> {
+        use pyo3::types::PyBytes;
+
+        let event = match self.stream_rx.try_recv() {
+            Ok(event) => event,
+            Err(_) => return Ok(None),
+        };
+
+        let empty = || -> PyObject { PyBytes::new(py, &[]).into() };
+        Ok(Some(match event {
+            StreamEvent::Start(id) => ("start".to_string(), id, empty()),
+            StreamEvent::Chunk(id, samples) => {
+                let pcm: Vec<u8> = samples.iter().flat_map(|s| s.to_le_bytes()).collect();
+                ("chunk".to_string(), id, PyBytes::new(py, &pcm).into())
+            }
+            StreamEvent::End(id) => ("end".to_string(), id, empty()),
+            StreamEvent::Cancel(id) => ("cancel".to_string(), id, empty()),
+        }))
+    }
+
+    fn read_voice_event(&self, py: Python) -> PyResult<Option<(String, u64, f64, PyObject)>> {
+        use pyo3::types::PyBytes;
+
+        let event = match self.voice_rx.try_recv() {
+            Ok(event) => event,
+            Err(_) => return Ok(None),
+        };
+
+        Ok(Some(match event {
+            VoiceEvent::Onset(id, onset_time) => {
+                ("onset".to_string(), id, onset_time, PyBytes::new(py, &[]).into())
+            }
+            VoiceEvent::Pause(id, voiced_until, samples) => {
+                let pcm: Vec<u8> = samples.iter().flat_map(|s| s.to_le_bytes()).collect();
+                ("pause".to_string(), id, voiced_until, PyBytes::new(py, &pcm).into())
+            }
+        }))
+    }
+
+    fn finalize_segment(&self, segment_id: u64) -> PyResult<bool> {
+        match &self.audio {
+            Some(audio) => audio
+                .finalize_segment(segment_id)
+                .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string())),
+            None => Ok(false),
         }
     }
 
@@ -170,5 +295,6 @@ fn parse_python_dict(py_dict: &PyDict) -> PyResult<HashMap<String, ConfigValue>>
 #[pymodule]
 fn recorder(_py: Python, m: &PyModule) -> PyResult<()> {
     m.add_class::<NativeRecorder>()?;
+    m.add_class::<SpeechSegment>()?;
     Ok(())
 }
@@ -0,0 +1,175 @@
+use crate::config::AudioFormat;
+use anyhow::Result;
+use pyo3::exceptions::PyBufferError;
+use pyo3::ffi;
+use pyo3::prelude::*;
+use pyo3::types::PyBytes;
+use std::ffi::CStr;
+use std::fs;
+use std::os::raw::{c_int, c_void};
+use std::path::PathBuf;
+use std::ptr;
+
+#[pyclass]
+pub struct SpeechSegment {
+    #[pyo3(get)]
+    pub id: u64,
+    #[pyo3(get)]
+    pub sample_rate: u32,
+    #[pyo3(get)]
+    pub start_time: f64,
+    #[pyo3(get)]
+    pub end_time: f64,
+    #[pyo3(get)]
+    pub duration: f64,
+    #[pyo3(get)]
+    pub peak: f32,
+    #[pyo3(get)]
+    pub rms: f32,
+    pub format: AudioFormat,
+    pub pcm: Vec<i16>,
+    pub encoded: Vec<u8>,
+    sample_count: isize,
+}
+
+impl SpeechSegment {
+    pub fn new(
+        id: u64,
+        sample_rate: u32,
+        start_time: f64,
+        end_time: f64,
+        format: AudioFormat,
+        pcm: Vec<i16>,
+        encoded: Vec<u8>,
+    ) -> Self {
+        let duration = pcm.len() as f64 / sample_rate as f64;
+        let (peak, rms) = levels(&pcm);
+        let sample_count = pcm.len() as isize;
+
+        SpeechSegment {
+            id,
+            sample_rate,
+            start_time,
+            end_time,
+            duration,
+            peak,
+            rms,
+            format,
+            pcm,
+            encoded,
+            sample_count,
+        }
+    }
+
+    pub fn extension(&self) -> &'static str {
+        match self.format {
+            AudioFormat::Flac => "flac",
+            AudioFormat::Wav => "wav",
+        }
+    }
+
+    pub fn write_to(&self, directory: &str) -> Result<String> {
+        fs::create_dir_all(directory)?;
+
+        let timestamp = chrono::Local::now().format("%y%m%d_%H%M%S").to_string();
+        let filename = format!("{}.{}", timestamp, self.extension());
+        let filepath = PathBuf::from(directory).join(&filename);
+        fs::write(&filepath, &self.encoded)?;
+
+        Ok(filepath.to_string_lossy().to_string())
+    }
+}
+
+fn levels(samples: &[i16]) -> (f32, f32) {
+    if samples.is_empty() {
+        return (0.0, 0.0);
+    }
+
+    let mut peak: i32 = 0;
+    let mut sum_squares: f64 = 0.0;
+    for &s in samples {
+        peak = peak.max((s as i32).abs());
+        let normalized = s as f64 / 32767.0;
+        sum_squares += normalized * normalized;
+    }
+
+    let rms = (sum_squares / samples.len() as f64).sqrt() as f32;
+    ((peak as f32 / 32767.0).min(1.0), rms)
+}
+
+#[pymethods]
+impl SpeechSegment {
+    #[getter]
+    fn encoded<'py>(&self, py: Python<'py>) -> &'py PyBytes {
+        PyBytes::new(py, &self.encoded)
+    }
+
+    #[getter]
+    fn audio_format(&self) -> &'static str {
+        self.extension()
+    }
+
+    #[getter]
+    fn sample_count(&self) -> usize {
+        self.pcm.len()
+    }
+
+    fn __len__(&self) -> usize {
+        self.pcm.len()
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "SpeechSegment(id={}, duration={:.2}s, peak={:.3}, rms={:.3}, format='{}')",
+            self.id,
+            self.duration,
+            self.peak,
+            self.rms,
+            self.extension()
+        )
+    }
+
+    unsafe fn __getbuffer__(
+        slf: &PyCell<Self>,
+        view: *mut ffi::Py_buffer,
+        flags: c_int,
+    ) -> PyResult<()> {
+        if view.is_null() {
+            return Err(PyBufferError::new_err("View is null"));
+        }
+        if (flags & ffi::PyBUF_WRITABLE) == ffi::PyBUF_WRITABLE {
+            return Err(PyBufferError::new_err("SpeechSegment PCM is read-only"));
+        }
+
+        let segment = slf.borrow();
+
+        ffi::Py_INCREF(slf.as_ptr());
+        (*view).obj = slf.as_ptr();
+        (*view).buf = segment.pcm.as_ptr() as *mut c_void;
+        (*view).len = (segment.pcm.len() * std::mem::size_of::<i16>()) as isize;
+        (*view).readonly = 1;
+        (*view).itemsize = std::mem::size_of::<i16>() as isize;
+        (*view).format = if (flags & ffi::PyBUF_FORMAT) == ffi::PyBUF_FORMAT {
+            CStr::from_bytes_with_nul(b"h\0").unwrap().as_ptr() as *mut _
+        } else {
+            ptr::null_mut()
+        };
+        (*view).ndim = 1;
+        (*view).shape = if (flags & ffi::PyBUF_ND) == ffi::PyBUF_ND {
+            &segment.sample_count as *const isize as *mut isize
+        } else {
+            ptr::null_mut()
+        };
+        (*view).strides = if (flags & ffi::PyBUF_STRIDES) == ffi::PyBUF_STRIDES {
+            &mut (*view).itemsize
+        } else {
+            ptr::null_mut()
+        };
+        (*view).suboffsets = ptr::null_mut();
+        (*view).internal = ptr::null_mut();
+
+        Ok(())
+    }
+
+    unsafe fn __releasebuffer__(&self, _view: *mut ffi::Py_buffer) {}
+}
@@ -1,10 +1,23 @@
 use crate::config::{AudioConfig, AudioFormat};
 use anyhow::Result;
+use crossbeam_channel::Sender;
 use flacenc::error::Verify;
+use crate::segment::SpeechSegment;
 use std::collections::VecDeque;
-use std::fs::{self, File};
-use std::io::BufWriter;
-use std::path::PathBuf;
+use std::sync::atomic::{AtomicBool, Ordering};
+use std::sync::Arc;
+
+pub enum StreamEvent {
+    Start(u64),
+    Chunk(u64, Vec<i16>),
+    End(u64),
+    Cancel(u64),
+}
+
+pub enum VoiceEvent {
+    Onset(u64, f64),
+    Pause(u64, f64, Vec<i16>),
+}
 
 pub struct VoiceActivityDetector {
     config: AudioConfig,
@@ -15,10 +28,26 @@ pub struct VoiceActivityDetector {
     recording_buffer: Vec<i16>,
     pre_buffer: VecDeque<Vec<i16>>,
     chunk_duration_secs: f32,
+    stream_sender: Option<Sender<StreamEvent>>,
+    voice_sender: Sender<VoiceEvent>,
+    segment_id: u64,
+    llm_busy: Arc<AtomicBool>,
+    notify_sender: Sender<()>,
+    segment_start_time: f64,
+    onset_time: f64,
+    speech_duration: f32,
+    onset_sent: bool,
+    pause_sent: bool,
 }
 
 impl VoiceActivityDetector {
-    pub fn new(config: AudioConfig) -> Self {
+    pub fn new(
+        config: AudioConfig,
+        stream_sender: Option<Sender<StreamEvent>>,
+        voice_sender: Sender<VoiceEvent>,
+        llm_busy: Arc<AtomicBool>,
+        notify_sender: Sender<()>,
+    ) -> Self {
         let chunk_duration_secs = config.chunk_size as f32 / config.target_sample_rate as f32;
 
         VoiceActivityDetector {
@@ -30,6 +59,16 @@ impl VoiceActivityDetector {
             recording_buffer: Vec::new(),
             pre_buffer: VecDeque::with_capacity(10),
             chunk_duration_secs,
+            stream_sender,
+            voice_sender,
+            segment_id: 0,
+            llm_busy,
+            notify_sender,
+            segment_start_time: 0.0,
+            onset_time: 0.0,
+            speech_duration: 0.0,
+            onset_sent: false,
+            pause_sent: false,
         }
     }
 
@@ -49,7 +88,7 @@ impl VoiceActivityDetector {
         (sum_squares / samples.len() as f64).sqrt() as f32
     }
 
-    pub fn process_chunk(&mut self, chunk: Vec<i16>) -> Option<String> {
+    pub fn process_chunk(&mut self, chunk: Vec<i16>) -> Option<SpeechSegment> {
         let volume = self.calculate_rms(&chunk);
 
         if !self.is_active {
@@ -61,17 +100,34 @@ impl VoiceActivityDetector {
                 self.pre_buffer.pop_front();
             }
 
-            if volume > self.background_level * self.config.spike_factor {
+            // Playback bleeds into the mic while the assistant talks, so a
+            // barge-in has to stand further above the background
+            let spike_factor = if self.is_llm_busy() {
+                self.config.barge_in_spike_factor
+            } else {
+                self.config.spike_factor
+            };
+
+            if volume > self.background_level * spike_factor {
                 self.start_recording(volume);
                 for buffered_chunk in &self.pre_buffer {
                     self.recording_buffer.extend_from_slice(buffered_chunk);
                 }
                 self.recording_buffer.extend_from_slice(&chunk);
+
+                if self.stream_sender.is_some() {
+                    self.send_stream_event(StreamEvent::Start(self.segment_id));
+                    let initial = self.recording_buffer.clone();
+                    self.send_stream_event(StreamEvent::Chunk(self.segment_id, initial));
+                }
             }
 
             None
         } else {
             self.recording_buffer.extend_from_slice(&chunk);
+            if self.stream_sender.is_some() {
+                self.send_stream_event(StreamEvent::Chunk(self.segment_id, chunk));
+            }
 
             if volume > self.peak_volume {
                 self.peak_volume = volume;
@@ -87,11 +143,36 @@ impl VoiceActivityDetector {
                 self.silent_duration += self.chunk_duration_secs;
             } else {
                 self.silent_duration = 0.0;
+                self.speech_duration += self.chunk_duration_secs;
+                self.pause_sent = false;
+            }
+
+            if !self.onset_sent && self.speech_duration >= self.config.onset_min_secs {
+                self.onset_sent = true;
+                self.send_voice_event(VoiceEvent::Onset(self.segment_id, self.onset_time));
             }
 
             let total_samples = self.recording_buffer.len();
             let recording_duration = total_samples as f32 / self.config.target_sample_rate as f32;
 
+            // A short pause hands the partial segment to Python, which may
+            // end the turn early through finalize_segment()
+            if self.config.pause_secs > 0.0
+                && !self.pause_sent
+                && !self.is_llm_busy()
+                && self.silent_duration >= self.config.pause_secs
+                && self.silent_duration < self.config.silence_limit_secs
+                && recording_duration >= self.config.min_record_seconds
+            {
+                self.pause_sent = true;
+                let voiced_until = unix_time() - self.silent_duration as f64;
+                self.send_voice_event(VoiceEvent::Pause(
+                    self.segment_id,
+                    voiced_until,
+                    self.recording_buffer.clone(),
+                ));
+            }
+
             if self.silent_duration >= self.config.silence_limit_secs
                 && recording_duration >= self.config.min_record_seconds
             {
@@ -102,59 +183,96 @@ impl VoiceActivityDetector {
         }
     }
 
+    fn send_stream_event(&self, event: StreamEvent) {
+        if let Some(sender) = &self.stream_sender {
+            if let Err(e) = sender.send(event) {
+                eprintln!("Failed to send stream event: {}", e);
+            }
+            let _ = self.notify_sender.try_send(());
+        }
+    }
+
+    pub fn finalize_segment(&mut self, segment_id: u64) -> Option<SpeechSegment> {
+        // Only while the speaker is still quiet: if they started talking
+        // again the partial audio the decision was made on is stale
+        if !self.is_active || self.segment_id != segment_id || self.silent_duration <= 0.0 {
+            return None;
+        }
+        self.finalize_recording()
+    }
+
+    fn send_voice_event(&self, event: VoiceEvent) {
+        if self.voice_sender.send(event).is_ok() {
+            let _ = self.notify_sender.try_send(());
+        }
+    }
+
     fn start_recording(&mut self, initial_volume: f32) {
+        let pre_buffered = self.pre_buffer.iter().map(|c| c.len()).sum::<usize>();
+        self.onset_time = unix_time();
+        self.segment_start_time =
+            self.onset_time - pre_buffered as f64 / self.config.target_sample_rate as f64;
+        self.segment_id += 1;
         self.is_active = true;
         self.recording_buffer.clear();
         self.silent_duration = 0.0;
+        self.speech_duration = self.chunk_duration_secs;
+        self.onset_sent = false;
+        self.pause_sent = false;
         self.peak_volume = initial_volume;
-        if !Self::is_llm_busy() {
+        if !self.is_llm_busy() {
             println!("\u{2139}\u{FE0F} Recording started (vol={:.4})", initial_volume);
         }
     }
 
-    fn is_llm_busy() -> bool {
-        std::path::Path::new(".llm_busy").exists()
+    fn is_llm_busy(&self) -> bool {
+        self.llm_busy.load(Ordering::Relaxed)
     }
 
-    fn finalize_recording(&mut self) -> Option<String> {
-        let duration = self.recording_buffer.len() as f32 / self.config.target_sample_rate as f32;
-        if !Self::is_llm_busy() {
-            println!("\u{2139}\u{FE0F} Recording stopped (duration: {:.1}s)", duration);
+    fn finalize_recording(&mut self) -> Option<SpeechSegment> {
+        if self.is_llm_busy() {
+            self.send_stream_event(StreamEvent::Cancel(self.segment_id));
+            self.reset_state();
+            return None;
         }
 
-        let filepath = match self.save_audio_file() {
-            Ok(path) => path,
+        let duration = self.recording_buffer.len() as f32 / self.config.target_sample_rate as f32;
+        println!("\u{2139}\u{FE0F} Recording stopped (duration: {:.1}s)", duration);
+
+        let encoded = match self.encode_audio() {
+            Ok(bytes) => bytes,
             Err(e) => {
-                eprintln!("Error saving audio file: {}", e);
+                eprintln!("Error encoding audio segment: {}", e);
+                self.send_stream_event(StreamEvent::Cancel(self.segment_id));
                 self.reset_state();
                 return None;
             }
         };
 
+        let pcm = std::mem::take(&mut self.recording_buffer);
+        let segment = SpeechSegment::new(
+            self.segment_id,
+            self.config.target_sample_rate,
+            self.segment_start_time,
+            unix_time(),
+            self.config.format.clone(),
+            pcm,
+            encoded,
+        );
+
+        self.send_stream_event(StreamEvent::End(self.segment_id));
         self.reset_state();
-        Some(filepath)
+        Some(segment)
     }
 
-    fn save_audio_file(&self) -> Result<String> {
-        fs::create_dir_all(&self.config.output_directory)?;
-
-        let timestamp = chrono::Local::now().format("%y%m%d_%H%M%S").to_string();
-        let ext = match self.config.format {
-            AudioFormat::Flac => "flac",
-            AudioFormat::Wav => "wav",
-        };
-        let filename = format!("{}.{}", timestamp, ext);
-        let filepath = PathBuf::from(&self.config.output_directory).join(&filename);
-
+    fn encode_audio(&self) -> Result<Vec<u8>> {
         match self.config.format {
-            AudioFormat::Flac => self.save_flac(&filepath)?,
-            AudioFormat::Wav => self.save_wav(&filepath)?,
+            AudioFormat::Flac => self.encode_flac(),
+            AudioFormat::Wav => self.encode_wav(),
         }
-
-        Ok(filepath.to_string_lossy().to_string())
     }
 
-    fn save_flac(&self, filepath: &PathBuf) -> Result<()> {
+    fn encode_flac(&self) -> Result<Vec<u8>> {
         use flacenc::bitsink::ByteSink;
         use flacenc::component::BitRepr;
         use flacenc::config::Encoder as FlacConfig;
@@ -175,39 +293,35 @@ impl VoiceActivityDetector {
             .write(&mut sink)
             .map_err(|e| anyhow::anyhow!("FLAC write failed: {:?}", e))?;
 
-        fs::write(filepath, sink.as_slice())?;
-        Ok(())
+        Ok(sink.as_slice().to_vec())
     }
 
-    fn save_wav(&self, filepath: &PathBuf) -> Result<()> {
-        let file = File::create(filepath)?;
-        let mut writer = BufWriter::new(file);
-
+    fn encode_wav(&self) -> Result<Vec<u8>> {
         let num_samples = self.recording_buffer.len() as u32;
         let byte_rate = self.config.target_sample_rate * 2;
         let data_size = num_samples * 2;
         let file_size = 36 + data_size;
 
-        use std::io::Write;
-        writer.write_all(b"RIFF")?;
-        writer.write_all(&file_size.to_le_bytes())?;
-        writer.write_all(b"WAVE")?;
-        writer.write_all(b"fmt ")?;
-        writer.write_all(&16u32.to_le_bytes())?;
-        writer.write_all(&1u16.to_le_bytes())?;
-        writer.write_all(&1u16.to_le_bytes())?;
-        writer.write_all(&self.config.target_sample_rate.to_le_bytes())?;
-        writer.write_all(&byte_rate.to_le_bytes())?;
-        writer.write_all(&2u16.to_le_bytes())?;
-        writer.write_all(&16u16.to_le_bytes())?;
-        writer.write_all(b"data")?;
-        writer.write_all(&data_size.to_le_bytes())?;
+        let mut writer = Vec::with_capacity(44 + data_size as usize);
+        writer.extend_from_slice(b"RIFF");
+        writer.extend_from_slice(&file_size.to_le_bytes());
+        writer.extend_from_slice(b"WAVE");
+        writer.extend_from_slice(b"fmt ");
+        writer.extend_from_slice(&16u32.to_le_bytes());
+        writer.extend_from_slice(&1u16.to_le_bytes());
+        writer.extend_from_slice(&1u16.to_le_bytes());
+        writer.extend_from_slice(&self.config.target_sample_rate.to_le_bytes());
+        writer.extend_from_slice(&byte_rate.to_le_bytes());
+        writer.extend_from_slice(&2u16.to_le_bytes());
+        writer.extend_from_slice(&16u16.to_le_bytes());
+        writer.extend_from_slice(b"data");
+        writer.extend_from_slice(&data_size.to_le_bytes());
 
         for &sample in &self.recording_buffer {
-            writer.write_all(&sample.to_le_bytes())?;
+            writer.extend_from_slice(&sample.to_le_bytes());
         }
 
-        Ok(())
+        Ok(writer)
     }
 
     fn reset_state(&mut self) {
@@ -217,3 +331,10 @@ impl VoiceActivityDetector {
         self.peak_volume = 0.0;
     }
 }
+
+fn unix_time() -> f64 {
+    std::time::SystemTime::now()
+        .duration_since(std::time::UNIX_EPOCH)
+        .map(|d| d.as_secs_f64())
+        .unwrap_or(0.0)
+}
@@ -0,0 +1,57 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.llm_client import AnnieMieClient
+from network.upload_protocol import build_binary_message
+
+
+class RecordingWebSocket:
+
+    def __init__(self):
+        self.frames = []
+
+    async def send(self, data):
+        # Yield on every frame so unguarded senders would interleave
+        await asyncio.sleep(0)
+        self.frames.append(data)
+
+
+def split_messages(frames):
+    messages = []
+    pending = 0
+    for frame in frames:
+        if isinstance(frame, str):
+            assert pending == 0, "header arrived before the previous message's parts"
+            header = json.loads(frame)
+            pending = len(header.get("parts", []))
+            messages.append((header, []))
+        else:
+            assert pending > 0, "binary part without a header"
+            messages[-1][1].append(frame)
+            pending -= 1
+    assert pending == 0
+    return messages
+
+
+def test_concurrent_binary_sends_keep_parts_with_their_header():
+    async def run():
+        client = AnnieMieClient("ws://localhost:0")
+        client.websocket = RecordingWebSocket()
+        messages = [
+            build_binary_message({"turn_id": turn}, bytes([turn]) * 64, [bytes([turn + 100]) * 32] * 3)
+            for turn in range(2)
+        ]
+        await asyncio.gather(*(client.send_message(message) for message in messages))
+        return client.websocket.frames
+
+    frames = asyncio.run(run())
+    received = split_messages(frames)
+
+    assert len(received) == 2
+    for header, parts in received:
+        turn = header["turn_id"]
+        assert parts == [bytes([turn]) * 64] + [bytes([turn + 100]) * 32] * 3
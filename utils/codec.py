@@ -0,0 +1,142 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import config
+from config import MessageType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+SERVER_MESSAGE_SCHEMAS = {
+    MessageType.STATUS: ("StatusMessage", [("status", None), ("generation_id", None)]),
+    MessageType.TEXT: ("TextMessage", [("text", ""), ("seq", None)]),
+    MessageType.STATS: (
+        "StatsMessage",
+        [("stat", None), ("time", None), ("tokens", None), ("tok_per_sec", None)],
+    ),
+    MessageType.ERROR: ("ErrorMessage", [("error", None)]),
+    MessageType.IDENTITY: ("IdentityMessage", [("identity_ids", []), ("profiles", [])]),
+    MessageType.PONG: ("PongMessage", []),
+    MessageType.HELLO: ("HelloMessage", [("capabilities", [])]),
+}
+
+
+class Record:
+    __slots__ = ()
+    TYPE: str = None
+    _fields: Tuple[Tuple[str, Any], ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        record = cls.__new__(cls)
+        for name, default in cls._fields:
+            value = data.get(name, default)
+            if value is default and isinstance(default, list):
+                value = []
+            setattr(record, name, value)
+        return record
+
+    def to_dict(self) -> Dict:
+        data = {"type": self.TYPE}
+        for name, _ in self._fields:
+            data[name] = getattr(self, name)
+        return data
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name, _ in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+def _make_record(name: str, tag: str, fields: List[Tuple[str, Any]]):
+    return type(name, (Record,), {
+        "__slots__": tuple(field for field, _ in fields),
+        "TYPE": tag,
+        "_fields": tuple(fields),
+    })
+
+
+def _make_struct(name: str, tag: str, fields: List[Tuple[str, Any]]):
+    return msgspec.defstruct(
+        name,
+        [(field, Any, default) for field, default in fields],
+        namespace={"TYPE": tag},
+        tag=tag,
+        tag_field="type",
+    )
+
+
+class JsonCodec:
+
+    def __init__(self, backend: str = None):
+        self.backend = self._resolve(backend or config.JSON_CODEC)
+        self._records = {}
+        self._server_decoder = None
+
+        if self.backend == "msgspec":
+            self._encoder = msgspec.json.Encoder()
+            self._decoder = msgspec.json.Decoder()
+            structs = [
+                _make_struct(name, tag, fields)
+                for tag, (name, fields) in SERVER_MESSAGE_SCHEMAS.items()
+            ]
+            self._server_decoder = msgspec.json.Decoder(Union[tuple(structs)])
+        else:
+            self._records = {
+                tag: _make_record(name, tag, fields)
+                for tag, (name, fields) in SERVER_MESSAGE_SCHEMAS.items()
+            }
+
+    @staticmethod
+    def _resolve(backend: str) -> str:
+        if backend == "auto":
+            if msgspec is not None:
+                return "msgspec"
+            if orjson is not None:
+                return "orjson"
+            return "json"
+        if backend == "orjson" and orjson is None:
+            return "json"
+        if backend == "msgspec" and msgspec is None:
+            return "json"
+        return backend
+
+    def dumps(self, obj) -> str:
+        return self.dumpb(obj).decode("utf-8") if self.backend != "json" else json.dumps(obj)
+
+    def dumpb(self, obj) -> bytes:
+        if self.backend == "orjson":
+            return orjson.dumps(obj)
+        if self.backend == "msgspec":
+            return self._encoder.encode(obj)
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data: Union[str, bytes]):
+        if self.backend == "orjson":
+            return orjson.loads(data)
+        if self.backend == "msgspec":
+            return self._decoder.decode(data)
+        return json.loads(data)
+
+    def decode_server_message(self, data: Union[str, bytes]) -> Optional[Any]:
+        if self._server_decoder is not None:
+            try:
+                return self._server_decoder.decode(data)
+            except msgspec.ValidationError:
+                return None
+
+        message = self.loads(data)
+        if not isinstance(message, dict):
+            return None
+        record = self._records.get(message.get("type"))
+        return record.from_dict(message) if record else None
+
+
+codec = JsonCodec()
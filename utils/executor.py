@@ -0,0 +1,60 @@
+import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import config
+from utils.logger import logger
+
+
+class BlockingExecutor:
+
+    def __init__(self, thread_workers: int = None, process_workers: int = None):
+        self.thread_workers = (
+            thread_workers if thread_workers is not None else config.EXECUTOR_THREAD_WORKERS
+        )
+        self.process_workers = (
+            process_workers if process_workers is not None else config.EXECUTOR_PROCESS_WORKERS
+        )
+        self._thread_pool = None
+        self._process_pool = None
+
+    def _threads(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=max(1, self.thread_workers),
+                thread_name_prefix="annie-worker",
+            )
+        return self._thread_pool
+
+    def _processes(self):
+        if self.process_workers <= 0:
+            return None
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            logger.info(f"Process pool started ({self.process_workers} workers)")
+        return self._process_pool
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._threads(), functools.partial(fn, *args, **kwargs)
+        )
+
+    async def run_cpu(self, fn, *args, **kwargs):
+        pool = self._processes() or self._threads()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+
+    def submit(self, fn, *args, **kwargs):
+        return self._threads().submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True):
+        if self._thread_pool:
+            self._thread_pool.shutdown(wait=wait)
+            self._thread_pool = None
+        if self._process_pool:
+            self._process_pool.shutdown(wait=wait)
+            self._process_pool = None
+
+
+executor = BlockingExecutor()
@@ -0,0 +1,70 @@
+import asyncio
+import time
+from collections import deque
+
+import config
+from utils.logger import logger
+
+
+class LoopMonitor:
+
+    def __init__(self, interval: float = None, window: int = 2000):
+        self.interval = interval if interval is not None else config.LOOP_MONITOR_INTERVAL
+        self.stalls = deque(maxlen=window)
+        self.max_stall = 0.0
+        self.total_stall = 0.0
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            stall = max(0.0, time.perf_counter() - expected)
+            self.stalls.append(stall)
+            self.total_stall += stall
+            self.max_stall = max(self.max_stall, stall)
+
+    def percentile(self, pct: float) -> float:
+        if not self.stalls:
+            return 0.0
+        ordered = sorted(self.stalls)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> dict:
+        return {
+            "samples": len(self.stalls),
+            "p50_ms": self.percentile(50) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max_stall * 1000,
+            "total_ms": self.total_stall * 1000,
+        }
+
+    def reset(self):
+        self.stalls.clear()
+        self.max_stall = 0.0
+        self.total_stall = 0.0
+
+    async def report_periodically(self, period: float = None):
+        period = period or config.LOOP_MONITOR_REPORT_SECS
+        while True:
+            await asyncio.sleep(period)
+            stats = self.summary()
+            logger.info(
+                f"⏱️ Event loop stall: p50 {stats['p50_ms']:.1f}ms, "
+                f"p99 {stats['p99_ms']:.1f}ms, max {stats['max_ms']:.1f}ms"
+            )
+            self.reset()
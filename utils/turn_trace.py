@@ -0,0 +1,183 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+from typing import Dict, List, Optional
+
+import config
+from utils.logger import logger
+
+
+STAGES = [
+    "speech_onset",
+    "speech_end",
+    "segment_delivered",
+    "vad_done",
+    "identity_done",
+    "payload_built",
+    "sent",
+    "generating",
+    "first_token",
+    "tts_queued",
+    "tts_played",
+    "done",
+]
+
+SUMMARY_SPANS = [
+    ("end→sent", "speech_end", "sent"),
+    ("sent→first token", "sent", "first_token"),
+    ("first token→chunk", "first_token", "tts_queued"),
+    ("end→audio", "speech_end", "tts_played"),
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class TurnTrace:
+
+    def __init__(self, trace_id: str = None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:8]
+        self.marks: Dict[str, float] = {}
+
+    def mark(self, stage: str, at: float = None):
+        self.marks[stage] = at if at is not None else time.monotonic()
+
+    def mark_once(self, stage: str, at: float = None):
+        if stage not in self.marks:
+            self.mark(stage, at)
+
+    def mark_wall(self, stage: str, wall_time: float):
+        self.mark(stage, time.monotonic() - (time.time() - wall_time))
+
+    def span(self, start: str, end: str) -> Optional[float]:
+        if start in self.marks and end in self.marks:
+            return self.marks[end] - self.marks[start]
+        return None
+
+    def stage_durations(self) -> Dict[str, float]:
+        durations = {}
+        previous = None
+        for stage in STAGES:
+            if stage not in self.marks:
+                continue
+            if previous is not None:
+                durations[stage] = self.marks[stage] - self.marks[previous]
+            previous = stage
+        return durations
+
+    def summary(self) -> str:
+        parts = []
+        for label, start, end in SUMMARY_SPANS:
+            value = self.span(start, end)
+            if value is not None:
+                parts.append(f"{label} {value * 1000:.0f}ms")
+        return ", ".join(parts) if parts else "no spans"
+
+
+class TurnTracer:
+
+    def __init__(self, capacity: int = None):
+        self.traces = deque(maxlen=capacity or config.TURN_TRACE_CAPACITY)
+        self.active: Optional[TurnTrace] = None
+        self._report_task = None
+
+    def begin(self, segment=None) -> TurnTrace:
+        if self.active is not None:
+            if "sent" in self.active.marks:
+                self.finish()
+            else:
+                self.active = None
+
+        trace = TurnTrace()
+        if segment is not None and not isinstance(segment, str):
+            trace.mark_wall("speech_onset", segment.start_time)
+            trace.mark_wall("speech_end", segment.end_time)
+        trace.mark("segment_delivered")
+        self.active = trace
+        return trace
+
+    def mark(self, stage: str):
+        if self.active is not None:
+            self.active.mark(stage)
+
+    def mark_once(self, stage: str):
+        if self.active is not None:
+            self.active.mark_once(stage)
+
+    def discard(self):
+        self.active = None
+
+    def finish(self):
+        trace = self.active
+        self.active = None
+        if trace is None:
+            return None
+
+        self.traces.append(trace)
+        logger.info(f"⏱️ Turn {trace.trace_id}: {trace.summary()}")
+        return trace
+
+    def stage_stats(self) -> Dict[str, Dict[str, float]]:
+        samples: Dict[str, List[float]] = {}
+        for trace in self.traces:
+            for stage, duration in trace.stage_durations().items():
+                samples.setdefault(stage, []).append(duration)
+            for label, start, end in SUMMARY_SPANS:
+                value = trace.span(start, end)
+                if value is not None:
+                    samples.setdefault(label, []).append(value)
+
+        stats = {}
+        for name in STAGES + [label for label, _, _ in SUMMARY_SPANS]:
+            values = samples.get(name)
+            if not values:
+                continue
+            stats[name] = {
+                "count": len(values),
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+            }
+        return stats
+
+    def report(self) -> str:
+        stats = self.stage_stats()
+        if not stats:
+            return "No completed turns traced"
+
+        lines = [f"Turn latency over {len(self.traces)} turns (ms, from previous stage)"]
+        lines.append(f"  {'stage':<20}{'p50':>9}{'p95':>9}{'p99':>9}{'n':>6}")
+        for name, values in stats.items():
+            lines.append(
+                f"  {name:<20}{values['p50_ms']:9.1f}{values['p95_ms']:9.1f}"
+                f"{values['p99_ms']:9.1f}{values['count']:6d}"
+            )
+        return "\n".join(lines)
+
+    def log_report(self):
+        logger.info(f"⏱️ {self.report()}")
+
+    def start_reporting(self, period: float = None):
+        period = period if period is not None else config.TURN_TRACE_REPORT_SECS
+        if period and self._report_task is None:
+            self._report_task = asyncio.create_task(self._report_periodically(period))
+
+    def stop_reporting(self):
+        if self._report_task is not None:
+            self._report_task.cancel()
+            self._report_task = None
+
+    async def _report_periodically(self, period: float):
+        while True:
+            await asyncio.sleep(period)
+            if self.traces:
+                self.log_report()
+
+
+tracer = TurnTracer()
@@ -9,7 +9,8 @@ import { AttachedFile } from './types';
 import { ServerSimulator } from './components/ServerSimulator';
 
 const DISPLAY_MODEL_NAME = "Qwen3-Omni-30B-A3B-Instruct";
-const BRIDGE_SERVER_URL = "ws://localhost:8768";
+const SESSION_ID = new URLSearchParams(window.location.search).get("session") ?? "";
+const BRIDGE_SERVER_URL = `ws://localhost:8768/${encodeURIComponent(SESSION_ID)}`;
 
 const App: React.FC = () => {
   const [connected, setConnected] = useState(false);
@@ -5,6 +5,7 @@ export class LiveClient {
   public onVolumeUpdate: ((vol: number) => void) | null = null;
   public onMessage: ((text: string, isUser: boolean) => void) | null = null;
   public onConnectChange: ((connected: boolean) => void) | null = null;
+  public onTag: ((type: string, value: string) => void) | null = null;
 
   constructor(serverUrl: string = 'ws://localhost:8768') {
     this.serverUrl = serverUrl;
@@ -69,6 +70,10 @@ export class LiveClient {
       this.onVolumeUpdate?.(message.level);
     }
 
+    if (message.type === 'tag') {
+      this.onTag?.(message.tag, message.value);
+    }
+
     if (message.type === 'response') {
       console.log("[WS] Server response:", message.data);
     }